@@ -0,0 +1,85 @@
+"""
+Compares the acceleration structures the renderer can build, by building each one over the hittables
+of a few scenes and tracing a camera ray through every pixel of a small image:
+ random spheres - the random spheres scene, ~480 small spheres above a gigantic ground sphere
+ box of spheres - the box of 1000 evenly distributed spheres from the final scene, on its own
+ final          - the final scene (whose box of spheres and ground boxes are BVHs of their own)
+
+run from the project's root directory:
+> python -m benchmarks.bench_accelerators [accelerator ...]
+"""
+import random
+import sys
+import time
+
+import scenes
+from common import CameraBuilder, Point3, Vec3, ColorRgb
+from hittables import HittableList
+from hittables.volumes import GlobalMedium
+from renderer import MultiprocessRenderer, SolidBackground, ACCELERATORS
+from scenes.scene_builder import build_solid_sphere
+
+IMAGE_WIDTH = 160
+ASPECT_RATIO = 1.77
+
+
+def build_box_of_spheres():
+    camera = CameraBuilder() \
+        .look_from(Point3(350.0, 250.0, -300.0)) \
+        .look_at(Point3(82.5, 82.5, 82.5)) \
+        .up_direction(Vec3(0.0, 1.0, 0.0)) \
+        .aspect_ratio(ASPECT_RATIO) \
+        .image_width(IMAGE_WIDTH) \
+        .focus_distance(10.0) \
+        .aperture(0.0) \
+        .vertical_field_of_view(40.0) \
+        .open_close_time(0.0, 1.0) \
+        .build()
+    world = HittableList()
+    for _ in range(1000):
+        world.add(build_solid_sphere(Point3.random_range(0.0, 165.0), 10.0, ColorRgb(0.73, 0.73, 0.73)))
+    return camera, world
+
+
+def _surfaces(world: HittableList) -> HittableList:
+    # global media have no bounding box and are never part of an acceleration structure
+    surfaces = HittableList()
+    for hittable in world.objects:
+        if not isinstance(hittable, GlobalMedium):
+            surfaces.add(hittable)
+    return surfaces
+
+
+def main():
+    names = sys.argv[1:] or list(ACCELERATORS)
+    random.seed(11)
+    scene_list = [
+        ("random spheres", scenes.build_scene_random_spheres(IMAGE_WIDTH, ASPECT_RATIO)[:2]),
+        ("box of spheres", build_box_of_spheres()),
+        ("final", scenes.build_scene_final(IMAGE_WIDTH, ASPECT_RATIO)[:2]),
+    ]
+
+    for scene_name, (camera, world) in scene_list:
+        surfaces = _surfaces(world)
+        # jittered, like the renderer's rays
+        rays = [camera.get_ray((col + random.random()) / (camera.image_width - 1),
+                               (row + random.random()) / (camera.image_height - 1))
+                for row in range(camera.image_height) for col in range(camera.image_width)]
+        print(f"{scene_name}: {len(surfaces.objects)} hittables, {len(rays)} camera rays")
+
+        for name in names:
+            renderer = MultiprocessRenderer(SolidBackground(ColorRgb()), 50, 1, 1, name)
+            random.seed(1)
+            start = time.perf_counter()
+            accelerator = renderer.build_accelerator(surfaces)
+            build_secs = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for ray in rays:
+                accelerator.intersect(ray, 0.001, float("inf"))
+            trace_secs = time.perf_counter() - start
+            print(f"    {name:6s} build {build_secs:8.3f}secs   trace {trace_secs:8.3f}secs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Renders the earth scene, where most primary rays miss the single sphere, with and without the background fast
+path, which fills the pixels whose rays can't hit the world's bounds without tracing them.
+
+run from the project's root directory:
+> python -m benchmarks.bench_background
+"""
+import time
+
+import numpy as np
+
+import scenes
+from renderer import MultiprocessRenderer
+from renderer.frustum import pixels_missing_box
+
+WIDTH = 120
+SAMPLES = 16
+
+
+def main():
+    camera, world, background = scenes.build_earth_scene(WIDTH, 16.0 / 9.0)
+    bounds = world.bounding_box(camera.open_time, camera.close_time)
+    missing = sum(pixels_missing_box(camera, row, bounds).sum() for row in range(camera.image_height))
+    print(f"{missing} of {camera.image_width * camera.image_height} pixels can't hit the world")
+
+    images = []
+    for fast_path in (False, True):
+        renderer = MultiprocessRenderer(background, 10, SAMPLES, 1, seed=1, background_fast_path=fast_path)
+        bvh = renderer.build_accelerator(world)
+        start = time.perf_counter()
+        sums = np.array([renderer.render_scanline(row, bvh, camera)[1] for row in range(camera.image_height)])
+        images.append(MultiprocessRenderer.post_process(sums, SAMPLES))
+        print(f"fast path {str(fast_path):>5s}, {SAMPLES} spp: {time.perf_counter() - start:6.2f}s")
+    print(f"rms difference {np.sqrt(np.mean((images[0] - images[1]) ** 2)):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmarks BVH construction for a large, generated, scene of random spheres. The builders are:
+ serial   - the recursive `BvhNode.from_hittable_list` builder
+ array    - the array based `build_bvh_parallel` builder, in a single process
+ parallel - `build_bvh_parallel` using all cpu cores
+ lbvh     - the Morton code linear BVH builder, `build_lbvh`
+Along with the build time, the surface area cost of each tree and the time it takes to trace a fixed set of
+random rays through it are printed, as measures of the tree's quality.
+
+run from the project's root directory:
+> python -m benchmarks.bench_bvh_build [sphere_count] [builder ...]
+"""
+import os
+import random
+import sys
+import time
+
+from common import Point3, Vec3, Ray
+from hittables import HittableList
+from hittables.bvh_builder import build_bvh_parallel, build_lbvh
+from hittables.bvh_node import BvhNode
+from hittables.primitives import Sphere
+from materials import Lambertian
+
+SPHERE_COUNT = 100000
+RAY_COUNT = 20000
+
+BUILDERS = {
+    "serial": lambda world: BvhNode.from_hittable_list(world, 0.0, 1.0),
+    "array": lambda world: build_bvh_parallel(world, 0.0, 1.0),
+    "parallel": lambda world: build_bvh_parallel(world, 0.0, 1.0, workers=os.cpu_count()),
+    "lbvh": lambda world: build_lbvh(world, 0.0, 1.0),
+}
+
+
+def _build_world(count: int) -> HittableList:
+    mat = Lambertian.from_color(0.5, 0.5, 0.5)
+    world = HittableList()
+    for _ in range(count):
+        world.add(Sphere(Point3.random_range(-1000.0, 1000.0), random.uniform(0.5, 5.0), mat))
+    return world
+
+
+def _random_rays(count: int):
+    return [Ray(Point3.random_range(-1000.0, 1000.0), Vec3.random_unit_vector()) for _ in range(count)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else SPHERE_COUNT
+    names = sys.argv[2:] or list(BUILDERS)
+    random.seed(42)
+    world = _build_world(count)
+    rays = _random_rays(RAY_COUNT)
+    print(f"building a BVH over {count} random spheres, tracing {RAY_COUNT} rays ({os.cpu_count()} cpus)")
+
+    for name in names:
+        random.seed(1)
+        start = time.perf_counter()
+        root = BUILDERS[name](world)
+        build_secs = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for ray in rays:
+            root.intersect(ray, 0.001, float("inf"))
+        trace_secs = time.perf_counter() - start
+        print(f"{name:10s} build {build_secs:8.3f}secs   SAH cost {root.build_cost:10.2f}   "
+              f"trace {trace_secs:8.3f}secs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Generates the camera rays of every sample of an image with `Camera.get_ray()`, one ray at a time, and with
+`Camera.get_rays()`, a row at a time, for a pinhole camera with an instant shutter and for a camera with a lens and
+a shutter that is open for some time.
+
+run from the project's root directory:
+> python -m benchmarks.bench_camera_rays
+"""
+import dataclasses
+import time
+
+import numpy as np
+
+import scenes
+from common import rng
+
+WIDTH = 160
+SAMPLES = 8
+
+
+def main():
+    camera, _, _ = scenes.build_earth_scene(WIDTH, 16.0 / 9.0)
+    cameras = {
+        "pinhole": dataclasses.replace(camera, lens_radius=0.0, close_time=camera.open_time),
+        "lens and shutter": dataclasses.replace(camera, lens_radius=0.1, close_time=camera.open_time + 1.0),
+    }
+    count = camera.image_width * camera.image_height * SAMPLES
+    gen = np.random.default_rng(1)
+    for name, camera in cameras.items():
+        rng.select_stream(1)
+        start = time.perf_counter()
+        for row in range(camera.image_height):
+            for col in range(camera.image_width):
+                for _ in range(SAMPLES):
+                    camera.get_ray((col + rng.random()) / (camera.image_width - 1),
+                                   (row + rng.random()) / (camera.image_height - 1))
+        scalar = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cols = np.repeat(np.arange(camera.image_width), SAMPLES)
+        for row in range(camera.image_height):
+            dims = gen.random((len(cols), 5))
+            camera.get_rays((cols + dims[:, 0]) / (camera.image_width - 1),
+                            (row + dims[:, 1]) / (camera.image_height - 1), dims[:, 2:4], dims[:, 4])
+        vectorized = time.perf_counter() - start
+        print(f"{name:>16s}, {count} rays: get_ray {scalar:6.2f}s  get_rays {vectorized:6.3f}s")
+
+
+if __name__ == "__main__":
+    main()
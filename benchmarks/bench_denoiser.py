@@ -0,0 +1,55 @@
+"""
+Compares renders of the Cornell box at a few samples per pixel, before and after denoising, against a reference
+render taken with many more samples per pixel. The error is the RMS difference to the reference, the lower the
+better, and the times are the render time and the denoising time of each image.
+
+run from the project's root directory:
+> python -m benchmarks.bench_denoiser
+"""
+import time
+
+import numpy as np
+
+import scenes
+from renderer import MultiprocessRenderer
+from renderer.denoiser import denoise
+
+WIDTH = 40
+REFERENCE_SAMPLES = 512
+SAMPLES = (16, 64)
+
+
+def render(camera, world, background, samples_per_pixel: int, seed: int):
+    renderer = MultiprocessRenderer(background, 10, samples_per_pixel, 1, seed=seed, sampler="sobol")
+    rows = [renderer.render_scanline(row, world, camera, features=True) for row in range(camera.image_height)]
+    sums, albedo, normals = (np.array([result[i] for result in rows]) for i in (1, 2, 3))
+    return sums / samples_per_pixel, albedo, normals
+
+
+def main():
+    camera, world, background = scenes.build_scene_cornell_box_with_two_boxes(WIDTH, 1.0)
+    world = MultiprocessRenderer(background, 10, 1, 1, seed=1).build_accelerator(world)
+
+    start = time.perf_counter()
+    reference, _, _ = render(camera, world, background, REFERENCE_SAMPLES, 99)
+    reference = MultiprocessRenderer.post_process(reference, 1)
+    print(f"reference, {REFERENCE_SAMPLES} spp, {camera.image_width}x{camera.image_height}: "
+          f"{time.perf_counter() - start:.1f}s")
+
+    for samples_per_pixel in SAMPLES:
+        start = time.perf_counter()
+        colors, albedo, normals = render(camera, world, background, samples_per_pixel, 7)
+        render_time = time.perf_counter() - start
+        start = time.perf_counter()
+        denoised = denoise(colors, albedo, normals)
+        denoise_time = time.perf_counter() - start
+        # the errors are measured on the displayed images
+        colors, denoised = (MultiprocessRenderer.post_process(image, 1) for image in (colors, denoised))
+        error = np.sqrt(np.mean((colors - reference) ** 2))
+        denoised_error = np.sqrt(np.mean((denoised - reference) ** 2))
+        print(f"{samples_per_pixel:4d} spp: rms error {error:.2f}, denoised {denoised_error:.2f}  "
+              f"render {render_time:6.2f}s  denoise {denoise_time:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Renders the Cornell box, a static scene seen through a pinhole camera, with every primary ray traced through the
+BVH and with the first hits of a few sub-sample positions per pixel cached in a G-buffer and reused by all of the
+pixel's samples. The error is the RMS difference to the uncached render. The cache only saves the primary rays'
+traversals, so its speedup shrinks as the paths get longer, with the bounce depth.
+
+run from the project's root directory:
+> python -m benchmarks.bench_gbuffer
+"""
+import time
+
+import numpy as np
+
+import scenes
+from renderer import MultiprocessRenderer
+
+WIDTH = 40
+SAMPLES = 64
+POSITIONS = (0, 16, 4)
+DEPTHS = (2, 50)
+
+
+def main():
+    camera, world, background = scenes.build_scene_cornell_box_with_two_boxes(WIDTH, 1.0)
+    bvh = MultiprocessRenderer(background, 50, SAMPLES, 1, seed=1).build_accelerator(world)
+
+    for depth in DEPTHS:
+        reference = None
+        for positions in POSITIONS:
+            renderer = MultiprocessRenderer(background, depth, SAMPLES, 1, seed=1, sampler="sobol",
+                                            gbuffer_positions=positions)
+            start = time.perf_counter()
+            sums = np.array([renderer.render_scanline(row, bvh, camera, gbuffer=positions > 0)[1]
+                             for row in range(camera.image_height)])
+            elapsed = time.perf_counter() - start
+            image = MultiprocessRenderer.post_process(sums, SAMPLES)
+            if reference is None:
+                reference = image
+            error = np.sqrt(np.mean((image - reference) ** 2))
+            label = f"{positions} positions" if positions else "uncached"
+            print(f"depth {depth:2d}, {SAMPLES} spp, {label:>12s}: {elapsed:6.2f}s  rms difference {error:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmarks deferred (lazy) HitRecord construction against eager construction.
+
+Eager construction is what HittableList and BvhNode did before SurfaceHit was introduced: every
+candidate intersection was turned into a full HitRecord, with its u,v trig calls, even when a
+closer hit later replaced it. The lazy path only resolves the closest hit.
+
+run from the project's root directory:
+> python -m benchmarks.bench_lazy_hit_record
+"""
+import random
+import time
+from typing import Optional
+
+import scenes
+import textures
+from common import Ray
+from hittables import HitRecord, Hittable, HittableList
+from hittables.bvh_node import BvhNode
+
+RAY_COUNT = 2000
+
+
+class _Counter:
+    """
+    counts calls to get_sphere_uv and HitRecord allocations
+    """
+    def __init__(self):
+        self.uv_calls = 0
+        self.records = 0
+        self._get_sphere_uv = textures.get_sphere_uv
+        self._record_init = HitRecord.__init__
+
+    def install(self):
+        counter = self
+        get_sphere_uv = self._get_sphere_uv
+        record_init = self._record_init
+
+        def counting_get_sphere_uv(p):
+            counter.uv_calls += 1
+            return get_sphere_uv(p)
+
+        def counting_record_init(rec, *args, **kwargs):
+            counter.records += 1
+            record_init(rec, *args, **kwargs)
+
+        textures.get_sphere_uv = counting_get_sphere_uv
+        HitRecord.__init__ = counting_record_init
+
+    def uninstall(self):
+        textures.get_sphere_uv = self._get_sphere_uv
+        HitRecord.__init__ = self._record_init
+
+    def reset(self):
+        self.uv_calls = 0
+        self.records = 0
+
+
+def eager_hit(hittable: Hittable, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
+    """
+    closest hit traversal that builds a HitRecord for every candidate, like the original
+    HittableList.hit and BvhNode.hit did
+    """
+    if isinstance(hittable, BvhNode):
+        if not hittable.bbox.hit(r, t_min, t_max):
+            return None
+        hit_left = eager_hit(hittable.left, r, t_min, t_max)
+        hit_right = eager_hit(hittable.right, r, t_min, hit_left.t if hit_left else t_max)
+        return hit_right if hit_right else hit_left
+    elif isinstance(hittable, HittableList):
+        closest_so_far = t_max
+        hit_anything = None
+        for obj in hittable.objects:
+            hit_record = eager_hit(obj, r, t_min, closest_so_far)
+            if hit_record:
+                closest_so_far = hit_record.t
+                hit_anything = hit_record
+        return hit_anything
+    else:
+        return hittable.hit(r, t_min, t_max)
+
+
+def _run(name: str, world: Hittable, rays, counter: _Counter, eager: bool):
+    counter.reset()
+    start = time.perf_counter()
+    for ray in rays:
+        if eager:
+            eager_hit(world, ray, 0.001, float("inf"))
+        else:
+            world.hit(ray, 0.001, float("inf"))
+    elapsed = time.perf_counter() - start
+    mode = "eager" if eager else "lazy "
+    print(f"{name:12s} {mode}  {elapsed:8.3f}secs  get_sphere_uv calls {counter.uv_calls:8d}  "
+          f"HitRecords allocated {counter.records:8d}")
+
+
+def main():
+    random.seed(42)
+    camera, world, _ = scenes.build_scene_random_spheres(200, 1.77)
+    bvh = BvhNode.from_hittable_list(world, 0.0, 1.0)
+    rays = [camera.get_ray(random.random(), random.random()) for _ in range(RAY_COUNT)]
+
+    print(f"random spheres scene, {len(world.objects)} hittables, {RAY_COUNT} camera rays")
+    counter = _Counter()
+    counter.install()
+    try:
+        for name, hittable in (("linear list", world), ("bvh", bvh)):
+            _run(name, hittable, rays, counter, eager=True)
+            _run(name, hittable, rays, counter, eager=False)
+    finally:
+        counter.uninstall()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmarks BVH traversal with and without motion bounds on a motion-heavy variant of the random
+spheres scene, where every small sphere is a fast moving sphere.
+
+run from the project's root directory:
+> python -m benchmarks.bench_motion_bvh
+"""
+import random
+import time
+
+import scenes
+from common import Vec3
+from hittables import HittableList
+from hittables.bvh_node import BvhNode
+from hittables.primitives import Sphere, MovingSphere
+
+RAY_COUNT = 3000
+# how far, in each direction, a small sphere can move during the shutter interval
+MAX_MOTION = 3.0
+
+
+def build_motion_heavy_world() -> (object, HittableList):
+    """
+    builds the random spheres scene and replaces each of its small spheres with a MovingSphere
+    that moves up to MAX_MOTION units in x, y and z while the shutter is open
+    """
+    camera, world, _ = scenes.build_scene_random_spheres(200, 1.77)
+    moving_world = HittableList()
+    for hittable in world.objects:
+        if isinstance(hittable, Sphere) and hittable.radius < 0.5:
+            center1 = hittable.center + Vec3.random_range(-MAX_MOTION, MAX_MOTION)
+            moving_world.add(MovingSphere(hittable.center, center1, 0.0, 1.0, hittable.radius, hittable.material))
+        elif isinstance(hittable, MovingSphere):
+            center1 = hittable.center0 + Vec3.random_range(-MAX_MOTION, MAX_MOTION)
+            moving_world.add(MovingSphere(hittable.center0, center1, 0.0, 1.0, hittable.radius, hittable.material))
+        else:
+            moving_world.add(hittable)
+    return camera, moving_world
+
+
+def _trace(name: str, bvh: BvhNode, rays):
+    start = time.perf_counter()
+    hits = [bvh.intersect(ray, 0.001, float("inf")) for ray in rays]
+    elapsed = time.perf_counter() - start
+    print(f"{name:22s} {elapsed:8.3f}secs  {sum(1 for h in hits if h)} hits")
+    return [h.t if h else None for h in hits]
+
+
+def main():
+    random.seed(42)
+    camera, world = build_motion_heavy_world()
+    rays = [camera.get_ray(random.random(), random.random()) for _ in range(RAY_COUNT)]
+    print(f"motion heavy random spheres scene, {len(world.objects)} hittables, {RAY_COUNT} camera rays")
+
+    # both BVHs use the same random split axes, so they only differ by their motion bounds
+    random.seed(7)
+    start = time.perf_counter()
+    static_bvh = BvhNode.from_hittable_list(world, 0.0, 1.0, motion_bounds=False)
+    print(f"built bvh without motion bounds in {time.perf_counter() - start:8.3f}secs")
+    random.seed(7)
+    start = time.perf_counter()
+    motion_bvh = BvhNode.from_hittable_list(world, 0.0, 1.0, motion_bounds=True)
+    print(f"built bvh with motion bounds in    {time.perf_counter() - start:8.3f}secs")
+
+    static_ts = _trace("without motion bounds", static_bvh, rays)
+    motion_ts = _trace("with motion bounds", motion_bvh, rays)
+    print(f"identical hits: {static_ts == motion_ts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Benchmarks the any-hit `occluded()` query against a closest-hit `hit()` query, for shadow-ray like
+visibility tests between random points in the scene and a point light.
+
+run from the project's root directory:
+> python -m benchmarks.bench_occlusion
+"""
+import random
+import time
+
+import scenes
+from common import Point3, Ray
+from hittables.bvh_node import BvhNode
+
+RAY_COUNT = 5000
+
+
+def main():
+    random.seed(42)
+    _, world, _ = scenes.build_scene_random_spheres(200, 1.77)
+    bvh = BvhNode.from_hittable_list(world, 0.0, 1.0)
+
+    # shadow rays from random points near the ground towards a light above the scene. The ray
+    # direction is not normalized so that t_max = 1.0 is the light's position
+    light = Point3(0.0, 10.0, 0.0)
+    rays = []
+    for _ in range(RAY_COUNT):
+        origin = Point3(random.uniform(-11.0, 11.0), random.uniform(0.0, 1.0), random.uniform(-11.0, 11.0))
+        rays.append(Ray(origin, light - origin, random.random()))
+
+    print(f"random spheres scene, {len(world.objects)} hittables, {RAY_COUNT} shadow rays")
+
+    start = time.perf_counter()
+    hits = sum(1 for ray in rays if bvh.hit(ray, 0.001, 1.0))
+    elapsed = time.perf_counter() - start
+    print(f"hit()       {elapsed:8.3f}secs  {hits} rays blocked")
+
+    start = time.perf_counter()
+    blocked = sum(1 for ray in rays if bvh.occluded(ray, 0.001, 1.0))
+    elapsed = time.perf_counter() - start
+    print(f"occluded()  {elapsed:8.3f}secs  {blocked} rays blocked")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Traces the camera rays of the random spheres scene through its BVH one ray at a time, and in packets of a few
+sizes, where each BVH node is tested against all the rays of a packet at once.
+
+run from the project's root directory:
+> python -m benchmarks.bench_ray_packets
+"""
+import random
+import time
+
+import scenes
+from common import rng
+from hittables.ray_packet import intersect_packet
+from renderer import MultiprocessRenderer
+
+WIDTH = 80
+SAMPLES = 4
+PACKET_SIZES = (16, 64, 256)
+
+
+def main():
+    camera, world, background = scenes.build_scene_random_spheres(WIDTH, 16.0 / 9.0, random.Random(1))
+    bvh = MultiprocessRenderer(background, 1, 1, 1, seed=1).build_accelerator(world)
+
+    # the camera rays of each row, SAMPLES per pixel
+    rows = []
+    for row in range(camera.image_height):
+        rng.select_stream(1, row)
+        rays = []
+        for col in range(camera.image_width):
+            for _ in range(SAMPLES):
+                u = (col + rng.random()) / (camera.image_width - 1)
+                v = (row + rng.random()) / (camera.image_height - 1)
+                rays.append(camera.get_ray(u, v))
+        rows.append(rays)
+    count = sum(len(rays) for rays in rows)
+
+    start = time.perf_counter()
+    for rays in rows:
+        for r in rays:
+            bvh.intersect(r, 0.001, float("inf"))
+    print(f"{count} rays, one by one: {time.perf_counter() - start:6.2f}s")
+
+    for size in PACKET_SIZES:
+        start = time.perf_counter()
+        for rays in rows:
+            for first in range(0, len(rays), size):
+                intersect_packet(bvh, rays[first:first + size], 0.001, float("inf"))
+        print(f"{count} rays, packets of {size:3d}: {time.perf_counter() - start:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Compares the samplers by the error of small renders of the random spheres scene, which has motion blur,
+glass and metal, against a reference render taken with many more samples per pixel. The error is the RMS
+difference to the reference, the lower the better, and the render time is per image.
+
+run from the project's root directory:
+> python -m benchmarks.bench_samplers
+"""
+import random
+import time
+
+import numpy as np
+
+import scenes
+from hittables.bvh_node import BvhNode
+from renderer import MultiprocessRenderer, SAMPLERS
+
+WIDTH = 32
+ASPECT_RATIO = 16.0 / 9.0
+REFERENCE_SAMPLES = 256
+SAMPLES = (4, 16, 64)
+
+
+def render(camera, world, background, samples_per_pixel: int, sampler: str, seed: int) -> np.ndarray:
+    renderer = MultiprocessRenderer(background, 10, samples_per_pixel, 1, seed=seed, sampler=sampler)
+    sums = np.array([renderer.render_scanline(row, world, camera)[1] for row in range(camera.image_height)])
+    return MultiprocessRenderer.post_process(sums, samples_per_pixel)
+
+
+def main():
+    camera, world, background = scenes.build_scene_random_spheres(WIDTH, ASPECT_RATIO, random.Random(1))
+    bvh = BvhNode.from_hittable_list(world, 0.0, 1.0, rng=random.Random(1))
+
+    start = time.perf_counter()
+    reference = render(camera, bvh, background, REFERENCE_SAMPLES, "sobol", 99)
+    print(f"reference, {REFERENCE_SAMPLES} spp, {camera.image_width}x{camera.image_height}: "
+          f"{time.perf_counter() - start:.1f}s")
+
+    for samples_per_pixel in SAMPLES:
+        for sampler in SAMPLERS:
+            start = time.perf_counter()
+            image = render(camera, bvh, background, samples_per_pixel, sampler, 7)
+            elapsed = time.perf_counter() - start
+            error = np.sqrt(np.mean((image - reference) ** 2))
+            print(f"{samples_per_pixel:4d} spp {sampler:>12s}: rms error {error:.4f}  {elapsed:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Benchmarks loading a large scene file. A scene of randomly placed spheres, with a few materials, is written
+twice: once with every sphere as a separate "sphere" object and once as a single "spheres" array object.
+Both files are then loaded with `scenes.load_scene`, and the number of distinct materials is reported,
+identical materials are built only once.
+
+run from the project's root directory:
+> python -m benchmarks.bench_scene_loader [sphere_count]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from scenes import load_scene
+
+SPHERE_COUNT = 200000
+
+MATERIALS = [
+    {"type": "lambertian", "albedo": [0.73, 0.73, 0.73]},
+    {"type": "lambertian", "albedo": [0.65, 0.05, 0.05]},
+    {"type": "metal", "albedo": [0.8, 0.8, 0.9], "fuzz": 0.1},
+    {"type": "dielectric", "ref_idx": 1.5},
+]
+
+CAMERA = {"look_from": [0.0, 0.0, -100.0], "look_at": [0.0, 0.0, 0.0], "vertical_fov": 40.0}
+
+
+def write_scenes(directory: str, count: int) -> (str, str):
+    """
+    writes the same scene of `count` spheres as separate objects and as a "spheres" array
+    :return: the paths of the two scene files
+    """
+    random.seed(7)
+    centers = [[random.uniform(-50.0, 50.0) for _ in range(3)] for _ in range(count)]
+    material_ids = [random.randrange(len(MATERIALS)) for _ in range(count)]
+
+    objects_path = os.path.join(directory, "objects.json")
+    with open(objects_path, "w") as scene_file:
+        # every sphere spells out its material, as a generated scene would
+        objects = [{"type": "sphere", "center": center, "radius": 0.2, "material": MATERIALS[material_id]}
+                   for center, material_id in zip(centers, material_ids)]
+        json.dump({"camera": CAMERA, "background": [0.0, 0.0, 0.0], "objects": objects}, scene_file)
+
+    array_path = os.path.join(directory, "array.json")
+    with open(array_path, "w") as scene_file:
+        spheres = {"type": "spheres", "centers": centers, "radii": 0.2, "materials": MATERIALS,
+                   "material_ids": material_ids}
+        json.dump({"camera": CAMERA, "background": [0.0, 0.0, 0.0], "objects": [spheres]}, scene_file)
+    return objects_path, array_path
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else SPHERE_COUNT
+    with tempfile.TemporaryDirectory() as directory:
+        for path in write_scenes(directory, count):
+            start = time.perf_counter()
+            _, world, _ = load_scene(path, 480, 1.77)
+            secs = time.perf_counter() - start
+            materials = len({id(sphere.material) for sphere in world.objects})
+            print(f"{os.path.basename(path):>13} {os.path.getsize(path) / 1e6:6.1f}MB, "
+                  f"{len(world.objects)} spheres, {materials} materials, loaded in {secs:8.3f}secs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Reports the pickled size of each pre-built scene, which is sent to every worker process, and the number
+of distinct material objects in it. Every scene is built twice, with the scene builders interning
+their textures and materials, and with interning turned off, so each sphere gets materials of its own.
+
+run from the project's root directory:
+> python -m benchmarks.bench_scene_pickle
+"""
+import pickle
+import random
+
+import scenes
+from materials import Material
+from scenes import scene_builder
+
+BUILDERS = [
+    scenes.build_scene_random_spheres,
+    scenes.build_scene_two_perlin_spheres,
+    scenes.build_earth_scene,
+    scenes.build_scene_cornell_box_with_two_boxes,
+    scenes.build_scene_cornell_smoke_boxes,
+    scenes.build_scene_final,
+]
+
+
+class NoInterning:
+    """
+    stands in for the scene builders' registry, and doesn't share anything
+    """
+
+    @staticmethod
+    def intern(value):
+        return value
+
+    def clear(self):
+        pass
+
+
+def count_materials(root) -> int:
+    """
+    :return: the number of distinct Material objects reachable from `root`
+    """
+    seen = set()
+    materials = 0
+    stack = [root]
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        if isinstance(value, Material):
+            materials += 1
+        if isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif hasattr(value, "__dict__"):
+            stack.extend(vars(value).values())
+    return materials
+
+
+def main():
+    registry = scene_builder.REGISTRY
+    for builder in BUILDERS:
+        results = []
+        for interning in (NoInterning(), registry):
+            scene_builder.REGISTRY = interning
+            random.seed(1)
+            _, world, _ = builder(480, 1.77)
+            results.append((len(pickle.dumps(world)), count_materials(world)))
+        scene_builder.REGISTRY = registry
+        (size, materials), (interned_size, interned_materials) = results
+        print(f"{builder.__name__:>40}: {size / 1e3:9.1f}KB {materials:5} materials, "
+              f"interned {interned_size / 1e3:9.1f}KB {interned_materials:5} materials")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmarks loading, building and tracing a large TriangleMesh. A tessellated sphere is written to a
+temporary .OBJ file (as quads, which the loader triangulates) and then loaded with `TriangleMesh.from_obj`.
+The peak memory allocated while loading and building is reported along with the size of the mesh's arrays.
+The mesh is then saved to a binary cache, and opening that (memory-mapped) cache is timed, along with the
+size of a pickled mesh, as sent to worker processes, with and without the cache.
+
+run from the project's root directory:
+> python -m benchmarks.bench_triangle_mesh [triangle_count]
+"""
+import math
+import os
+import pickle
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from common import Point3, Vec3, Ray
+from hittables.primitives import TriangleMesh
+from materials import Lambertian
+
+TRIANGLE_COUNT = 1000000
+RAY_COUNT = 2000
+
+
+def write_sphere_obj(path: str, triangle_count: int):
+    """
+    writes a unit sphere made of about `triangle_count` triangles, as quads, to an .OBJ file
+    """
+    segments = max(int(math.sqrt(triangle_count / 4.0)), 3)
+    rings = 2 * segments
+    with open(path, "w") as obj_file:
+        obj_file.write("# tessellated unit sphere\n")
+        for i in range(segments + 1):
+            theta = math.pi * i / segments
+            for j in range(rings):
+                phi = 2.0 * math.pi * j / rings
+                obj_file.write(f"v {math.sin(theta) * math.cos(phi):.6f} {math.cos(theta):.6f} "
+                               f"{math.sin(theta) * math.sin(phi):.6f}\n")
+        for i in range(segments):
+            for j in range(rings):
+                a = i * rings + j + 1
+                b = i * rings + (j + 1) % rings + 1
+                obj_file.write(f"f {a} {b} {b + rings} {a + rings}\n")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else TRIANGLE_COUNT
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sphere.obj")
+        write_sphere_obj(path, count)
+        print(f"OBJ file of {os.path.getsize(path) / 1e6:.1f}MB")
+
+        material = Lambertian.from_color(0.5, 0.5, 0.5)
+        start = time.perf_counter()
+        mesh = TriangleMesh.from_obj(path, material)
+        load_secs = time.perf_counter() - start
+
+        # tracing allocations slows loading down, so the peak is measured by loading the file again
+        tracemalloc.start()
+        TriangleMesh.from_obj(path, material)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        cache_dir = os.path.join(directory, "cache")
+        TriangleMesh.from_obj(path, material, cache_dir=cache_dir)
+        start = time.perf_counter()
+        cached = TriangleMesh.from_obj(path, material, cache_dir=cache_dir)
+        cached_secs = time.perf_counter() - start
+        cached_pickle_size = len(pickle.dumps(cached))
+        del cached
+
+    arrays = [mesh.vertices, mesh.indices, mesh.node_bounds, mesh.node_links, mesh._v0, mesh._e1, mesh._e2]
+    print(f"{len(mesh)} triangles, {len(mesh.node_links)} BVH nodes")
+    print(f"load and build {load_secs:8.3f}secs, peak allocated {peak / 1e6:.1f}MB, "
+          f"mesh arrays {sum(a.nbytes for a in arrays) / 1e6:.1f}MB")
+    print(f"open cached     {cached_secs:8.3f}secs, pickled {len(pickle.dumps(mesh)) / 1e6:.1f}MB, "
+          f"pickled cached {cached_pickle_size / 1e3:.1f}KB")
+
+    random.seed(3)
+    # rays from outside the sphere, aimed at random points inside it
+    rays = []
+    for _ in range(RAY_COUNT):
+        origin = 3.0 * Vec3.random_unit_vector()
+        rays.append(Ray(origin, Point3.random_range(-0.7, 0.7) - origin))
+    start = time.perf_counter()
+    hits = sum(1 for ray in rays if mesh.hit(ray, 0.001, float("inf")))
+    print(f"traced {RAY_COUNT} rays ({hits} hits) in {time.perf_counter() - start:8.3f}secs")
+
+
+if __name__ == "__main__":
+    main()
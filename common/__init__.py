@@ -1,4 +1,7 @@
 from .base import clamp, degrees_to_radians, save_as_png_image, save_as_ppm_image, NDArrayObject, NDArrayFloat
+from . import rng
 from .vec3 import Vec3, Point3, ColorRgb
 from .ray import Ray
 from .camera import Camera, CameraBuilder
+from .interning import InternRegistry
+from .hashing import content_hash
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import math
-import random
 from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
 
 import common
+from common import rng
 from common import Ray
 from common import Vec3, Point3
 
@@ -52,10 +55,50 @@ class Camera:
         direction = self.lower_left_corner + (s * self.horizontal) + (t * self.vertical) - self.look_from - offset
 
         # generate a random amount of time to open this camera's shutter
-        shutter_open = random.uniform(self.open_time, self.close_time)
+        shutter_open = rng.uniform(self.open_time, self.close_time)
 
         return Ray(self.look_from + offset, direction, shutter_open)
 
+    def get_rays(self, s: np.ndarray, t: np.ndarray, lens: Optional[np.ndarray] = None,
+                 shutter: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        gets many Rays at once, for example all the samples of a row of pixels. Ray `i` is the one `get_ray(s[i],
+        t[i])` returns when it draws `lens[i]` for its point on the lens and `shutter[i]` for its shutter time.
+        The lens is skipped for pinhole cameras, and the shutter for cameras whose shutter opens and closes
+        at the same time
+        :param s: the horizontal offsets, shape (n,)
+        :param t: the vertical offsets, shape (n,)
+        :param lens: the two random numbers, in the range [0, 1), that choose the point on the lens of each ray,
+        shape (n, 2). Only needed if the camera has a lens
+        :param shutter: the random number, in the range [0, 1), that chooses the time of each ray, shape (n,).
+        Only needed if the shutter is open for some time
+        :return: (origins, directions, times) of the rays, of shapes (n, 3), (n, 3) and (n,)
+        """
+        look_from = _array(self.look_from)
+        # the same operations, in the same order, as get_ray()
+        directions = _array(self.lower_left_corner) + s[:, np.newaxis] * _array(self.horizontal) + \
+            t[:, np.newaxis] * _array(self.vertical) - look_from
+        if self.lens_radius != 0.0:
+            # the same point on the unit disk as Vec3.random_in_unit_disk()
+            r = np.sqrt(lens[:, 0])
+            a = 2.0 * math.pi * lens[:, 1]
+            offsets = _array(self.u) * (self.lens_radius * (r * np.cos(a)))[:, np.newaxis] + \
+                _array(self.v) * (self.lens_radius * (r * np.sin(a)))[:, np.newaxis]
+            origins = look_from + offsets
+            directions = directions - offsets
+        else:
+            origins = np.broadcast_to(look_from, directions.shape)
+
+        if self.open_time != self.close_time:
+            times = self.open_time + (self.close_time - self.open_time) * shutter
+        else:
+            times = np.full(len(s), self.open_time)
+        return origins, directions, times
+
+
+def _array(v: Vec3) -> np.ndarray:
+    return np.array([v.x, v.y, v.z])
+
 
 class CameraBuilder:
     """
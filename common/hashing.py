@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import array
+import hashlib
+import struct
+from typing import Dict
+
+import numpy as np
+
+from common import Vec3
+
+
+def content_hash(*values) -> str:
+    """
+    returns a stable hash of the contents of the given values, for example of a scene's camera, hittables
+    and background. It is the same in every run of the raytracer for values with the same contents, so it
+    can be used as a cache key, or to check that a seeded scene is reproduced exactly.
+
+    Objects are hashed by their class name and their public attributes, underscore prefixed attributes
+    hold caches and other derived data, so they are skipped. Floats are hashed exactly
+    :return: the hash, as a hex string
+    """
+    hasher = _ContentHasher()
+    return hashlib.sha256(b"".join(hasher.digest(value) for value in values)).hexdigest()
+
+
+class _ContentHasher:
+
+    def __init__(self):
+        # the digest of every object hashed so far, by id, so objects shared by many hittables, like
+        # materials, are only walked once
+        self._digests: Dict[int, bytes] = {}
+
+    def digest(self, value) -> bytes:
+        """
+        :return: the sha256 digest of `value`'s contents
+        """
+        if value is None or isinstance(value, (bool, int, str)):
+            return hashlib.sha256(f"{type(value).__name__}:{value}".encode()).digest()
+        if isinstance(value, float):
+            return hashlib.sha256(b"float:" + struct.pack("<d", value)).digest()
+        digest = self._digests.get(id(value))
+        if digest is not None:
+            return digest
+
+        hasher = hashlib.sha256()
+        if isinstance(value, Vec3):
+            hasher.update(b"Vec3:" + struct.pack("<3d", value.x, value.y, value.z))
+        elif isinstance(value, (tuple, list)):
+            hasher.update(b"list:")
+            for item in value:
+                hasher.update(self.digest(item))
+        elif isinstance(value, dict):
+            hasher.update(b"dict:")
+            for key in sorted(value):
+                hasher.update(self.digest(key) + self.digest(value[key]))
+        elif isinstance(value, np.ndarray):
+            hasher.update(f"ndarray:{value.dtype.str}:{value.shape}:".encode())
+            hasher.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, array.array):
+            hasher.update(f"array:{value.typecode}:".encode() + value.tobytes())
+        else:
+            hasher.update(f"{type(value).__module__}.{type(value).__qualname__}:".encode())
+            for name, item in sorted(vars(value).items()):
+                if not name.startswith("_"):
+                    hasher.update(name.encode() + self.digest(item))
+        digest = hasher.digest()
+        # everything hashed is reachable from the hashed values, so ids aren't reused while hashing
+        self._digests[id(value)] = digest
+        return digest
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import array
+import hashlib
+from typing import Any, Dict, Hashable, TypeVar
+
+import numpy as np
+
+from common import Vec3
+
+T = TypeVar("T")
+
+
+class InternRegistry:
+    """
+    An InternRegistry holds one instance of each distinct value given to it, so that equal textures and
+    materials (flyweights) are shared by all the hittables using them, instead of each hittable holding a
+    copy. Sharing makes a scene smaller in memory, and much smaller when it is pickled and sent to worker
+    processes, because pickle writes a shared object once.
+
+    Values are compared by their type and (recursively) by the values of their attributes. Interned
+    objects are shared, so they must not be modified
+    """
+
+    def __init__(self):
+        self._interned: Dict[Hashable, Any] = {}
+        # the key of every interned object, by id, so nested interned objects aren't walked again
+        self._keys: Dict[int, Hashable] = {}
+
+    def intern(self, value: T) -> T:
+        """
+        :return: the interned object equal to `value`. This is `value` itself the first time a value equal
+        to it is interned
+        """
+        key = self._key(value)
+        interned = self._interned.get(key)
+        if interned is None:
+            self._interned[key] = value
+            self._keys[id(value)] = key
+            interned = value
+        return interned
+
+    def clear(self):
+        """
+        forgets all the interned objects
+        """
+        self._interned.clear()
+        self._keys.clear()
+
+    def __len__(self) -> int:
+        return len(self._interned)
+
+    def _key(self, value) -> Hashable:
+        """
+        :return: a hashable key that is equal for equal values
+        """
+        key = self._keys.get(id(value))
+        if key is not None and self._interned.get(key) is value:
+            return key
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, Vec3):
+            return Vec3, value.x, value.y, value.z
+        if isinstance(value, (tuple, list)):
+            return type(value), tuple(self._key(item) for item in value)
+        if isinstance(value, np.ndarray):
+            # large arrays, like the pixels of an image, are keyed by a digest of their contents
+            return np.ndarray, value.dtype.str, value.shape, hashlib.sha256(np.ascontiguousarray(value)).digest()
+        if isinstance(value, array.array):
+            return array.array, value.typecode, value.tobytes()
+        return type(value), tuple((name, self._key(item)) for name, item in sorted(vars(value).items()))
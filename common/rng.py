@@ -0,0 +1,142 @@
+"""
+Counter-based random number streams, used for everything drawn while rendering a sample: pixel jitter,
+camera rays, material scattering and participating media.
+
+A stream is identified by a 64-bit key, derived from a seed and any number of integer coordinates,
+for example (seed, pixel, sample). Its n-th number is SplitMix64's output function applied to
+`key + n ⋅ γ`, so it is a pure function of the key and the counter n. Streams need no state other than
+their counter, any stream can be created anywhere, for example in a worker process, and two streams
+with different keys are statistically independent. Renders seeded this way are reproducible
+regardless of which process renders which pixel, in which order, on how many cores.
+
+The renderer selects the stream of each sample with `select_stream()`, and the module level
+`random()` and `uniform()` functions draw from the selected stream. Before any stream is selected they
+draw from the stream of seed 0. A sampler, see `common.sampler`, can provide the first numbers drawn
+after selecting a stream, the sample's first dimensions, instead of the stream.
+"""
+from __future__ import annotations
+
+from typing import Callable, Optional
+
+MASK64 = (1 << 64) - 1
+# SplitMix64's increment, the odd integer closest to 2^64 / φ
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+# converts the top 53 bits of a 64-bit integer to a float in [0, 1)
+DOUBLE_UNIT = 1.0 / (1 << 53)
+
+
+def mix64(z: int) -> int:
+    """
+    SplitMix64's output function, a bijective mix of the bits of the 64-bit integer `z`
+    """
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def stream_key(seed: int, *coordinates: int) -> int:
+    """
+    :return: the key of the stream identified by `seed` and `coordinates`, for example a pixel index and
+    a sample number
+    """
+    key = mix64((seed * GOLDEN_GAMMA) & MASK64)
+    for coordinate in coordinates:
+        key = mix64((key ^ mix64((coordinate + GOLDEN_GAMMA) & MASK64)) & MASK64)
+    return key
+
+
+class RngStream:
+    """
+    A single counter-based random number stream, see this module's documentation
+    """
+    __slots__ = ("key", "counter")
+
+    def __init__(self, seed: int, *coordinates: int):
+        self.key = stream_key(seed, *coordinates)
+        self.counter = 0
+
+    def random(self) -> float:
+        """
+        :return: the next float of this stream, in the range [0, 1)
+        """
+        self.counter += 1
+        return (mix64((self.key + self.counter * GOLDEN_GAMMA) & MASK64) >> 11) * DOUBLE_UNIT
+
+    def uniform(self, a: float, b: float) -> float:
+        """
+        :return: the next float of this stream, scaled to the range [a, b)
+        """
+        return a + (b - a) * self.random()
+
+
+# the selected stream's key plus its counter times GOLDEN_GAMMA, which is all random() needs
+_state = stream_key(0)
+# the first _prefix_dimensions numbers drawn after selecting a stream are _prefix(0), _prefix(1), ...
+_prefix: Optional[Callable[[int], float]] = None
+_prefix_dimensions = 0
+_dimension = 0
+
+
+def select_stream(seed: int, *coordinates: int, prefix: Optional[Callable[[int], float]] = None,
+                  prefix_dimensions: int = 0):
+    """
+    makes the stream identified by `seed` and `coordinates` the one `random()` and `uniform()` draw from,
+    starting from its first number
+    :param prefix: returns the value of a dimension, in the range [0, 1), used for the first
+    `prefix_dimensions` numbers drawn instead of the stream
+    :param prefix_dimensions: the number of dimensions taken from `prefix`
+    """
+    global _state, _prefix, _prefix_dimensions, _dimension
+    _state = stream_key(seed, *coordinates)
+    _prefix = prefix
+    _prefix_dimensions = prefix_dimensions if prefix is not None else 0
+    _dimension = 0
+
+
+def getstate() -> tuple:
+    """
+    :return: the selected stream and its position, which `setstate()` restores. The renderer uses it to
+    generate the camera rays of many samples first, and continue drawing each sample's numbers later
+    """
+    return _state, _prefix, _prefix_dimensions, _dimension
+
+
+def setstate(state: tuple):
+    """
+    restores the selected stream, and its position, returned by `getstate()`
+    """
+    global _state, _prefix, _prefix_dimensions, _dimension
+    _state, _prefix, _prefix_dimensions, _dimension = state
+
+
+def skip(count: int):
+    """
+    skips the next `count` numbers of the selected stream, as if they were drawn, for example because they were
+    already generated all at once by `common.sampler.Sampler.sample_array()`
+    """
+    global _state, _dimension
+    prefix = max(0, min(count, _prefix_dimensions - _dimension))
+    _dimension += prefix
+    _state = (_state + (count - prefix) * GOLDEN_GAMMA) & MASK64
+
+
+def random() -> float:
+    """
+    :return: the next float of the selected stream, in the range [0, 1)
+    """
+    global _state, _dimension
+    if _dimension < _prefix_dimensions:
+        _dimension += 1
+        return _prefix(_dimension - 1)
+    # the same as RngStream.random(), with the constants inlined, this is called for every random number
+    z = _state = (_state + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    return ((z ^ (z >> 31)) >> 11) * DOUBLE_UNIT
+
+
+def uniform(a: float, b: float) -> float:
+    """
+    :return: the next float of the selected stream, scaled to the range [a, b)
+    """
+    return a + (b - a) * random()
@@ -0,0 +1,333 @@
+"""
+Samplers generate the random numbers of every sample of every pixel. The numbers a sample draws, through
+`common.rng`, are its dimensions, in the order they are drawn: the pixel offset (0 and 1), the camera lens
+(2 and 3), the shutter time (4) and then whatever the hit materials and media draw, bounce after bounce.
+
+The first `dimensions` dimensions of a sample come from the sampler, and the rest from the sample's
+counter-based random stream. The low discrepancy samplers spread the samples of a pixel evenly
+through those first dimensions, which makes images converge with fewer samples per pixel than
+independent random numbers do.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from functools import partial
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from common import rng
+from common.rng import stream_key, mix64, GOLDEN_GAMMA, MASK64, DOUBLE_UNIT
+
+# the number of sample dimensions the low discrepancy samplers generate: pixel, lens, time and the first bounce
+DIMENSIONS = 8
+
+# the bases of the Halton sequence's dimensions
+PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53)
+
+# Sobol direction numbers from Joe and Kuo's new-joe-kuo-6.21201, (degree s, coefficients a, initial m values)
+# of dimensions 2 to 16, dimension 1 is the van der Corput sequence
+_SOBOL_PARAMETERS = (
+    (1, 0, (1,)),
+    (2, 1, (1, 3)),
+    (3, 1, (1, 3, 1)),
+    (3, 2, (1, 1, 1)),
+    (4, 1, (1, 1, 3, 3)),
+    (4, 4, (1, 3, 5, 13)),
+    (5, 2, (1, 1, 5, 5, 17)),
+    (5, 4, (1, 1, 5, 5, 5)),
+    (5, 7, (1, 1, 7, 11, 19)),
+    (5, 11, (1, 1, 5, 1, 1)),
+    (5, 13, (1, 1, 1, 3, 11)),
+    (5, 14, (1, 3, 5, 5, 31)),
+    (6, 1, (1, 3, 3, 9, 7, 49)),
+    (6, 13, (1, 1, 1, 15, 21, 21)),
+    (6, 16, (1, 3, 1, 13, 27, 49)),
+)
+SOBOL_BITS = 32
+
+
+class Sampler(ABC):
+    """
+    The base class of samplers. Call `start_sample()` before drawing the numbers of a sample.
+
+    Samplers generate the dimensions of `block_size` consecutive samples of a pixel at once, with numpy, and
+    the renderer draws the samples of a pixel one after another, so most samples are looked up in the last block
+    """
+    block_size = 16
+
+    def __init__(self, seed: int, dimensions: int = DIMENSIONS):
+        """
+        :param seed: the seed of the sampler's scrambling and of the samples' random streams
+        :param dimensions: the number of dimensions of each sample generated by this sampler
+        """
+        self.seed = seed
+        self.dimensions = dimensions
+        # the last block of samples generated, and its (pixel, block number)
+        self._block: List[List[float]] = []
+        self._block_id: Optional[Tuple[int, int]] = None
+
+    def start_sample(self, pixel: int, index: int):
+        """
+        makes `common.rng` draw the numbers of sample `index` of the pixel `pixel`
+        """
+        rng.select_stream(self.seed, pixel, index, prefix=partial(self.sample, pixel, index),
+                          prefix_dimensions=self.dimensions)
+
+    def sample(self, pixel: int, index: int, dimension: int) -> float:
+        """
+        :return: the value, in the range [0, 1), of the given dimension of sample `index` of the pixel `pixel`
+        """
+        block, offset = divmod(index, self.block_size)
+        if (pixel, block) != self._block_id:
+            self._block = self.sample_block(pixel, block).tolist()
+            self._block_id = pixel, block
+        return self._block[offset][dimension]
+
+    def sample_array(self, pixel: int, count: int, dimensions: int) -> np.ndarray:
+        """
+        generates the first `dimensions` dimensions of the samples 0 to `count` of the pixel `pixel` all at once,
+        the same numbers that `common.rng` draws after `start_sample()`: from this sampler, and past its
+        dimensions, from each sample's random stream
+        :return: an array of shape (count, dimensions)
+        """
+        values = np.empty((count, dimensions))
+        prefix = min(self.dimensions, dimensions)
+        if prefix:
+            blocks = [self.sample_block(pixel, block) for block in range(-(-count // self.block_size))]
+            values[:, :prefix] = np.concatenate(blocks)[:count, :prefix]
+        if dimensions > prefix:
+            keys = np.array([stream_key(self.seed, pixel, index) for index in range(count)], dtype=np.uint64)
+            for dimension in range(prefix, dimensions):
+                counter = np.uint64(((dimension - prefix + 1) * GOLDEN_GAMMA) & MASK64)
+                values[:, dimension] = to_unit_float(mix64_array(keys + counter))
+        return values
+
+    @abstractmethod
+    def sample_block(self, pixel: int, block: int) -> np.ndarray:
+        """
+        :return: the dimensions of the samples `block * block_size` to `(block + 1) * block_size` of the pixel
+        `pixel`, an array of shape (block_size, dimensions)
+        """
+        pass
+
+    def dimension_keys(self, pixel: int) -> np.ndarray:
+        """
+        :return: a random 64-bit key for each dimension of the given pixel, and one more for the pixel itself
+        """
+        pixel_key = stream_key(self.seed, pixel)
+        return np.array([mix64((pixel_key + (dimension + 1) * GOLDEN_GAMMA) & MASK64)
+                         for dimension in range(self.dimensions + 1)], dtype=np.uint64)
+
+
+class IndependentSampler(Sampler):
+    """
+    Draws every dimension from the sample's random stream, all samples are independent
+    """
+
+    def __init__(self, seed: int):
+        super().__init__(seed, 0)
+
+    def sample(self, pixel: int, index: int, dimension: int) -> float:
+        key = stream_key(self.seed, pixel, index)
+        return (mix64((key + (dimension + 1) * GOLDEN_GAMMA) & MASK64) >> 11) * DOUBLE_UNIT
+
+    def sample_block(self, pixel: int, block: int) -> np.ndarray:
+        return np.empty((self.block_size, 0))
+
+
+class StratifiedSampler(Sampler):
+    """
+    Divides each dimension into `samples_per_pixel` equal strata and puts one sample, jittered, into each.
+    The strata are shuffled independently for every dimension and pixel, so dimensions are uncorrelated.
+    Samples past `samples_per_pixel` start another set of strata
+    """
+
+    def __init__(self, seed: int, samples_per_pixel: int, dimensions: int = DIMENSIONS):
+        super().__init__(seed, dimensions)
+        self.samples_per_pixel = samples_per_pixel
+        # a block is a set of strata
+        self.block_size = samples_per_pixel
+
+    def sample_block(self, pixel: int, block: int) -> np.ndarray:
+        keys = self.dimension_keys(pixel)[:self.dimensions]
+        if block:
+            keys = mix64_array(keys ^ np.uint64(mix64((block * GOLDEN_GAMMA) & MASK64)))
+        indices = np.arange(self.samples_per_pixel, dtype=np.uint32)[:, np.newaxis]
+        strata = permute(indices, self.samples_per_pixel, (keys & np.uint64(0xFFFFFFFF)).astype(np.uint32))
+        counters = (indices + 1).astype(np.uint64) * np.uint64(GOLDEN_GAMMA)
+        jitter = to_unit_float(mix64_array(keys + counters))
+        return (strata + jitter) / self.samples_per_pixel
+
+
+class HaltonSampler(Sampler):
+    """
+    The Halton sequence, dimension d is the radical inverse of the sample index in the base of the d-th prime.
+    Every pixel's sequence is shifted by a random offset per dimension (Cranley-Patterson rotation)
+    """
+
+    def __init__(self, seed: int, dimensions: int = DIMENSIONS):
+        if dimensions > len(PRIMES):
+            raise RuntimeError(f"the Halton sampler has at most {len(PRIMES)} dimensions")
+        super().__init__(seed, dimensions)
+
+    def sample_block(self, pixel: int, block: int) -> np.ndarray:
+        offsets = to_unit_float(self.dimension_keys(pixel)[:self.dimensions])
+        indices = np.arange(block * self.block_size, (block + 1) * self.block_size)[:, np.newaxis]
+        values = radical_inverse(np.array(PRIMES[:self.dimensions]), indices) + offsets
+        return np.where(values >= 1.0, values - 1.0, values)
+
+
+class SobolSampler(Sampler):
+    """
+    The Sobol sequence, with Owen scrambling: every pixel gets its own random, nested, permutation of the
+    digits of each dimension, and of the sample indices. Scrambling keeps the sequence's stratification, the
+    first 2^m samples of a pixel still fall into distinct intervals of size 1/2^m in every dimension
+    """
+
+    def __init__(self, seed: int, dimensions: int = DIMENSIONS):
+        if dimensions > len(_SOBOL_MATRICES):
+            raise RuntimeError(f"the Sobol sampler has at most {len(_SOBOL_MATRICES)} dimensions")
+        super().__init__(seed, dimensions)
+
+    def sample_block(self, pixel: int, block: int) -> np.ndarray:
+        seeds = (self.dimension_keys(pixel) & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+        indices = np.arange(block * self.block_size, (block + 1) * self.block_size, dtype=np.uint32)
+        # the pixel's key shuffles the sample indices
+        indices = nested_uniform_scramble(indices, seeds[-1])
+        x = nested_uniform_scramble(sobol(indices, self.dimensions), seeds[:-1])
+        return x * (1.0 / (1 << SOBOL_BITS))
+
+
+def mix64_array(z: np.ndarray) -> np.ndarray:
+    """
+    `common.rng.mix64()` applied to each element of the uint64 array `z`
+    """
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def to_unit_float(z: np.ndarray) -> np.ndarray:
+    """
+    converts the top 53 bits of each element of the uint64 array `z` to a float in [0, 1)
+    """
+    return (z >> np.uint64(11)).astype(np.float64) * DOUBLE_UNIT
+
+
+def permute(i: np.ndarray, length: int, p: np.ndarray) -> np.ndarray:
+    """
+    returns the elements at `i` of the pseudo-random permutations of [0, length) selected by `p`, using Kensler's
+    hash based permutation from "Correlated Multi-Jittered Sampling". `i` and `p` are uint32 arrays, broadcast
+    against each other
+    """
+    w = length - 1
+    w |= w >> 1
+    w |= w >> 2
+    w |= w >> 4
+    w |= w >> 8
+    w |= w >> 16
+    w = np.uint32(w)
+    i, p = np.broadcast_arrays(i, p)
+    shape = i.shape
+    out = i.ravel().copy()
+    p = p.ravel()
+    todo = np.arange(out.size)
+    while todo.size:
+        # the hash is a bijection on the bits of w, so walking its cycle always gets back into [0, length)
+        x = out[todo]
+        q = p[todo]
+        x ^= q
+        x *= np.uint32(0xe170893d)
+        x ^= q >> np.uint32(16)
+        x ^= (x & w) >> np.uint32(4)
+        x ^= q >> np.uint32(8)
+        x *= np.uint32(0x0929eb3f)
+        x ^= q >> np.uint32(23)
+        x ^= (x & w) >> np.uint32(1)
+        x *= np.uint32(1) | q >> np.uint32(27)
+        x *= np.uint32(0x6935fa69)
+        x ^= (x & w) >> np.uint32(11)
+        x *= np.uint32(0x74dcb303)
+        x ^= (x & w) >> np.uint32(2)
+        x *= np.uint32(0x9e501cc3)
+        x ^= (x & w) >> np.uint32(2)
+        x *= np.uint32(0xc860a3df)
+        x &= w
+        x ^= x >> np.uint32(5)
+        out[todo] = x
+        todo = todo[x >= length]
+    return ((out.astype(np.uint64) + p) % np.uint64(length)).reshape(shape)
+
+
+def radical_inverse(bases: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """
+    :return: the digits of each of the integers `n`, in each of the given bases, mirrored around the radix point
+    """
+    n, bases = np.broadcast_arrays(n, bases)
+    inverse_bases = 1.0 / bases
+    factors = inverse_bases.copy()
+    result = np.zeros(n.shape)
+    while n.any():
+        n, digits = np.divmod(n, bases)
+        result += digits * factors
+        factors *= inverse_bases
+    return np.minimum(result, 1.0 - 2.0 ** -53)
+
+
+def sobol(indices: np.ndarray, dimensions: int) -> np.ndarray:
+    """
+    :return: the first `dimensions` dimensions of the Sobol points at the uint32 `indices`, as SOBOL_BITS-bit
+    integers, an array of shape (len(indices), dimensions)
+    """
+    bits = (indices[:, np.newaxis] >> np.arange(SOBOL_BITS, dtype=np.uint32)) & np.uint32(1)
+    directions = np.where(bits[:, np.newaxis, :] == 1, _SOBOL_MATRICES[np.newaxis, :dimensions, :], np.uint32(0))
+    return np.bitwise_xor.reduce(directions, axis=2)
+
+
+def nested_uniform_scramble(x: np.ndarray, seed) -> np.ndarray:
+    """
+    Owen scrambles the uint32 array `x`, using Burley's hash based scramble from "Practical Hash-based Owen
+    Scrambling". Each bit is flipped, or not, depending on the seed and all the bits above it
+    """
+    x = reverse_bits(x)
+    x = x + seed
+    x ^= x * np.uint32(0x6c50b47c)
+    x ^= x * np.uint32(0xb82f1e52)
+    x ^= x * np.uint32(0xc7afe638)
+    x ^= x * np.uint32(0x8d22f6e6)
+    return reverse_bits(x)
+
+
+_REVERSED_BYTES = np.array([int(f"{byte:08b}"[::-1], 2) for byte in range(256)], dtype=np.uint32)
+
+
+def reverse_bits(x: np.ndarray) -> np.ndarray:
+    """
+    :return: the uint32 array `x` with the order of the bits of each element reversed
+    """
+    return (_REVERSED_BYTES[x & np.uint32(0xFF)] << np.uint32(24) |
+            _REVERSED_BYTES[(x >> np.uint32(8)) & np.uint32(0xFF)] << np.uint32(16) |
+            _REVERSED_BYTES[(x >> np.uint32(16)) & np.uint32(0xFF)] << np.uint32(8) |
+            _REVERSED_BYTES[x >> np.uint32(24)])
+
+
+def _sobol_matrices() -> np.ndarray:
+    """
+    :return: the direction numbers of each dimension of the Sobol sequence, SOBOL_BITS-bit integers,
+    an array of shape (dimensions, SOBOL_BITS)
+    """
+    matrices = [[1 << (SOBOL_BITS - 1 - bit) for bit in range(SOBOL_BITS)]]
+    for s, a, m in _SOBOL_PARAMETERS:
+        v = [m[i] << (SOBOL_BITS - 1 - i) for i in range(s)]
+        for i in range(s, SOBOL_BITS):
+            value = v[i - s] ^ (v[i - s] >> s)
+            for k in range(1, s):
+                if (a >> (s - 1 - k)) & 1:
+                    value ^= v[i - k]
+            v.append(value)
+        matrices.append(v)
+    return np.array(matrices, dtype=np.uint32)
+
+
+_SOBOL_MATRICES = _sobol_matrices()
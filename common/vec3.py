@@ -1,11 +1,14 @@
 # annotations import is so that we can use Vec3 as a return type in method typings
 from __future__ import annotations
 from dataclasses import dataclass
+from typing import Optional
 
 import common
 import math
 import random
 
+from common import rng
+
 
 @dataclass
 class Vec3:
@@ -92,38 +95,41 @@ class Vec3:
         return self.dot(self)
 
     @staticmethod
-    def random() -> Vec3:
+    def random(rng: Optional[random.Random] = None) -> Vec3:
         """
         returns a `Vec3` with it's `x,y,z` fields set to a random f64 in the range `0..1`
+        :param rng: the random number generator to use, defaults to the `random` module's global generator
         """
+        rng = random if rng is None else rng
         return Vec3(
-            random.random(),
-            random.random(),
-            random.random()
+            rng.random(),
+            rng.random(),
+            rng.random()
         )
 
     @staticmethod
-    def random_range(rmin: float, rmax: float) -> Vec3:
+    def random_range(rmin: float, rmax: float, rng: Optional[random.Random] = None) -> Vec3:
         """
         returns a `Vec3` with it's `x,y,z` fields set to a random f64 in the range `rmin...rmax`
+        :param rng: the random number generator to use, defaults to the `random` module's global generator
         """
+        rng = random if rng is None else rng
         return Vec3(
-            random.uniform(rmin, rmax),
-            random.uniform(rmin, rmax),
-            random.uniform(rmin, rmax)
+            rng.uniform(rmin, rmax),
+            rng.uniform(rmin, rmax),
+            rng.uniform(rmin, rmax)
         )
 
     @staticmethod
     def random_unit_sphere() -> Vec3:
         """
         returns a random `Vec3` that is within the bounds of a (imaginary) unit sphere.
-        Uses "rejection method" algorithm that loops continuously until x,y,z coordinates
-        are generated that lie within a unit sphere
+        A random direction scaled by the cube root of a random number, so the points are uniformly
+        distributed within the sphere. It always draws three random numbers, unlike rejection sampling,
+        so the sample dimensions drawn after it are the same in every sample
         """
-        while True:
-            p = Vec3.random_range(-1.0, 1.0)
-            if p.length_squared() < 1.0:
-                return p
+        direction = Vec3.random_unit_vector()
+        return direction * rng.random() ** (1.0 / 3.0)
 
     @staticmethod
     def random_unit_vector() -> Vec3:
@@ -132,8 +138,8 @@ class Vec3:
         [Lambertian Diffuse](https://en.wikipedia.org/wiki/Lambert%27s_cosine_law) to generate
         a vector that is more uniformly distributed
         """
-        a = random.uniform(0.0, 2.0 * math.pi)
-        z = random.uniform(-1.0, 1.0)
+        a = rng.uniform(0.0, 2.0 * math.pi)
+        z = rng.uniform(-1.0, 1.0)
         r = math.sqrt(1.0 - z * z)
         return Vec3(
             r * math.cos(a),
@@ -159,12 +165,11 @@ class Vec3:
     def random_in_unit_disk() -> Vec3:
         """
         :return: a random vector within a "unit disk". Essentially a unit vector with
-        a random x,y value and z=0.0
+        a random x,y value and z=0.0. It always draws two random numbers, see `random_unit_sphere`
         """
-        while True:
-            p = Vec3(random.uniform(-1.0, 1.0), random.uniform(-1.0, 1.0), 0.0)
-            if p.length_squared() < 1.0:
-                return p
+        r = math.sqrt(rng.random())
+        a = rng.uniform(0.0, 2.0 * math.pi)
+        return Vec3(r * math.cos(a), r * math.sin(a), 0.0)
 
     def unit_vector(self) -> Vec3:
         """
@@ -1,4 +1,4 @@
-from .hit_record import HitRecord
+from .hit_record import HitRecord, SurfaceHit
 from .aabb import Aabb
 from .base import Hittable
 from .hittable_list import HittableList
@@ -1,14 +1,16 @@
 from __future__ import annotations
+import math
 from dataclasses import dataclass
 from typing import Optional
 
 from common import Point3, Ray
 
 
-@dataclass(order=True)
+@dataclass(order=True, frozen=True)
 class Aabb:
     """
-    An Axis Aligned Bounding Box that can be used to surround a Hittable
+    An Axis Aligned Bounding Box that can be used to surround a Hittable.
+    Hittables cache and share their boxes, so an Aabb is read-only once constructed
     """
     min: Point3 = Point3(float('inf'), float('inf'), float('inf'))
     max: Point3 = Point3(float('-inf'), float('-inf'), float('-inf'))
@@ -16,7 +18,9 @@ class Aabb:
     def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[(float, float)]:
         """
         tests if a Ray hit this bounding box.
-        This hit function was developed by Andrew Kensler at Pixar
+        This hit function was developed by Andrew Kensler at Pixar.
+        A ray parallel to an axis gets an infinite inverse direction along that axis, so it only hits
+        if its origin lies between the box's planes on that axis
         :param r: the Ray to test
         :param t_min:  the positions on the Ray that "intersected" the bounding box.
         :param t_max:  the positions on the Ray that "intersected" the bounding box.
@@ -29,15 +33,15 @@ class Aabb:
             t0 = 0.0
             t1 = 0.0
             if a == 0:
-                inv_d = 1.0 / r.dir.x
+                inv_d = 1.0 / r.dir.x if r.dir.x != 0.0 else math.inf
                 t0 = (self.min.x - r.orig.x) * inv_d
                 t1 = (self.max.x - r.orig.x) * inv_d
             if a == 1:
-                inv_d = 1.0 / r.dir.y
+                inv_d = 1.0 / r.dir.y if r.dir.y != 0.0 else math.inf
                 t0 = (self.min.y - r.orig.y) * inv_d
                 t1 = (self.max.y - r.orig.y) * inv_d
             if a == 2:
-                inv_d = 1.0 / r.dir.z
+                inv_d = 1.0 / r.dir.z if r.dir.z != 0.0 else math.inf
                 t0 = (self.min.z - r.orig.z) * inv_d
                 t1 = (self.max.z - r.orig.z) * inv_d
 
@@ -54,6 +58,15 @@ class Aabb:
 
         return tmin, tmax
 
+    def surface_area(self) -> float:
+        """
+        :return: the surface area of this bounding box
+        """
+        dx = self.max.x - self.min.x
+        dy = self.max.y - self.min.y
+        dz = self.max.z - self.min.z
+        return 2.0 * (dx * dy + dy * dz + dz * dx)
+
     @staticmethod
     def surrounding_box(box0: Aabb, box1: Aabb) -> Aabb:
         """
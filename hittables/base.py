@@ -1,17 +1,27 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Sequence, Tuple
 
 from common import Ray
-from hittables import HitRecord, Aabb
+from hittables import HitRecord, SurfaceHit, Aabb
 
 
-@dataclass
+# the base has no fields to compare, subclasses declared with eq=False compare by identity
+@dataclass(eq=False)
 class Hittable(ABC):
     """
     A Base class for primitives that can be "hit" by a Ray
+
+    Hittables whose bounding box is costly to recompute cache it in `_bbox` the first time
+    `bounding_box()` is called, and return the stored box afterwards. Code that moves a hittable by
+    assigning its fields, for example a new center to a sphere, must then call `invalidate_bounds()`.
+    Wrappers such as `Translate` and `RotateY` cache their transformed box there as well, only the
+    accelerators, `BvhNode` and `UniformGrid`, store their box in a `bbox` field, and are refit or rebuilt
+    instead. Cached boxes are shared by every caller, and must be treated as read-only
     """
+    # the cached bounding box, or the boxes of each time interval, None when not cached
+    _bbox = None
 
     @abstractmethod
     def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
@@ -27,6 +37,52 @@ class Hittable(ABC):
         """
         pass
 
+    def intersect(self, r: Ray, t_min: float, t_max: float) -> Optional[SurfaceHit]:
+        """
+        tests if the Ray 'r' has hit this Hittable, the same as `hit()`, but returns a SurfaceHit
+        that defers building the HitRecord until it is resolved.
+
+        This base implementation is eager, it calls `hit()` and wraps the resulting HitRecord.
+        Primitives should override it, along with `surface_interaction()`, so that only the ray
+        parameter is computed here
+
+        :param r: the Ray to test
+        :param t_min: minimum constraint for the ray parameter
+        :param t_max: maximum constraint for the ray parameter
+        :return: a SurfaceHit if the given Ray has hit this hittable else None
+        """
+        hit_rec = self.hit(r, t_min, t_max)
+        if hit_rec:
+            return SurfaceHit(hit_rec.t, self, r, record=hit_rec)
+        return None
+
+    def surface_interaction(self, hit: SurfaceHit) -> HitRecord:
+        """
+        builds the full HitRecord for a SurfaceHit that was returned by this hittable's `intersect()`
+        method. Computing the hit point, normal, u,v coordinates and front face happens here.
+
+        :param hit: a SurfaceHit returned by `intersect()`
+        :return: the HitRecord of the hit
+        """
+        # the base implementation of intersect() returns already resolved hits
+        return hit.record
+
+    def occluded(self, r: Ray, t_min: float, t_max: float) -> bool:
+        """
+        an "any hit" query, that tests if the Ray 'r' hits anything in this Hittable between `t_min`
+        and `t_max`. Unlike `hit()` it stops at the first intersection found, does not need the closest
+        one, and never builds a HitRecord. It's intended for shadow rays and light visibility tests.
+
+        This base implementation falls back to `intersect()`. Primitives and containers should
+        override it with a cheaper test
+
+        :param r: the Ray to test
+        :param t_min: minimum constraint for the ray parameter
+        :param t_max: maximum constraint for the ray parameter
+        :return: True if the Ray hit this Hittable between t_min and t_max, else False
+        """
+        return self.intersect(r, t_min, t_max) is not None
+
     @abstractmethod
     def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
         """
@@ -38,3 +94,62 @@ class Hittable(ABC):
         """
         pass
 
+    def children(self) -> Sequence[Hittable]:
+        """
+        returns the hittables that this hittable contains or wraps, containers and wrappers override it.
+        This base implementation, for primitives, returns an empty tuple
+        """
+        return ()
+
+    def has_stochastic_hits(self) -> bool:
+        """
+        returns True if finding the hits of this hittable, or of a hittable it contains, draws random numbers,
+        as participating media do. This base implementation asks the hittables it contains
+        """
+        return any(child.has_stochastic_hits() for child in self.children())
+
+    def moves_between(self, t0: float, t1: float) -> bool:
+        """
+        returns True if this hittable, or a hittable it contains, moves between times `t0` and `t1`.
+        This base implementation asks the hittables it contains
+        """
+        return any(child.moves_between(t0, t1) for child in self.children())
+
+    def invalidate_bounds(self):
+        """
+        discards the cached bounding boxes of this hittable and of the hittables it contains, after they were moved.
+        `BvhNode.refit()` calls it on the leaves of the BVH
+        """
+        self._bbox = None
+        for child in self.children():
+            child.invalidate_bounds()
+
+    def prepare(self):
+        """
+        computes, ahead of the first ray, whatever this hittable, and the hittables it contains, would
+        otherwise compute lazily. The renderer prepares the world before sending it to its worker processes,
+        so that it is computed once, and not again by every row rendered
+        """
+        for child in self.children():
+            child.prepare()
+
+    def hit_interval(self, r: Ray, t_min: float, t_max: float) -> Optional[Tuple[float, float]]:
+        """
+        returns the ray parameters `(t_enter, t_exit)` where the Ray 'r' enters and then exits this
+        Hittable, assuming this Hittable is **convex**. No shading work, such as normals or u,v
+        coordinates, needs to be done by implementations of this method.
+
+        This base implementation finds the two crossings with two calls to `hit()`. Primitives
+        should override it with a cheaper, analytic, test.
+
+        :param r: the Ray to test
+        :param t_min: minimum constraint for the ray parameter
+        :param t_max: maximum constraint for the ray parameter
+        :return: a `(t_enter, t_exit)` tuple, or None if the Ray did not both enter and exit this hittable
+        """
+        rec1 = self.hit(r, t_min, t_max)
+        if rec1:
+            rec2 = self.hit(r, rec1.t + 0.00001, t_max)
+            if rec2:
+                return rec1.t, rec2.t
+        return None
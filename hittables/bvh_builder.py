@@ -0,0 +1,352 @@
+"""
+Array based builders for BVHs made of `BvhNode`s.
+
+`build_bvh_parallel` is an array based, parallel, builder for the median split BVH built by
+`BvhNode.from_hittable_list`.
+
+The bounding boxes of all the primitives are computed once, up front, into numpy arrays. Sorting and
+splitting then works on arrays of primitive indices instead of calling `bounding_box()` on every
+comparison. Large subtrees are partitioned in parallel, in separate processes, and only the final
+ordering of the primitive indices is sent back to the parent process, which then assembles the
+BvhNodes.
+
+The resulting tree is identical to the tree `BvhNode.from_hittable_list` builds from the same
+random state: the shape of the tree only depends on the number of primitives, so the random split
+axis of every node can be drawn up front, in the same (pre-)order the serial builder draws them.
+
+`build_lbvh` is a linear BVH (LBVH) builder. It sorts the primitives by the Morton code of their
+centroids and emits the hierarchy from the sorted codes, splitting every range of codes where its
+highest differing bit changes. It builds much faster than the median split builders but the trees
+are usually of lower quality, which makes it a good fit for scenes that are rebuilt every frame.
+"""
+from __future__ import annotations
+
+import concurrent.futures
+import functools
+import random
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from common import Point3
+from hittables import Hittable, Aabb, HittableList
+from hittables.bvh_node import BvhNode
+
+# subtrees with at least this many primitives are partitioned in a separate process
+PARALLEL_THRESHOLD = 20000
+# the number of bits, per axis, of the Morton codes used by the LBVH builder
+MORTON_BITS = 10
+
+# the nodes of a BVH, in pre-order, as lists of: each node's first primitive (in leaf order), one past its
+# last primitive, its left and right child node (-1 if the child is a primitive) and its depth.
+# A primitive left child is the node's first primitive, a primitive right child is its last primitive
+NodeTable = Tuple[List[int], List[int], List[int], List[int], List[int]]
+
+
+def build_bvh_parallel(hit_list: HittableList, time0: float, time1: float, motion_bounds: bool = True,
+                       workers: int = 1, parallel_threshold: int = PARALLEL_THRESHOLD,
+                       rng: Optional[random.Random] = None) -> BvhNode:
+    """
+    returns the root node of a BVH built from the given list of Hittables. The BVH is identical to
+    the one `BvhNode.from_hittable_list` would build
+    :param hit_list: the hittables to build the BVH from
+    :param time0: time interval begin
+    :param time1: time interval end
+    :param motion_bounds: store motion bounds on nodes whose contents move between time0 and time1
+    :param workers: the number of processes to build subtrees in. 1 builds everything in this process
+    :param parallel_threshold: subtrees with at least this many primitives are built in a worker process
+    :param rng: the random number generator that chooses the split axes, defaults to the `random`
+    module's global generator
+    """
+    rng = random if rng is None else rng
+    objects = hit_list.objects
+    if len(objects) == 0:
+        raise RuntimeError("can't build a BVH from an empty list of hittables")
+
+    # the bounding boxes of every primitive, computed once
+    boxes = [_checked_box(hittable.bounding_box(time0, time1)) for hittable in objects]
+    use_motion = motion_bounds and time0 != time1
+    boxes0 = [hittable.bounding_box(time0, time0) for hittable in objects] if use_motion else boxes
+    boxes1 = [hittable.bounding_box(time1, time1) for hittable in objects] if use_motion else boxes
+    # hittables are sorted by the min corner of their box at time 0.0
+    key_boxes = boxes0 if use_motion and time0 == 0.0 else [hittable.bounding_box(0.0, 0.0) for hittable in objects]
+    keys = np.array([_min_corner(box) for box in key_boxes], dtype=np.float_)
+
+    # draw the split axis of every node, in the same order the serial builder draws them
+    axes = np.array([rng.randint(0, 2) for _ in range(_node_count(len(objects)))], dtype=np.int8)
+
+    indices = np.arange(len(objects))
+    if workers > 1 and len(objects) >= parallel_threshold:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            pieces = []
+            _partition_top(keys, indices, axes, 0, parallel_threshold, executor, pieces)
+            # map each subtree's local indices back to the indices of the whole list of primitives
+            order = np.concatenate([subtree_indices[future.result()] for future, subtree_indices in pieces])
+    else:
+        order = _partition(keys, indices, axes, 0)
+
+    table = _median_node_table(len(objects))
+    root = _assemble(objects, order, table, boxes, boxes0, boxes1, time0, time1, use_motion)
+    root.build_cost = root.surface_area_cost()
+    return root
+
+
+@functools.lru_cache(maxsize=None)
+def _node_count(size: int) -> int:
+    """
+    :return: the number of BvhNodes in a BVH built from `size` primitives
+    """
+    if size <= 2:
+        return 1
+    mid = size // 2
+    return 1 + _node_count(mid) + _node_count(size - mid)
+
+
+def _min_corner(box: Optional[Aabb]) -> (float, float, float):
+    return _checked_box(box).min.to_tuple()
+
+
+def _checked_box(box: Optional[Aabb]) -> Aabb:
+    if box is None:
+        raise RuntimeError("a hittable did not have a bounding box during BVH construction")
+    return box
+
+
+def _partition(keys: np.ndarray, indices: np.ndarray, axes: np.ndarray, offset: int) -> np.ndarray:
+    """
+    recursively orders `indices` the same way `BvhNode._split_volumes` orders its hittables.
+    The split axis of the node being partitioned is `axes[offset]`, its left subtree's nodes come next
+    and then its right subtree's nodes
+    :return: the primitive indices in leaf order
+    """
+    size = len(indices)
+    axis = axes[offset]
+    if size == 1:
+        return indices
+    if size == 2:
+        if keys[indices[0], axis] < keys[indices[1], axis]:
+            return indices
+        return indices[::-1]
+
+    # a stable sort, like python's list.sort, so that ties keep their order
+    indices = indices[np.argsort(keys[indices, axis], kind="stable")]
+    mid = size // 2
+    left = _partition(keys, indices[:mid], axes, offset + 1)
+    right = _partition(keys, indices[mid:], axes, offset + 1 + _node_count(mid))
+    return np.concatenate((left, right))
+
+
+def _partition_job(keys: np.ndarray, axes: np.ndarray) -> np.ndarray:
+    """
+    partitions a whole subtree in a worker process. `keys` and `axes` only hold the subtree's primitives
+    and nodes
+    """
+    return _partition(keys, np.arange(len(keys)), axes, 0)
+
+
+def _partition_top(keys: np.ndarray, indices: np.ndarray, axes: np.ndarray, offset: int, parallel_threshold: int,
+                   executor: concurrent.futures.Executor, pieces: List):
+    """
+    partitions the top levels of the tree in this process, until a subtree is small enough to be
+    handed to a worker process. A tuple of (the future of the subtree's local ordering, the subtree's
+    indices) is appended to `pieces`, in leaf order, for each subtree
+    """
+    size = len(indices)
+    if size < 2 * parallel_threshold:
+        node_count = _node_count(size)
+        future = executor.submit(_partition_job, keys[indices], axes[offset:offset + node_count])
+        pieces.append((future, indices))
+        return
+
+    axis = axes[offset]
+    indices = indices[np.argsort(keys[indices, axis], kind="stable")]
+    mid = size // 2
+    _partition_top(keys, indices[:mid], axes, offset + 1, parallel_threshold, executor, pieces)
+    _partition_top(keys, indices[mid:], axes, offset + 1 + _node_count(mid), parallel_threshold, executor, pieces)
+
+
+def _box_rows(boxes: Sequence[Aabb]) -> np.ndarray:
+    """
+    :return: an (n, 6) array holding the min x,y,z and max x,y,z of each box
+    """
+    return np.array([(*box.min.to_tuple(), *box.max.to_tuple()) for box in boxes], dtype=np.float_)
+
+
+def _median_node_table(size: int) -> NodeTable:
+    """
+    lays out the nodes of a median split BVH over `size` primitives in pre-order, which is also the order
+    the serial builder creates them in
+    """
+    lo, hi, left, right, depth = [], [], [], [], []
+    # (first primitive, one past the last primitive, depth, parent node, is right child)
+    stack = [(0, size, 0, -1, False)]
+    while stack:
+        node_lo, node_hi, node_depth, parent, is_right = stack.pop()
+        node_id = len(lo)
+        lo.append(node_lo)
+        hi.append(node_hi)
+        left.append(-1)
+        right.append(-1)
+        depth.append(node_depth)
+        if parent >= 0:
+            if is_right:
+                right[parent] = node_id
+            else:
+                left[parent] = node_id
+        if node_hi - node_lo > 2:
+            mid = node_lo + (node_hi - node_lo) // 2
+            stack.append((mid, node_hi, node_depth + 1, node_id, True))
+            stack.append((node_lo, mid, node_depth + 1, node_id, False))
+    return lo, hi, left, right, depth
+
+
+def _assemble(objects: Sequence[Hittable], order: np.ndarray, table: NodeTable, boxes: Sequence[Aabb],
+              boxes0: Sequence[Aabb], boxes1: Sequence[Aabb], time0: float, time1: float, use_motion: bool) -> BvhNode:
+    """
+    builds the BvhNodes laid out in `table` for the primitives, in leaf order, using the pre-computed boxes.
+    The bounds of every node are computed bottom-up, one tree level at a time, with numpy and only
+    then are the BvhNodes and their Aabbs created
+    :return: the root node
+    """
+    lo, hi, left, right, depth = (np.array(column) for column in table)
+    node_count = len(lo)
+
+    # the boxes of the left and right primitive of nodes whose children are primitives
+    left_prims = order[lo]
+    right_prims = order[hi - 1]
+    prim_boxes = [_box_rows(boxes)]
+    if use_motion:
+        prim_boxes += [_box_rows(boxes0), _box_rows(boxes1)]
+    node_boxes = [np.empty((node_count, 6), dtype=np.float_) for _ in prim_boxes]
+    moving = np.zeros(node_count, dtype=bool)
+
+    for level in range(depth.max(), -1, -1):
+        ids = np.nonzero(depth == level)[0]
+        left_is_node = (left[ids] >= 0)[:, None]
+        right_is_node = (right[ids] >= 0)[:, None]
+        for prim_rows, node_rows in zip(prim_boxes, node_boxes):
+            left_rows = np.where(left_is_node, node_rows[left[ids]], prim_rows[left_prims[ids]])
+            right_rows = np.where(right_is_node, node_rows[right[ids]], prim_rows[right_prims[ids]])
+            node_rows[ids, :3] = np.minimum(left_rows[:, :3], right_rows[:, :3])
+            node_rows[ids, 3:] = np.maximum(left_rows[:, 3:], right_rows[:, 3:])
+        if use_motion:
+            bbox_rows, bbox0_rows, bbox1_rows = node_boxes
+            level_moving = np.any(bbox0_rows[ids] != bbox1_rows[ids], axis=1)
+            moving[ids] = level_moving
+            # like BvhNode.bounding_box, a node without motion bounds has the same box at all times
+            static_ids = ids[~level_moving]
+            bbox0_rows[static_ids] = bbox_rows[static_ids]
+            bbox1_rows[static_ids] = bbox_rows[static_ids]
+
+    # create the nodes, children before their parents
+    rows = [node_rows.tolist() for node_rows in node_boxes]
+    lo, hi, left, right, order = lo.tolist(), hi.tolist(), left.tolist(), right.tolist(), order.tolist()
+    nodes: List[Optional[BvhNode]] = [None] * node_count
+    for node_id in range(node_count - 1, -1, -1):
+        left_child = nodes[left[node_id]] if left[node_id] >= 0 else objects[order[lo[node_id]]]
+        right_child = nodes[right[node_id]] if right[node_id] >= 0 else objects[order[hi[node_id] - 1]]
+        node = BvhNode(left_child, right_child, _row_to_box(rows[0][node_id]))
+        if moving[node_id]:
+            node.motion_bbox = (_row_to_box(rows[1][node_id]), _row_to_box(rows[2][node_id]))
+            node.time0 = time0
+            node.time1 = time1
+        nodes[node_id] = node
+    return nodes[0]
+
+
+def build_lbvh(hit_list: HittableList, time0: float, time1: float, motion_bounds: bool = True) -> BvhNode:
+    """
+    returns the root node of a linear BVH built from the given list of Hittables, by sorting them
+    along a Morton (Z-order) curve through the centroids of their bounding boxes
+    :param hit_list: the hittables to build the BVH from
+    :param time0: time interval begin
+    :param time1: time interval end
+    :param motion_bounds: store motion bounds on nodes whose contents move between time0 and time1
+    """
+    objects = hit_list.objects
+    if len(objects) == 0:
+        raise RuntimeError("can't build a BVH from an empty list of hittables")
+
+    boxes = [_checked_box(hittable.bounding_box(time0, time1)) for hittable in objects]
+    use_motion = motion_bounds and time0 != time1
+    boxes0 = [hittable.bounding_box(time0, time0) for hittable in objects] if use_motion else boxes
+    boxes1 = [hittable.bounding_box(time1, time1) for hittable in objects] if use_motion else boxes
+
+    box_rows = _box_rows(boxes)
+    codes = morton_codes(0.5 * (box_rows[:, :3] + box_rows[:, 3:]))
+    order = np.argsort(codes, kind="stable")
+
+    table = _morton_node_table(codes[order])
+    root = _assemble(objects, order, table, boxes, boxes0, boxes1, time0, time1, use_motion)
+    root.build_cost = root.surface_area_cost()
+    return root
+
+
+def morton_codes(points: np.ndarray) -> np.ndarray:
+    """
+    computes the 3D Morton code of each point, with `MORTON_BITS` bits per axis. The points are
+    quantized to a grid spanning their bounding box
+    :param points: an (n, 3) array of points
+    :return: an array of n unsigned integer codes
+    """
+    lo = points.min(axis=0)
+    extent = points.max(axis=0) - lo
+    # a flat axis maps every point to cell 0
+    extent[extent == 0.0] = 1.0
+    cells = (1 << MORTON_BITS) - 1
+    quantized = ((points - lo) / extent * cells).astype(np.uint64)
+    return (_spread_bits(quantized[:, 0]) << np.uint64(2)) | (_spread_bits(quantized[:, 1]) << np.uint64(1)) \
+        | _spread_bits(quantized[:, 2])
+
+
+def _spread_bits(v: np.ndarray) -> np.ndarray:
+    """
+    inserts two zero bits after each of the low 10 bits of every value
+    """
+    v = (v | (v << np.uint64(16))) & np.uint64(0x030000FF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x0300F00F)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x030C30C3)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x09249249)
+    return v
+
+
+def _morton_node_table(codes: np.ndarray) -> NodeTable:
+    """
+    lays out the nodes of a linear BVH over primitives with the given, sorted, Morton codes in pre-order.
+    Every range of primitives is split where the highest bit that differs between its first and last
+    code changes. Ranges of identical codes are split in the middle
+    """
+    lo, hi, left, right, depth = [], [], [], [], []
+    int_codes = codes.tolist()
+    # (first primitive, one past the last primitive, depth, parent node, is right child)
+    stack = [(0, len(int_codes), 0, -1, False)]
+    while stack:
+        node_lo, node_hi, node_depth, parent, is_right = stack.pop()
+        node_id = len(lo)
+        lo.append(node_lo)
+        hi.append(node_hi)
+        left.append(-1)
+        right.append(-1)
+        depth.append(node_depth)
+        if parent >= 0:
+            if is_right:
+                right[parent] = node_id
+            else:
+                left[parent] = node_id
+
+        first, last = int_codes[node_lo], int_codes[node_hi - 1]
+        if first == last:
+            split = node_lo + (node_hi - node_lo) // 2
+        else:
+            # the first code with the highest differing bit set starts the right child
+            bit = (first ^ last).bit_length() - 1
+            split = int(np.searchsorted(codes[node_lo:node_hi], ((first >> bit) | 1) << bit)) + node_lo
+        if node_hi - split > 1:
+            stack.append((split, node_hi, node_depth + 1, node_id, True))
+        if split - node_lo > 1:
+            stack.append((node_lo, split, node_depth + 1, node_id, False))
+    return lo, hi, left, right, depth
+
+
+def _row_to_box(row: List[float]) -> Aabb:
+    return Aabb(Point3(row[0], row[1], row[2]), Point3(row[3], row[4], row[5]))
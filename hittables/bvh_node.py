@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import math
 import random
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Sequence, Tuple
 
-from common import Ray
-from hittables import Hittable, Aabb, HittableList, HitRecord
+from common import Ray, Point3
+from hittables import Hittable, Aabb, HittableList, HitRecord, SurfaceHit
+
+# a refit BVH is rebuilt when its surface area cost grows past this multiple of its cost when it was built
+REBUILD_THRESHOLD = 1.5
 
 
 @dataclass
@@ -17,21 +21,42 @@ class BvhNode(Hittable):
     groups, based on a Hittable's bounding box. Each "level" of the BVH will contain Hittables
     such that their bounding boxes are contained within their parent bounding box.
     The "leaves" of the BVH contain a single primitive, such as a sphere or cube etc...
+
+    Nodes that contain moving hittables can also store motion bounds: one box at `time0` and one
+    box at `time1`. During traversal these are linearly interpolated by the Ray's time, giving a
+    much tighter box than `bbox`, which encloses the whole time interval.
     """
     left: Hittable
     right: Hittable
     bbox: Aabb
+    # (box at time0, box at time1) if the contents of this node move during the time interval, else None
+    motion_bbox: Optional[Tuple[Aabb, Aabb]] = None
+    time0: float = 0.0
+    time1: float = 1.0
+    # the surface area cost of the BVH when it was built, only set on the root node
+    build_cost: Optional[float] = None
 
     @staticmethod
-    def from_hittable_list(hit_list: HittableList, time0: float, time1: float) -> BvhNode:
+    def from_hittable_list(hit_list: HittableList, time0: float, time1: float,
+                           motion_bounds: bool = True, rng: Optional[random.Random] = None) -> BvhNode:
         """
         returns a BvhNode built from the given list of Hittables. The returned
         BvhNode will be the root node of the BVH
+        :param hit_list: the hittables to build the BVH from
+        :param time0: time interval begin
+        :param time1: time interval end
+        :param motion_bounds: store interpolated, per-time, bounds on nodes that contain moving hittables
+        :param rng: the random number generator that chooses the split axes, defaults to the `random`
+        module's global generator
         """
-        return BvhNode._split_volumes(hit_list.objects, time0, time1)
+        rng = random if rng is None else rng
+        root = BvhNode._split_volumes(hit_list.objects, time0, time1, motion_bounds, rng)
+        root.build_cost = root.surface_area_cost()
+        return root
 
     @staticmethod
-    def _split_volumes(objects: List[Hittable], time0: float, time1: float) -> BvhNode:
+    def _split_volumes(objects: List[Hittable], time0: float, time1: float, motion_bounds: bool = True,
+                       rng=random) -> BvhNode:
         """
         Constructs a BVH from a list of Hittable objects.
         As long as the list of objects in a BvhNode gets divided into two sub-lists, the hit
@@ -45,10 +70,12 @@ class BvhNode(Hittable):
         :param objects: list of hittable objects
         :param time0: time start
         :param time1: time end
+        :param motion_bounds: store motion bounds on nodes whose contents move between time0 and time1
+        :param rng: the random number generator that chooses the split axes
         :return: the root node of the constructed BVH
         """
         # randomly choose an x,y,z axis for sorting, 0=x, 1=y, 2=z
-        axis = random.randint(0, 2)
+        axis = rng.randint(0, 2)
         node: BvhNode
 
         if len(objects) == 1:
@@ -67,34 +94,156 @@ class BvhNode(Hittable):
             # box axis' to sort them into left and right children
             objects.sort(key=lambda hittable: hittable.bounding_box(0.0, 0.0).min[axis])
             mid = len(objects) // 2
-            left = BvhNode._split_volumes(objects[0:mid], time0, time1)
-            right = BvhNode._split_volumes(objects[mid:], time0, time1)
+            left = BvhNode._split_volumes(objects[0:mid], time0, time1, motion_bounds, rng)
+            right = BvhNode._split_volumes(objects[mid:], time0, time1, motion_bounds, rng)
             node = BvhNode(left, right, Aabb())
 
+        node._update_bounds(time0, time1, motion_bounds)
+        return node
+
+    def _update_bounds(self, time0: float, time1: float, motion_bounds: bool):
+        """
+        (re)computes this node's bounding box, and motion bounds, from the current bounding boxes
+        of its left and right children
+        """
         # construct a bounding box encompassing this node's left and right children
-        box_left = node.left.bounding_box(time0, time1)
-        box_right = node.right.bounding_box(time0, time1)
+        box_left = self.left.bounding_box(time0, time1)
+        box_right = self.right.bounding_box(time0, time1)
         if box_left is None or box_right is None:
             raise RuntimeError("a hittable did not have a bounding box during BVH construction")
-        node.bbox = Aabb.surrounding_box(box_left, box_right)
-        return node
+        self.bbox = Aabb.surrounding_box(box_left, box_right)
+        self.motion_bbox = None
+
+        if motion_bounds and time0 != time1:
+            # the boxes of the children at the very start and end of the time interval
+            box0 = Aabb.surrounding_box(self.left.bounding_box(time0, time0), self.right.bounding_box(time0, time0))
+            box1 = Aabb.surrounding_box(self.left.bounding_box(time1, time1), self.right.bounding_box(time1, time1))
+            if box0 != box1:
+                self.motion_bbox = (box0, box1)
+                self.time0 = time0
+                self.time1 = time1
+
+    def refit(self, time0: float, time1: float, motion_bounds: bool = True):
+        """
+        Updates the bounding boxes of this BVH, bottom-up, from the current positions of the hittables
+        it contains, while keeping the tree's topology. This is much cheaper than rebuilding the BVH
+        when objects move a little between the frames of an animation, but the tree's quality
+        degrades as objects move further from where they were when the tree was built.
+        See `refit_or_rebuild()`
+        :param time0: time interval begin
+        :param time1: time interval end
+        :param motion_bounds: store motion bounds on nodes whose contents move between time0 and time1
+        """
+        for child in self.children():
+            if isinstance(child, BvhNode):
+                child.refit(time0, time1, motion_bounds)
+            else:
+                # the leaves moved, their cached boxes are stale
+                child.invalidate_bounds()
+        self._update_bounds(time0, time1, motion_bounds)
+
+    def refit_or_rebuild(self, time0: float, time1: float, motion_bounds: bool = True,
+                         threshold: float = REBUILD_THRESHOLD, rng: Optional[random.Random] = None) -> BvhNode:
+        """
+        Refits this BVH, which must be a root node, and then checks its quality. If its surface area
+        cost has grown past `threshold` times its cost when it was built, the BVH is rebuilt from scratch.
+        :param time0: time interval begin
+        :param time1: time interval end
+        :param motion_bounds: store motion bounds on nodes whose contents move between time0 and time1
+        :param threshold: how much the surface area cost can grow before the BVH is rebuilt
+        :param rng: the random number generator that chooses the split axes of a rebuilt BVH, see
+        `from_hittable_list()`
+        :return: this BvhNode if it was refit, or the root node of a new BVH if it was rebuilt
+        """
+        self.refit(time0, time1, motion_bounds)
+        build_cost = self.build_cost if self.build_cost is not None else self.surface_area_cost()
+        if self.surface_area_cost() <= threshold * build_cost:
+            return self
+
+        hit_list = HittableList()
+        for hittable in self.leaves():
+            hit_list.add(hittable)
+        return BvhNode.from_hittable_list(hit_list, time0, time1, motion_bounds, rng)
+
+    def surface_area_cost(self) -> float:
+        """
+        A surface area heuristic (SAH) measure of this BVH's quality. It's the sum of the surface areas
+        of all the nodes in the BVH, relative to the surface area of this node. This is proportional to
+        the expected number of nodes that a random Ray, that hits this node, will visit. Lower is better
+        """
+        root_area = self.bbox.surface_area()
+        if root_area <= 0.0:
+            return 0.0
+        total_area = 0.0
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            total_area += node.bbox.surface_area()
+            for child in (node.left, node.right) if node.right is not node.left else (node.left,):
+                if isinstance(child, BvhNode):
+                    stack.append(child)
+        return total_area / root_area
+
+    def leaves(self) -> List[Hittable]:
+        """
+        :return: the (non BvhNode) hittables contained in this BVH, in left to right order
+        """
+        leaves = []
+        stack: List[Hittable] = [self]
+        while stack:
+            hittable = stack.pop()
+            if isinstance(hittable, BvhNode):
+                if hittable.right is not hittable.left:
+                    stack.append(hittable.right)
+                stack.append(hittable.left)
+            else:
+                leaves.append(hittable)
+        return leaves
+
+    def bbox_at(self, time: float) -> Aabb:
+        """
+        Returns the bounding box of this node's contents at the given time.
+        For linearly moving hittables, the box of a node at time t is contained within the linear
+        interpolation of its boxes at time0 and time1, so the interpolated box is a conservative bound
+        :param time: the time to get the bounding box at
+        """
+        if self.motion_bbox is None:
+            return self.bbox
+        box0, box1 = self.motion_bbox
+        f = (time - self.time0) / (self.time1 - self.time0)
+        g = 1.0 - f
+        return Aabb(
+            Point3(
+                g * box0.min.x + f * box1.min.x,
+                g * box0.min.y + f * box1.min.y,
+                g * box0.min.z + f * box1.min.z),
+            Point3(
+                g * box0.max.x + f * box1.max.x,
+                g * box0.max.y + f * box1.max.y,
+                g * box0.max.z + f * box1.max.z)
+        )
 
     def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
         """
         Check if the bounding box for a node is hit, and if so, recursively check its children
         to determine which child was hit (if any).
-        Returns a `HitRecord` for the deepest node that was hit
+        Returns a `HitRecord` for the deepest node that was hit. Only that closest hit is
+        resolved into a HitRecord
         :param r: the Ray to check
         :param t_min: minimum ray parameter for a hit to be valid
         :param t_max: maximum ray parameter for a hit to be valid
         :return:
         """
-        # first check if the hittable's bounding box was hit
-        if self.bbox.hit(r, t_min, t_max):
+        surface_hit = self.intersect(r, t_min, t_max)
+        return surface_hit.resolve() if surface_hit else None
+
+    def intersect(self, r: Ray, t_min: float, t_max: float) -> Optional[SurfaceHit]:
+        # first check if the hittable's bounding box, at the time of the ray, was hit
+        if self._bbox_hit(r, t_min, t_max):
             # check if the left and right children are hit. The hittable being checked could be a BvhNode
             # or some other Hittable, like a sphere, box, etc...
-            hit_left = self.left.hit(r, t_min, t_max)
-            hit_right = self.right.hit(r, t_min, hit_left.t) if hit_left else self.right.hit(r, t_min, t_max)
+            hit_left = self.left.intersect(r, t_min, t_max)
+            hit_right = self.right.intersect(r, t_min, hit_left.t) if hit_left else self.right.intersect(r, t_min, t_max)
 
             if hit_right:
                 return hit_right
@@ -105,6 +254,61 @@ class BvhNode(Hittable):
         else:
             return None
 
+    def occluded(self, r: Ray, t_min: float, t_max: float) -> bool:
+        """
+        Check if the bounding box for a node is hit, and if so, check if either child is hit.
+        The right child is only checked if nothing was hit in the left child
+        """
+        if self._bbox_hit(r, t_min, t_max):
+            return self.left.occluded(r, t_min, t_max) or self.right.occluded(r, t_min, t_max)
+        return False
+
+    def _bbox_hit(self, r: Ray, t_min: float, t_max: float) -> bool:
+        """
+        tests if the Ray 'r' hits this node's bounding box at the time of the Ray.
+        Motion bounds are interpolated and tested in place, without allocating a new Aabb
+        """
+        if self.motion_bbox is None:
+            return self.bbox.hit(r, t_min, t_max) is not None
+
+        box0, box1 = self.motion_bbox
+        f = (r.time - self.time0) / (self.time1 - self.time0)
+        g = 1.0 - f
+        tmin = t_min
+        tmax = t_max
+
+        inv_d = 1.0 / r.dir.x if r.dir.x != 0.0 else math.inf
+        t0 = (g * box0.min.x + f * box1.min.x - r.orig.x) * inv_d
+        t1 = (g * box0.max.x + f * box1.max.x - r.orig.x) * inv_d
+        if inv_d < 0.0:
+            t0, t1 = t1, t0
+        tmin = t0 if t0 > tmin else tmin
+        tmax = t1 if t1 < tmax else tmax
+        if tmax <= tmin:
+            return False
+
+        inv_d = 1.0 / r.dir.y if r.dir.y != 0.0 else math.inf
+        t0 = (g * box0.min.y + f * box1.min.y - r.orig.y) * inv_d
+        t1 = (g * box0.max.y + f * box1.max.y - r.orig.y) * inv_d
+        if inv_d < 0.0:
+            t0, t1 = t1, t0
+        tmin = t0 if t0 > tmin else tmin
+        tmax = t1 if t1 < tmax else tmax
+        if tmax <= tmin:
+            return False
+
+        inv_d = 1.0 / r.dir.z if r.dir.z != 0.0 else math.inf
+        t0 = (g * box0.min.z + f * box1.min.z - r.orig.z) * inv_d
+        t1 = (g * box0.max.z + f * box1.max.z - r.orig.z) * inv_d
+        if inv_d < 0.0:
+            t0, t1 = t1, t0
+        tmin = t0 if t0 > tmin else tmin
+        tmax = t1 if t1 < tmax else tmax
+        return tmax > tmin
+
+    def children(self) -> Sequence[Hittable]:
+        return (self.left,) if self.right is self.left else (self.left, self.right)
+
     def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
         """
         Returns an Aabb which is the axis-aligned bounding box that encompasses **all** of
@@ -112,5 +316,7 @@ class BvhNode(Hittable):
         :param t0: time interval begin
         :param t1: time interval end
         """
-        return self.bbox
+        if self.motion_bbox is None or (t0 == self.time0 and t1 == self.time1):
+            return self.bbox
+        return Aabb.surrounding_box(self.bbox_at(t0), self.bbox_at(t1))
 
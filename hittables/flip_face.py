@@ -1,9 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Sequence, Tuple
 
 from common import Ray
-from hittables import Aabb, Hittable, HitRecord
+from hittables import Aabb, Hittable, HitRecord, SurfaceHit
 
 
 @dataclass
@@ -15,12 +15,29 @@ class FlipFace(Hittable):
     wrapped: Hittable
 
     def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
-        hit_rec = self.wrapped.hit(r, t_min, t_max)
-        if hit_rec:
-            hit_rec.front_face = not hit_rec.front_face
-            return hit_rec
+        surface_hit = self.intersect(r, t_min, t_max)
+        return surface_hit.resolve() if surface_hit else None
+
+    def intersect(self, r: Ray, t_min: float, t_max: float) -> Optional[SurfaceHit]:
+        inner = self.wrapped.intersect(r, t_min, t_max)
+        if inner:
+            return SurfaceHit(inner.t, self, r, inner)
         else:
             return None
 
+    def surface_interaction(self, hit: SurfaceHit) -> HitRecord:
+        hit_rec = hit.inner.resolve()
+        hit_rec.front_face = not hit_rec.front_face
+        return hit_rec
+
+    def occluded(self, r: Ray, t_min: float, t_max: float) -> bool:
+        return self.wrapped.occluded(r, t_min, t_max)
+
+    def hit_interval(self, r: Ray, t_min: float, t_max: float) -> Optional[Tuple[float, float]]:
+        return self.wrapped.hit_interval(r, t_min, t_max)
+
+    def children(self) -> Sequence[Hittable]:
+        return (self.wrapped,)
+
     def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
         return self.wrapped.bounding_box(t0, t1)
@@ -1,9 +1,13 @@
 from __future__ import annotations
 from dataclasses import dataclass
+from typing import Optional, TYPE_CHECKING
 
 from common import Vec3, Point3, Ray
 import materials
 
+if TYPE_CHECKING:
+    from hittables import Hittable
+
 
 # @dataclass
 # class HitRecordBase:
@@ -89,3 +93,34 @@ class HitRecord:
         """
         self.front_face = HitRecord._hit_front_face(ray, outward_normal)
         self.normal = outward_normal if self.front_face else -outward_normal
+
+
+@dataclass
+class SurfaceHit:
+    """
+    A deferred "hit" of a Ray on a hittable.
+    Only the ray parameter, `t`, and a reference to the hittable that was hit are computed up front.
+    The (more expensive) HitRecord, with its point, normal, u,v coordinates and front face, is only
+    built when `resolve()` is called. Containers, like HittableList and BvhNode, compare candidate hits
+    by `t` and only resolve the closest one.
+    """
+    # position along the Ray where the hittable was hit
+    t: float
+    # the hittable that was hit, it computes the HitRecord via its surface_interaction() method
+    hittable: Hittable
+    # the Ray, in the hittable's own space, that hit the hittable
+    ray: Ray
+    # the SurfaceHit of a wrapped hittable, used by wrappers such as Translate or RotateY
+    inner: Optional[SurfaceHit] = None
+    # the resolved HitRecord, computed on the first call to resolve()
+    record: Optional[HitRecord] = None
+    # the index of the primitive that was hit, used by hittables that pack many primitives together
+    index: int = -1
+
+    def resolve(self) -> HitRecord:
+        """
+        :return: the full HitRecord of this hit, computing it on the first call
+        """
+        if self.record is None:
+            self.record = self.hittable.surface_interaction(self)
+        return self.record
@@ -1,24 +1,49 @@
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Iterable, List, Optional, Sequence
 
 from common import Ray
-from hittables import Aabb, Hittable, HitRecord
+from hittables import Aabb, Hittable, HitRecord, SurfaceHit
+
+# lists holding more than this many hittables build an acceleration structure over them
+ACCELERATION_THRESHOLD = 16
 
 
 @dataclass
 class HittableList(Hittable):
     """
     A list of all Hittable objects in the ray tracer's "world" or scene
+
+    Nothing is precomputed until `prepare()` is called, or the first ray is tested against the list. Then
+    the union of the bounding boxes of the hittables is cached and used to skip rays that miss the whole list
+    and, if the list holds more than `accel_threshold` hittables, a linear BVH is built over them. Both, and the
+    list's cached bounding boxes, are discarded when the list changes through `add()`, `extend()` or `clear()`,
+    or when its hittables moved and `invalidate_bounds()` is called. Lists holding a hittable
+    without a bounding box are always scanned linearly.
     """
 
-    def __init__(self):
+    def __init__(self, accel_threshold: Optional[int] = ACCELERATION_THRESHOLD, time0: float = 0.0,
+                 time1: float = 1.0):
+        """
+        :param accel_threshold: build an acceleration structure for lists holding more than this many
+        hittables, None to always scan the list
+        :param time0: the start of the time interval rays are cast in
+        :param time1: the end of the time interval rays are cast in
+        """
         self.objects: List[Hittable] = list()
+        self.accel_threshold = accel_threshold
+        self.time0 = time0
+        self.time1 = time1
+        # computed on the first ray: the union of the hittables' boxes and the acceleration structure
+        self._prepared = False
+        self._bounds: Optional[Aabb] = None
+        self._accel: Optional[Hittable] = None
 
     def clear(self):
         """
         clears this list of hittable objects
         """
         self.objects.clear()
+        self._invalidate()
 
     def add(self, hittable: Hittable):
         """
@@ -26,35 +51,114 @@ class HittableList(Hittable):
         :param hittable:
         """
         self.objects.append(hittable)
+        self._invalidate()
+
+    def extend(self, hittables: Iterable[Hittable]):
+        """
+        appends all the given hittables to this list of Hittables, cheaper than calling `add()` for each of them
+        :param hittables:
+        """
+        self.objects.extend(hittables)
+        self._invalidate()
+
+    def _invalidate(self):
+        self._bbox = None
+        self._prepared = False
+        self._bounds = None
+        self._accel = None
+
+    def children(self) -> Sequence[Hittable]:
+        return self.objects
+
+    def invalidate_bounds(self):
+        self._invalidate()
+        super().invalidate_bounds()
+
+    def prepare(self):
+        if not self._prepared:
+            self._prepare()
+        super().prepare()
+
+    def _prepare(self):
+        """
+        computes the union bounding box of the hittables and, for long lists, builds the acceleration structure
+        """
+        self._prepared = True
+        boxes = [hittable.bounding_box(self.time0, self.time1) for hittable in self.objects]
+        if len(boxes) == 0 or any(box is None for box in boxes):
+            return
+        bounds = boxes[0]
+        for box in boxes[1:]:
+            bounds = Aabb.surrounding_box(bounds, box)
+        self._bounds = bounds
+
+        if self.accel_threshold is not None and len(self.objects) > self.accel_threshold:
+            # imported here, the builder depends on this module
+            from hittables.bvh_builder import build_lbvh
+            self._accel = build_lbvh(self, self.time0, self.time1)
+
+    def _bounds_hit(self, r: Ray, t_min: float, t_max: float) -> bool:
+        """
+        tests if the Ray `r` can hit anything in this list, by testing it against the cached union bounding box
+        """
+        if not self._prepared:
+            self._prepare()
+        return self._bounds is None or self._bounds.hit(r, t_min, t_max) is not None
 
     def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
+        # only the closest hit is resolved into a HitRecord
+        surface_hit = self.intersect(r, t_min, t_max)
+        return surface_hit.resolve() if surface_hit else None
+
+    def intersect(self, r: Ray, t_min: float, t_max: float) -> Optional[SurfaceHit]:
         # iterate through the list of hittables to determine if a `Ray` has hit some
-        # object in this list. If an object was hit, a HitRecord is returned
-        # containing details of the **closest hit**. If nothing was hit by the ray,
-        # `None` is returned
+        # object in this list. If an object was hit, a SurfaceHit is returned
+        # for the **closest hit**. If nothing was hit by the ray, `None` is returned
+        if not self._bounds_hit(r, t_min, t_max):
+            return None
+        if self._accel is not None:
+            return self._accel.intersect(r, t_min, t_max)
+
         closest_so_far = t_max
-        hit_anything: Optional[HitRecord] = None
+        hit_anything: Optional[SurfaceHit] = None
 
         for hittable in self.objects:
-            hit_record = hittable.hit(r, t_min, closest_so_far)
-            if hit_record:
-                closest_so_far = hit_record.t
-                hit_anything = hit_record
+            surface_hit = hittable.intersect(r, t_min, closest_so_far)
+            if surface_hit:
+                closest_so_far = surface_hit.t
+                hit_anything = surface_hit
 
         return hit_anything
 
+    def occluded(self, r: Ray, t_min: float, t_max: float) -> bool:
+        # any hit will do, so stop at the first hittable that was hit
+        if not self._bounds_hit(r, t_min, t_max):
+            return False
+        if self._accel is not None:
+            return self._accel.occluded(r, t_min, t_max)
+        for hittable in self.objects:
+            if hittable.occluded(r, t_min, t_max):
+                return True
+        return False
+
     def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
         # return a single Axis aligned bounding box that surrounds all hittables that were hit by a Ray
         if len(self.objects) == 0:
             return None
 
+        # the union is cached per time interval, until the list changes or is invalidated
+        if self._bbox is None:
+            self._bbox = {}
+        if (t0, t1) in self._bbox:
+            return self._bbox[(t0, t1)]
+
         # compute a surrounding AABB for all hittables that return an AABB in self.objects
+        aabbs = [bb for bb in (hittable.bounding_box(t0, t1) for hittable in self.objects) if bb]
         output_box = None
-        # get a list of all Aabb's for each hittable that returns an Aabb
-        aabbs = list(filter(lambda abb: abb, map(lambda hittable: hittable.bounding_box(t0, t1), self.objects)))
         if len(aabbs) > 0:
             output_box = Aabb()
             for bb in aabbs:
                 output_box = Aabb.surrounding_box(output_box, bb)
 
+        self._bbox[(t0, t1)] = output_box
         return output_box
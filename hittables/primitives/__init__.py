@@ -2,3 +2,5 @@ from .box_instance import BoxInst
 from .aa_rectangle import XYRect, XZRect, YZRect
 from .sphere import Sphere
 from .moving_sphere import MovingSphere
+from .rect_set import RectSet
+from .triangle_mesh import TriangleMesh
@@ -3,9 +3,9 @@ from __future__ import annotations
 from dataclasses import dataclass
 
 from common import Vec3, Point3, Ray
-from hittables import Hittable, HitRecord, Aabb
+from hittables import Hittable, HitRecord, SurfaceHit, Aabb
 from materials import Material
-from typing import Optional
+from typing import Optional, Tuple
 
 
 @dataclass
@@ -22,6 +22,10 @@ class XYRect(Hittable):
     mat: Material
 
     def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
+        surface_hit = self.intersect(r, t_min, t_max)
+        return surface_hit.resolve() if surface_hit else None
+
+    def intersect(self, r: Ray, t_min: float, t_max: float) -> Optional[SurfaceHit]:
         t: float = (self.k - r.orig.z) / r.dir.z
         if t < t_min or t > t_max:
             return None
@@ -31,6 +35,12 @@ class XYRect(Hittable):
         if x < self.x0 or x > self.x1 or y < self.y0 or y > self.y1:
             return None
 
+        return SurfaceHit(t, self, r)
+
+    def surface_interaction(self, hit: SurfaceHit) -> HitRecord:
+        r, t = hit.ray, hit.t
+        x = r.orig.x + t * r.dir.x
+        y = r.orig.y + t * r.dir.y
         return HitRecord.with_face_normal(
             r,
             r.at(t),
@@ -40,13 +50,27 @@ class XYRect(Hittable):
             (x - self.x0) / (self.x1 - self.x0),
             (y - self.y0) / (self.y1 - self.y0))
 
+    def occluded(self, r: Ray, t_min: float, t_max: float) -> bool:
+        t: float = (self.k - r.orig.z) / r.dir.z
+        if t < t_min or t > t_max:
+            return False
+        x = r.orig.x + t * r.dir.x
+        y = r.orig.y + t * r.dir.y
+        return self.x0 <= x <= self.x1 and self.y0 <= y <= self.y1
+
+    def hit_interval(self, r: Ray, t_min: float, t_max: float) -> Optional[Tuple[float, float]]:
+        # a flat rectangle can be crossed once, but it never has an inside for a Ray to exit from
+        return None
+
     def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
         # The bounding box will have non-zero width in each dimension, so pad the Z
         # dimension a small amount
-        return Aabb(
-            Point3(self.x0, self.y0, self.k - 0.001),
-            Point3(self.x1, self.y1, self.k + 0.001)
-        )
+        if self._bbox is None:
+            self._bbox = Aabb(
+                Point3(self.x0, self.y0, self.k - 0.001),
+                Point3(self.x1, self.y1, self.k + 0.001)
+            )
+        return self._bbox
 
 
 @dataclass
@@ -63,6 +87,10 @@ class XZRect(Hittable):
     mat: Material
 
     def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
+        surface_hit = self.intersect(r, t_min, t_max)
+        return surface_hit.resolve() if surface_hit else None
+
+    def intersect(self, r: Ray, t_min: float, t_max: float) -> Optional[SurfaceHit]:
         t: float = (self.k - r.orig.y) / r.dir.y
         if t < t_min or t > t_max:
             return None
@@ -73,6 +101,12 @@ class XZRect(Hittable):
         if x < self.x0 or x > self.x1 or z < self.z0 or z > self.z1:
             return None
 
+        return SurfaceHit(t, self, r)
+
+    def surface_interaction(self, hit: SurfaceHit) -> HitRecord:
+        r, t = hit.ray, hit.t
+        x = r.orig.x + t * r.dir.x
+        z = r.orig.z + t * r.dir.z
         return HitRecord.with_face_normal(
             r,
             r.at(t),
@@ -83,13 +117,27 @@ class XZRect(Hittable):
             (z - self.z0) / (self.z1 - self.z0)
         )
 
+    def occluded(self, r: Ray, t_min: float, t_max: float) -> bool:
+        t: float = (self.k - r.orig.y) / r.dir.y
+        if t < t_min or t > t_max:
+            return False
+        x = r.orig.x + t * r.dir.x
+        z = r.orig.z + t * r.dir.z
+        return self.x0 <= x <= self.x1 and self.z0 <= z <= self.z1
+
+    def hit_interval(self, r: Ray, t_min: float, t_max: float) -> Optional[Tuple[float, float]]:
+        # a flat rectangle can be crossed once, but it never has an inside for a Ray to exit from
+        return None
+
     def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
         # The bounding box will have non-zero width in each dimension, so pad the Y
         # dimension a small amount.
-        return Aabb(
-            Point3(self.x0, self.k - 0.001, self.z0),
-            Point3(self.x1, self.k + 0.001, self.z1),
-        )
+        if self._bbox is None:
+            self._bbox = Aabb(
+                Point3(self.x0, self.k - 0.001, self.z0),
+                Point3(self.x1, self.k + 0.001, self.z1),
+            )
+        return self._bbox
 
 
 @dataclass
@@ -106,6 +154,10 @@ class YZRect(Hittable):
     mat: Material
 
     def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
+        surface_hit = self.intersect(r, t_min, t_max)
+        return surface_hit.resolve() if surface_hit else None
+
+    def intersect(self, r: Ray, t_min: float, t_max: float) -> Optional[SurfaceHit]:
         t: float = (self.k - r.orig.x) / r.dir.x
         if t < t_min or t > t_max:
             return None
@@ -116,6 +168,12 @@ class YZRect(Hittable):
         if y < self.y0 or y > self.y1 or z < self.z0 or z > self.z1:
             return None
 
+        return SurfaceHit(t, self, r)
+
+    def surface_interaction(self, hit: SurfaceHit) -> HitRecord:
+        r, t = hit.ray, hit.t
+        y = r.orig.y + t * r.dir.y
+        z = r.orig.z + t * r.dir.z
         return HitRecord.with_face_normal(
             r,
             r.at(t),
@@ -126,10 +184,24 @@ class YZRect(Hittable):
             (z - self.z0) / (self.z1 - self.z0)
         )
 
+    def occluded(self, r: Ray, t_min: float, t_max: float) -> bool:
+        t: float = (self.k - r.orig.x) / r.dir.x
+        if t < t_min or t > t_max:
+            return False
+        y = r.orig.y + t * r.dir.y
+        z = r.orig.z + t * r.dir.z
+        return self.y0 <= y <= self.y1 and self.z0 <= z <= self.z1
+
+    def hit_interval(self, r: Ray, t_min: float, t_max: float) -> Optional[Tuple[float, float]]:
+        # a flat rectangle can be crossed once, but it never has an inside for a Ray to exit from
+        return None
+
     def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
         # The bounding box will have non-zero width in each dimension, so pad the X
         # dimension a small amount.
-        return Aabb(
-            Point3(self.k - 0.001, self.y0, self.z0),
-            Point3(self.k + 0.001, self.y1, self.z1),
-        )
+        if self._bbox is None:
+            self._bbox = Aabb(
+                Point3(self.k - 0.001, self.y0, self.z0),
+                Point3(self.k + 0.001, self.y1, self.z1),
+            )
+        return self._bbox
@@ -1,9 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Sequence, Tuple
 
 from common import Point3, Ray
-from hittables import Hittable, HitRecord, Aabb, FlipFace, HittableList
+from hittables import Hittable, HitRecord, SurfaceHit, Aabb, FlipFace, HittableList
 import hittables.primitives
 from materials import Material
 
@@ -86,5 +86,31 @@ class BoxInst(Hittable):
     def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
         return self.sides.hit(r, t_min, t_max)
 
+    def intersect(self, r: Ray, t_min: float, t_max: float) -> Optional[SurfaceHit]:
+        # the closest side resolves its own HitRecord
+        return self.sides.intersect(r, t_min, t_max)
+
+    def occluded(self, r: Ray, t_min: float, t_max: float) -> bool:
+        # the sides of the box are hit where the ray enters or exits the box's slabs
+        interval = Aabb(self.box_min, self.box_max).hit(r, float("-inf"), float("inf"))
+        if interval:
+            t_enter, t_exit = interval
+            return t_min <= t_enter <= t_max or t_min <= t_exit <= t_max
+        return False
+
+    def hit_interval(self, r: Ray, t_min: float, t_max: float) -> Optional[Tuple[float, float]]:
+        # the box is axis-aligned, so a single slab test against its corners gives both crossings
+        interval = Aabb(self.box_min, self.box_max).hit(r, float("-inf"), float("inf"))
+        if interval:
+            t_enter, t_exit = interval
+            if t_min < t_enter and t_exit < t_max:
+                return t_enter, t_exit
+        return None
+
+    def children(self) -> Sequence[Hittable]:
+        return (self.sides,)
+
     def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
-        return Aabb(self.box_min, self.box_max)
+        if self._bbox is None:
+            self._bbox = Aabb(self.box_min, self.box_max)
+        return self._bbox
@@ -1,9 +1,9 @@
 import math
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 
 from common import Ray, Point3, Vec3
-from hittables import Hittable, HitRecord, Aabb
+from hittables import Hittable, HitRecord, SurfaceHit, Aabb
 import textures
 from materials import Material
 
@@ -25,6 +25,10 @@ class MovingSphere(Hittable):
         return self.center0 + ((time - self.time0) / (self.time1 - self.time0)) * (self.center1 - self.center0)
 
     def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
+        surface_hit = self.intersect(r, t_min, t_max)
+        return surface_hit.resolve() if surface_hit else None
+
+    def intersect(self, r: Ray, t_min: float, t_max: float) -> Optional[SurfaceHit]:
         # oc is this sphere's center point at the given time: t
         oc = r.orig - self.center(r.time)
         a = r.dir.length_squared()
@@ -37,12 +41,46 @@ class MovingSphere(Hittable):
             root = math.sqrt(discriminant)
             t_temp = (-half_b - root) / a
             if t_max > t_temp > t_min:
-                return self._build_hit_record(r, t_temp)
+                return SurfaceHit(t_temp, self, r)
             t_temp = (-half_b + root) / a
             if t_max > t_temp > t_min:
-                return self._build_hit_record(r, t_temp)
+                return SurfaceHit(t_temp, self, r)
         return None
 
+    def surface_interaction(self, hit: SurfaceHit) -> HitRecord:
+        return self._build_hit_record(hit.ray, hit.t)
+
+    def occluded(self, r: Ray, t_min: float, t_max: float) -> bool:
+        oc = r.orig - self.center(r.time)
+        a = r.dir.length_squared()
+        half_b = oc.dot(r.dir)
+        c = oc.length_squared() - self.radius * self.radius
+        discriminant = half_b * half_b - a * c
+
+        if discriminant > 0.0:
+            root = math.sqrt(discriminant)
+            return t_max > (-half_b - root) / a > t_min or t_max > (-half_b + root) / a > t_min
+        return False
+
+    def hit_interval(self, r: Ray, t_min: float, t_max: float) -> Optional[Tuple[float, float]]:
+        # both roots of the ray/sphere quadratic, at the ray's time, without building any HitRecords
+        oc = r.orig - self.center(r.time)
+        a = r.dir.length_squared()
+        half_b = oc.dot(r.dir)
+        c = oc.length_squared() - self.radius * self.radius
+        discriminant = half_b * half_b - a * c
+
+        if discriminant > 0.0:
+            root = math.sqrt(discriminant)
+            t_enter = (-half_b - root) / a
+            t_exit = (-half_b + root) / a
+            if t_min < t_enter and t_exit < t_max:
+                return t_enter, t_exit
+        return None
+
+    def moves_between(self, t0: float, t1: float) -> bool:
+        return t0 != t1 and self.center(t0) != self.center(t1)
+
     def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
         """
         Rake the box of the sphere at t0, and the box of the sphere at t1, and compute the
@@ -51,6 +89,15 @@ class MovingSphere(Hittable):
         :param t1: time 1
         :return: an Aabb surrounding this sphere at both times: t0 and t1
         """
+        # the box depends on the time interval, boxes are cached per interval
+        if self._bbox is None:
+            self._bbox = {}
+        bbox = self._bbox.get((t0, t1))
+        if bbox is None:
+            bbox = self._bbox[(t0, t1)] = self._compute_bounding_box(t0, t1)
+        return bbox
+
+    def _compute_bounding_box(self, t0: float, t1: float) -> Aabb:
         box0 = Aabb(
             self.center(t0) - Vec3(self.radius, self.radius, self.radius),
             self.center(t0) + Vec3(self.radius, self.radius, self.radius),
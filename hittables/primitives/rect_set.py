@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from common import Vec3, Point3, Ray
+from hittables import Hittable, HitRecord, SurfaceHit, Aabb, FlipFace
+from hittables.primitives.aa_rectangle import XYRect, XZRect, YZRect
+from materials import Material
+
+# the outward normal of a rect, by the axis its plane is perpendicular to
+_NORMALS = (Vec3(1.0, 0.0, 0.0), Vec3(0.0, 1.0, 0.0), Vec3(0.0, 0.0, 1.0))
+# the two axes spanning the plane of a rect, by the axis its plane is perpendicular to
+_PLANE_AXES = ((1, 2), (0, 2), (0, 1))
+
+
+# compared by identity, equality of the numpy array fields is ambiguous
+@dataclass(eq=False)
+class RectSet(Hittable):
+    """
+    A RectSet packs many axis-aligned rectangles, of all three orientations, into numpy arrays.
+    `intersect_arrays()` intersects many rays with all of them in one vectorized step, a single Ray
+    is tested against all of them in one tight loop, without a SurfaceHit per rect. It replaces a list, or a small BVH, of
+    `XYRect`, `XZRect` and `YZRect` hittables, optionally wrapped in a `FlipFace`, such as the walls of
+    the Cornell box.
+
+    Every rect is stored as: the axis its plane is perpendicular to (0=x, 1=y, 2=z), the plane's
+    position `k` on that axis, its extent (`a0`, `a1`), (`b0`, `b1`) along the two axes spanning the
+    plane (in x,y,z order), whether its face is flipped, and the index of its material.
+
+    use the from_rects() staticmethod to construct an instance of this class
+    """
+    axis: np.ndarray
+    k: np.ndarray
+    a0: np.ndarray
+    a1: np.ndarray
+    b0: np.ndarray
+    b1: np.ndarray
+    flip: np.ndarray
+    material_ids: np.ndarray
+    materials: List[Material]
+
+    @staticmethod
+    def from_rects(rects: Sequence[Hittable]) -> RectSet:
+        """
+        returns a RectSet holding the given rects
+        :param rects: XYRect, XZRect and YZRect hittables, each optionally wrapped in a FlipFace
+        """
+        if len(rects) == 0:
+            raise RuntimeError("can't build a RectSet without any rects")
+        rows = []
+        materials: List[Material] = []
+        for rect in rects:
+            flip = isinstance(rect, FlipFace)
+            if flip:
+                rect = rect.wrapped
+            if isinstance(rect, XYRect):
+                row = (2, rect.k, rect.x0, rect.x1, rect.y0, rect.y1)
+            elif isinstance(rect, XZRect):
+                row = (1, rect.k, rect.x0, rect.x1, rect.z0, rect.z1)
+            elif isinstance(rect, YZRect):
+                row = (0, rect.k, rect.y0, rect.y1, rect.z0, rect.z1)
+            else:
+                raise RuntimeError(f"a RectSet can't hold a {type(rect).__name__}")
+            # rects sharing a material share its index
+            material_id = next((i for i, mat in enumerate(materials) if mat is rect.mat), len(materials))
+            if material_id == len(materials):
+                materials.append(rect.mat)
+            rows.append((*row, flip, material_id))
+
+        columns = list(zip(*rows))
+        return RectSet(
+            np.array(columns[0], dtype=np.int_),
+            *(np.array(column, dtype=np.float_) for column in columns[1:6]),
+            np.array(columns[6], dtype=np.bool_),
+            np.array(columns[7], dtype=np.int_),
+            materials)
+
+    def __post_init__(self):
+        # index arrays of the axes spanning each rect's plane
+        self._a_axis = np.array([_PLANE_AXES[axis][0] for axis in self.axis], dtype=np.int_)
+        self._b_axis = np.array([_PLANE_AXES[axis][1] for axis in self.axis], dtype=np.int_)
+        # the same data as python tuples, one per rect. For a single ray, looping over a handful of
+        # rects in python is faster than the fixed overhead of several numpy calls
+        self._packed = list(zip(self.axis.tolist(), self._a_axis.tolist(), self._b_axis.tolist(), self.k.tolist(),
+                                self.a0.tolist(), self.a1.tolist(), self.b0.tolist(), self.b1.tolist()))
+
+    def __len__(self):
+        return len(self.k)
+
+    def intersect_arrays(self, origins: np.ndarray, directions: np.ndarray, t_min: float,
+                         t_max: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        intersects many rays with every rect at once
+        :param origins: an (n, 3) array of ray origins
+        :param directions: an (n, 3) array of ray directions
+        :param t_min: minimum constraint for the ray parameter
+        :param t_max: maximum constraint for the ray parameter
+        :return: (the ray parameter of the closest hit of each ray, the index of the rect it hit). Rays that
+        missed every rect have a ray parameter of infinity and an index of -1
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # (rays, rects) arrays
+            t = (self.k - origins[:, self.axis]) / directions[:, self.axis]
+            a = origins[:, self._a_axis] + t * directions[:, self._a_axis]
+            b = origins[:, self._b_axis] + t * directions[:, self._b_axis]
+        hit = (t >= t_min) & (t <= t_max) & (a >= self.a0) & (a <= self.a1) & (b >= self.b0) & (b <= self.b1)
+        t = np.where(hit, t, np.inf)
+        index = np.argmin(t, axis=1)
+        closest = t[np.arange(len(t)), index]
+        return closest, np.where(closest == np.inf, -1, index)
+
+    def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
+        surface_hit = self.intersect(r, t_min, t_max)
+        return surface_hit.resolve() if surface_hit else None
+
+    def intersect(self, r: Ray, t_min: float, t_max: float) -> Optional[SurfaceHit]:
+        origin = r.orig.to_tuple()
+        direction = r.dir.to_tuple()
+        closest_so_far = t_max
+        index = -1
+        for i, (axis, a_axis, b_axis, k, a0, a1, b0, b1) in enumerate(self._packed):
+            if direction[axis] == 0.0:
+                # the ray is parallel to the rect
+                continue
+            t = (k - origin[axis]) / direction[axis]
+            if t < t_min or t > closest_so_far:
+                continue
+            a = origin[a_axis] + t * direction[a_axis]
+            if a < a0 or a > a1:
+                continue
+            b = origin[b_axis] + t * direction[b_axis]
+            if b < b0 or b > b1:
+                continue
+            closest_so_far = t
+            index = i
+
+        if index < 0:
+            return None
+        return SurfaceHit(closest_so_far, self, r, index=index)
+
+    def surface_interaction(self, hit: SurfaceHit) -> HitRecord:
+        r, t, i = hit.ray, hit.t, hit.index
+        p = r.at(t)
+        a_axis, b_axis = _PLANE_AXES[self.axis[i]]
+        a0, a1, b0, b1 = float(self.a0[i]), float(self.a1[i]), float(self.b0[i]), float(self.b1[i])
+        rec = HitRecord.with_face_normal(
+            r,
+            p,
+            _NORMALS[self.axis[i]],
+            self.materials[self.material_ids[i]],
+            t,
+            (p[a_axis] - a0) / (a1 - a0),
+            (p[b_axis] - b0) / (b1 - b0))
+        if self.flip[i]:
+            rec.front_face = not rec.front_face
+        return rec
+
+    def occluded(self, r: Ray, t_min: float, t_max: float) -> bool:
+        return self.intersect(r, t_min, t_max) is not None
+
+    def hit_interval(self, r: Ray, t_min: float, t_max: float) -> Optional[Tuple[float, float]]:
+        # a set of flat rects has no inside for a Ray to enter and exit
+        return None
+
+    def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
+        if self._bbox is None:
+            # pad each rect's plane a small amount, like the single rects do
+            lo = np.empty((len(self), 3))
+            hi = np.empty((len(self), 3))
+            rows = np.arange(len(self))
+            lo[rows, self.axis] = self.k - 0.001
+            hi[rows, self.axis] = self.k + 0.001
+            lo[rows, self._a_axis] = self.a0
+            hi[rows, self._a_axis] = self.a1
+            lo[rows, self._b_axis] = self.b0
+            hi[rows, self._b_axis] = self.b1
+            self._bbox = Aabb(Point3(*lo.min(axis=0).tolist()), Point3(*hi.max(axis=0).tolist()))
+        return self._bbox
@@ -2,11 +2,11 @@ from __future__ import annotations
 
 import math
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 
 from common import Vec3, Point3, Ray
 from materials import Material
-from hittables import HitRecord, Aabb, Hittable
+from hittables import HitRecord, SurfaceHit, Aabb, Hittable
 import textures
 
 
@@ -33,6 +33,10 @@ class Sphere(Hittable):
         return cls(Point3(cx, cy, cz), radius, material)
 
     def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
+        surface_hit = self.intersect(r, t_min, t_max)
+        return surface_hit.resolve() if surface_hit else None
+
+    def intersect(self, r: Ray, t_min: float, t_max: float) -> Optional[SurfaceHit]:
         oc: Vec3 = r.orig - self.center
         a = r.dir.length_squared()
         half_b = oc.dot(r.dir)
@@ -44,17 +48,50 @@ class Sphere(Hittable):
             root = math.sqrt(discriminant)
             t_temp = (-half_b - root) / a
             if t_max > t_temp > t_min:
-                return self._build_hit_record(r, t_temp)
+                return SurfaceHit(t_temp, self, r)
             t_temp = (-half_b + root) / a
             if t_max > t_temp > t_min:
-                return self._build_hit_record(r, t_temp)
+                return SurfaceHit(t_temp, self, r)
+        return None
+
+    def surface_interaction(self, hit: SurfaceHit) -> HitRecord:
+        return self._build_hit_record(hit.ray, hit.t)
+
+    def occluded(self, r: Ray, t_min: float, t_max: float) -> bool:
+        oc = r.orig - self.center
+        a = r.dir.length_squared()
+        half_b = oc.dot(r.dir)
+        c = oc.length_squared() - self.radius * self.radius
+        discriminant = half_b * half_b - a * c
+
+        if discriminant > 0.0:
+            root = math.sqrt(discriminant)
+            return t_max > (-half_b - root) / a > t_min or t_max > (-half_b + root) / a > t_min
+        return False
+
+    def hit_interval(self, r: Ray, t_min: float, t_max: float) -> Optional[Tuple[float, float]]:
+        # both roots of the ray/sphere quadratic, without building any HitRecords
+        oc: Vec3 = r.orig - self.center
+        a = r.dir.length_squared()
+        half_b = oc.dot(r.dir)
+        c = oc.length_squared() - self.radius * self.radius
+        discriminant = half_b * half_b - a * c
+
+        if discriminant > 0.0:
+            root = math.sqrt(discriminant)
+            t_enter = (-half_b - root) / a
+            t_exit = (-half_b + root) / a
+            if t_min < t_enter and t_exit < t_max:
+                return t_enter, t_exit
         return None
 
     def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
-        return Aabb(
-            self.center - Vec3(self.radius, self.radius, self.radius),
-            self.center + Vec3(self.radius, self.radius, self.radius)
-        )
+        if self._bbox is None:
+            self._bbox = Aabb(
+                self.center - Vec3(self.radius, self.radius, self.radius),
+                self.center + Vec3(self.radius, self.radius, self.radius)
+            )
+        return self._bbox
 
     def _build_hit_record(self, r: Ray, t: float) -> HitRecord:
         """
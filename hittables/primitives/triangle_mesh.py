@@ -0,0 +1,393 @@
+from __future__ import annotations
+
+import array
+import hashlib
+import math
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from common import Vec3, Point3, Ray
+from hittables import Hittable, HitRecord, SurfaceHit, Aabb
+from materials import Material
+
+# the maximum number of triangles in a leaf of a mesh's BVH
+LEAF_SIZE = 16
+# rays (nearly) parallel to a triangle's plane, with a Möller–Trumbore determinant smaller than this, miss it
+_EPSILON = 1e-12
+# the version of the cache layout, changing it invalidates all caches
+CACHE_VERSION = 1
+# the arrays stored in a mesh cache directory, one .npy file each
+_CACHED_ARRAYS = ("vertices", "indices", "node_bounds", "node_links", "_v0", "_e1", "_e2")
+
+
+# compared by identity, equality of the numpy array fields is ambiguous
+@dataclass(eq=False)
+class TriangleMesh(Hittable):
+    """
+    An indexed triangle mesh. All of its data is held in numpy arrays, there are no per-triangle python objects:
+     vertices - an (n, 3) array of vertex positions
+     indices - an (m, 3) array holding the vertex indices of each triangle
+    A mesh has a BVH of its own, built over its triangles when it is constructed. The triangles are
+    re-ordered so that the triangles of every leaf of the BVH are contiguous, and each ray is tested
+    against the triangles of all the leaves it reaches in one vectorized Möller–Trumbore step.
+
+    The BVH is stored flat, in arrays:
+     node_bounds - an (k, 6) array of each node's min x,y,z and max x,y,z
+     node_links - an (k, 2) array. (index of the left child, 0) for inner nodes, whose right child
+       directly follows the left child, and (index of the first triangle, number of triangles) for leaves
+
+    The u,v coordinates of a hit are its barycentric coordinates on the triangle that was hit.
+
+    All of these arrays can be saved to a binary cache with save_cache(), and memory-mapped from it with
+    from_cache(), so worker processes share a single copy of a large mesh.
+
+    use the from_arrays(), from_obj() or from_cache() staticmethods to construct an instance of this class
+    """
+    vertices: np.ndarray
+    indices: np.ndarray
+    material: Material
+    node_bounds: np.ndarray
+    node_links: np.ndarray
+
+    @staticmethod
+    def from_arrays(vertices: np.ndarray, indices: np.ndarray, material: Material) -> TriangleMesh:
+        """
+        returns a new TriangleMesh, with a BVH built over its triangles
+        :param vertices: an (n, 3) array of vertex positions
+        :param indices: an (m, 3) array of the vertex indices of each triangle
+        :param material: the material of the mesh
+        """
+        vertices = np.ascontiguousarray(vertices, dtype=np.float_).reshape(-1, 3)
+        indices = np.ascontiguousarray(indices, dtype=np.int_).reshape(-1, 3)
+        if len(indices) == 0:
+            raise RuntimeError("can't build a TriangleMesh without any triangles")
+        if indices.min() < 0 or indices.max() >= len(vertices):
+            raise RuntimeError("a TriangleMesh has triangle indices outside of its vertices")
+
+        order, node_bounds, node_links = _build_bvh(vertices, indices)
+        return TriangleMesh(vertices, indices[order], material, node_bounds, node_links)
+
+    @staticmethod
+    def from_obj(path: str, material: Material, cache_dir: Optional[str] = None) -> TriangleMesh:
+        """
+        loads a TriangleMesh from a Wavefront .OBJ file. Only vertex positions ('v' lines) and faces ('f'
+        lines) are read, faces with more than three vertices are triangulated as a fan. The file is
+        streamed line by line into flat, typed, arrays
+        :param path: path to the .OBJ file
+        :param material: the material of the mesh
+        :param cache_dir: if given, the processed mesh, including its BVH, is cached in a sub-directory of
+        this directory and loaded from there, memory-mapped, as long as the .OBJ file doesn't change
+        """
+        if cache_dir is None:
+            vertices, indices = load_obj(path)
+            return TriangleMesh.from_arrays(vertices, indices, material)
+
+        cache_path = os.path.join(cache_dir, _cache_name(path))
+        if not os.path.isdir(cache_path):
+            vertices, indices = load_obj(path)
+            TriangleMesh.from_arrays(vertices, indices, material).save_cache(cache_path)
+        return TriangleMesh.from_cache(cache_path, material)
+
+    @staticmethod
+    def from_cache(cache_path: str, material: Material) -> TriangleMesh:
+        """
+        opens a mesh saved by `save_cache()`. Its arrays are memory-mapped, read-only, so every process
+        that opens the same cache shares the same physical pages through the OS page cache. Pickling a
+        mesh opened from a cache only pickles the cache's path, and unpickling re-opens it
+        :param cache_path: the directory the mesh was saved to
+        :param material: the material of the mesh
+        """
+        arrays = {name: np.load(os.path.join(cache_path, f"{name}.npy"), mmap_mode="r") for name in _CACHED_ARRAYS}
+        mesh = TriangleMesh.__new__(TriangleMesh)
+        mesh.__dict__.update(arrays)
+        mesh.material = material
+        mesh._cache_path = cache_path
+        mesh._prepare()
+        return mesh
+
+    def save_cache(self, cache_path: str):
+        """
+        saves the mesh's vertices, triangles, pre-computed triangle edges and BVH to a directory, as
+        one uncompressed .npy file per array, which `from_cache()` can memory-map.
+        The directory is written to a temporary directory first, and then renamed, so concurrent
+        readers never see a partially written cache
+        :param cache_path: the directory to save the mesh to
+        """
+        parent = os.path.dirname(os.path.abspath(cache_path))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=parent)
+        try:
+            for name in _CACHED_ARRAYS:
+                np.save(os.path.join(staging, f"{name}.npy"), np.ascontiguousarray(getattr(self, name)))
+            os.rename(staging, cache_path)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            # another process saved the same cache first
+            if not os.path.isdir(cache_path):
+                raise
+
+    def __post_init__(self):
+        self._prepare()
+
+    def _prepare(self):
+        if "_v0" not in self.__dict__:
+            # the corner and the two edges of each triangle, the terms of the Möller–Trumbore test
+            v0 = self.vertices[self.indices[:, 0]]
+            self._v0 = v0
+            self._e1 = self.vertices[self.indices[:, 1]] - v0
+            self._e2 = self.vertices[self.indices[:, 2]] - v0
+        # flat, zero-copy, views of the BVH, indexing them returns python numbers, which is much
+        # faster than indexing a numpy array during traversal
+        self._bounds_view = memoryview(np.ascontiguousarray(self.node_bounds).reshape(-1))
+        self._links_view = memoryview(np.ascontiguousarray(self.node_links).reshape(-1))
+
+    def __getstate__(self):
+        cache_path = self.__dict__.get("_cache_path")
+        if cache_path is not None:
+            # a cached mesh is re-opened from its cache, instead of copying its arrays
+            return {"_cache_path": cache_path, "material": self.material}
+        # memoryviews can't be pickled, they are re-created when unpickled
+        return {key: value for key, value in self.__dict__.items()
+                if key not in ("_v0", "_e1", "_e2", "_bounds_view", "_links_view")}
+
+    def __setstate__(self, state):
+        if "vertices" not in state:
+            self.__dict__.update(TriangleMesh.from_cache(state["_cache_path"], state["material"]).__dict__)
+            return
+        self.__dict__.update(state)
+        self._prepare()
+
+    def __len__(self):
+        return len(self.indices)
+
+    def _leaf_triangles(self, r: Ray, t_min: float, t_max: float) -> List[Tuple[int, int]]:
+        """
+        :return: the (first triangle, one past the last triangle) of every leaf whose bounding box the ray hits
+        """
+        ox, oy, oz = r.orig.x, r.orig.y, r.orig.z
+        ix = 1.0 / r.dir.x if r.dir.x != 0.0 else math.inf
+        iy = 1.0 / r.dir.y if r.dir.y != 0.0 else math.inf
+        iz = 1.0 / r.dir.z if r.dir.z != 0.0 else math.inf
+        bounds = self._bounds_view
+        links = self._links_view
+
+        ranges = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            b = 6 * node
+            # slab test, the same as Aabb.hit
+            t0 = (bounds[b] - ox) * ix
+            t1 = (bounds[b + 3] - ox) * ix
+            if ix < 0.0:
+                t0, t1 = t1, t0
+            lo = t0 if t0 > t_min else t_min
+            hi = t1 if t1 < t_max else t_max
+            if hi <= lo:
+                continue
+            t0 = (bounds[b + 1] - oy) * iy
+            t1 = (bounds[b + 4] - oy) * iy
+            if iy < 0.0:
+                t0, t1 = t1, t0
+            lo = t0 if t0 > lo else lo
+            hi = t1 if t1 < hi else hi
+            if hi <= lo:
+                continue
+            t0 = (bounds[b + 2] - oz) * iz
+            t1 = (bounds[b + 5] - oz) * iz
+            if iz < 0.0:
+                t0, t1 = t1, t0
+            lo = t0 if t0 > lo else lo
+            hi = t1 if t1 < hi else hi
+            if hi <= lo:
+                continue
+
+            first, count = links[2 * node], links[2 * node + 1]
+            if count:
+                ranges.append((first, first + count))
+            else:
+                stack.append(first + 1)
+                stack.append(first)
+        return ranges
+
+    def _closest_triangle(self, r: Ray, t_min: float, t_max: float,
+                          triangles: np.ndarray) -> Optional[Tuple[float, int]]:
+        """
+        intersects the ray with the given triangles, all at once, using the Möller–Trumbore algorithm
+        :return: (the ray parameter, the triangle index) of the closest hit, or None
+        """
+        d = np.array(r.dir.to_tuple())
+        v0, e1, e2 = self._v0[triangles], self._e1[triangles], self._e2[triangles]
+        p = np.cross(d, e2)
+        det = np.einsum("ij,ij->i", e1, p)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            inv_det = 1.0 / det
+            s = np.array(r.orig.to_tuple()) - v0
+            u = np.einsum("ij,ij->i", s, p) * inv_det
+            q = np.cross(s, e1)
+            v = (q @ d) * inv_det
+            t = np.einsum("ij,ij->i", e2, q) * inv_det
+            hit = (np.abs(det) > _EPSILON) & (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) & (t >= t_min) & (t <= t_max)
+        if not hit.any():
+            return None
+        t = np.where(hit, t, np.inf)
+        closest = int(np.argmin(t))
+        return float(t[closest]), int(triangles[closest])
+
+    def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
+        surface_hit = self.intersect(r, t_min, t_max)
+        return surface_hit.resolve() if surface_hit else None
+
+    def intersect(self, r: Ray, t_min: float, t_max: float) -> Optional[SurfaceHit]:
+        ranges = self._leaf_triangles(r, t_min, t_max)
+        if not ranges:
+            return None
+        triangles = np.concatenate([np.arange(first, end) for first, end in ranges])
+        closest = self._closest_triangle(r, t_min, t_max, triangles)
+        if closest is None:
+            return None
+        t, triangle = closest
+        return SurfaceHit(t, self, r, index=triangle)
+
+    def surface_interaction(self, hit: SurfaceHit) -> HitRecord:
+        r, t, i = hit.ray, hit.t, hit.index
+        v0 = Point3(*self._v0[i].tolist())
+        e1 = Vec3(*self._e1[i].tolist())
+        e2 = Vec3(*self._e2[i].tolist())
+        p = r.at(t)
+        # barycentric coordinates of the hit point
+        normal = e1.cross(e2)
+        to_p = p - v0
+        denominator = normal.dot(normal)
+        u = to_p.cross(e2).dot(normal) / denominator
+        v = e1.cross(to_p).dot(normal) / denominator
+        return HitRecord.with_face_normal(r, p, normal.unit_vector(), self.material, t, u, v)
+
+    def occluded(self, r: Ray, t_min: float, t_max: float) -> bool:
+        return self.intersect(r, t_min, t_max) is not None
+
+    def hit_interval(self, r: Ray, t_min: float, t_max: float) -> Optional[Tuple[float, float]]:
+        # a mesh is not known to be convex
+        return None
+
+    def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
+        if self._bbox is None:
+            # the root node's box
+            self._bbox = Aabb(Point3(*self.node_bounds[0, :3].tolist()), Point3(*self.node_bounds[0, 3:].tolist()))
+        return self._bbox
+
+
+def _build_bvh(vertices: np.ndarray, indices: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    builds a BVH over the triangles, splitting every node at the median centroid along the longest
+    axis of its centroids' bounds, until nodes hold at most LEAF_SIZE triangles
+    :return: (the triangles in leaf order, the node bounds, the node links). See `TriangleMesh`
+    """
+    corners = vertices[indices]
+    tri_min = corners.min(axis=1)
+    tri_max = corners.max(axis=1)
+    # flat triangles get a box with a small, non-zero, width, like the axis-aligned rects
+    flat = tri_max - tri_min < 0.0001
+    tri_min = np.where(flat, tri_min - 0.0001, tri_min)
+    tri_max = np.where(flat, tri_max + 0.0001, tri_max)
+    centroids = 0.5 * (tri_min + tri_max)
+    del corners
+
+    order = np.arange(len(indices))
+    # nodes are appended in pairs, so the right child of every inner node follows its left child
+    node_links = array.array("q", [0, 0])
+    node_ranges = [(0, len(indices))]
+
+    stack = [0]
+    while stack:
+        node = stack.pop()
+        start, end = node_ranges[node]
+        if end - start <= LEAF_SIZE:
+            node_links[2 * node] = start
+            node_links[2 * node + 1] = end - start
+            continue
+
+        triangles = order[start:end]
+        node_centroids = centroids[triangles]
+        axis = int(np.argmax(node_centroids.max(axis=0) - node_centroids.min(axis=0)))
+        mid = (end - start) // 2
+        # only the median has to be in place, the triangles either side of it are split but not sorted
+        order[start:end] = triangles[np.argpartition(node_centroids[:, axis], mid)]
+
+        left = len(node_ranges)
+        node_ranges.append((start, start + mid))
+        node_ranges.append((start + mid, end))
+        node_links.extend([0, 0, 0, 0])
+        node_links[2 * node] = left
+        stack.append(left + 1)
+        stack.append(left)
+
+    links = np.frombuffer(node_links, dtype=np.int64).reshape(-1, 2).astype(np.int_)
+
+    # the bounds of the leaves, whose triangles are contiguous in leaf order, are reduced in one step each
+    bounds = np.empty((len(links), 6), dtype=np.float_)
+    leaves = np.nonzero(links[:, 1])[0]
+    leaf_starts = links[leaves, 0]
+    leaf_order = np.argsort(leaf_starts)
+    bounds[leaves[leaf_order], :3] = np.minimum.reduceat(tri_min[order], leaf_starts[leaf_order])
+    bounds[leaves[leaf_order], 3:] = np.maximum.reduceat(tri_max[order], leaf_starts[leaf_order])
+
+    # then inner nodes are the union of their children, children always come after their parent
+    flat_bounds = bounds.reshape(-1).tolist()
+    flat_links = links.reshape(-1).tolist()
+    for node in range(len(links) - 1, -1, -1):
+        if flat_links[2 * node + 1] == 0:
+            b = 6 * node
+            left = 6 * flat_links[2 * node]
+            right = left + 6
+            for i in range(3):
+                flat_bounds[b + i] = min(flat_bounds[left + i], flat_bounds[right + i])
+                flat_bounds[b + 3 + i] = max(flat_bounds[left + 3 + i], flat_bounds[right + 3 + i])
+
+    return order, np.array(flat_bounds, dtype=np.float_).reshape(-1, 6), links
+
+
+def _cache_name(path: str) -> str:
+    """
+    :return: the name of the cache directory of an .OBJ file. It changes when the file is modified
+    """
+    stat = os.stat(path)
+    key = f"{CACHE_VERSION}:{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}:{LEAF_SIZE}"
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return f"{stem}-{hashlib.sha256(key.encode()).hexdigest()[:16]}"
+
+
+def load_obj(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    streams the vertex positions and triangles of a Wavefront .OBJ file into flat, typed, arrays.
+    Faces with more than three vertices are triangulated as a fan, vertex references can be absolute
+    (1-based) or relative (negative), and texture and normal references ('v/vt/vn') are ignored
+    :param path: path to the .OBJ file
+    :return: (an (n, 3) array of vertex positions, an (m, 3) array of the vertex indices of each triangle)
+    """
+    vertices = array.array("d")
+    indices = array.array("q")
+    with open(path, "r") as obj_file:
+        for line in obj_file:
+            if line.startswith("v "):
+                x, y, z = line.split()[1:4]
+                vertices.append(float(x))
+                vertices.append(float(y))
+                vertices.append(float(z))
+            elif line.startswith("f "):
+                vertex_count = len(vertices) // 3
+                refs = line.split()[1:]
+                face = [int(ref.split("/", 1)[0]) for ref in refs]
+                face = [ref - 1 if ref > 0 else vertex_count + ref for ref in face]
+                for i in range(1, len(face) - 1):
+                    indices.append(face[0])
+                    indices.append(face[i])
+                    indices.append(face[i + 1])
+
+    return (np.frombuffer(vertices, dtype=np.float_).reshape(-1, 3),
+            np.frombuffer(indices, dtype=np.int64).reshape(-1, 3).astype(np.int_))
@@ -0,0 +1,85 @@
+"""
+Packet traversal of a BVH: a bundle of coherent rays, such as the camera rays of neighbouring pixels, walks the
+tree together. Each node's box is tested against all the packet's active rays at once, with NumPy slab tests, and
+a node's children are only visited by the rays that hit its box closer than their closest hit so far. Traversal
+stops descending as soon as no ray of the packet is active. The primitives in the leaves are still tested one ray
+at a time, with their `intersect()` method.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from common import Ray
+from hittables import Hittable, Aabb, HitRecord, SurfaceHit
+from hittables.bvh_node import BvhNode
+
+
+def _box_arrays(node: BvhNode) -> (np.ndarray, np.ndarray):
+    """
+    :return: the min and max corners of the node's box as arrays, cached on the node until its box changes
+    """
+    cached = node.__dict__.get("_packet_box")
+    if cached is None or cached[0] is not node.bbox:
+        box: Aabb = node.bbox
+        cached = (box,
+                  np.array([box.min.x, box.min.y, box.min.z]),
+                  np.array([box.max.x, box.max.y, box.max.z]))
+        node.__dict__["_packet_box"] = cached
+    return cached[1], cached[2]
+
+
+def intersect_packet(root: Hittable, rays: Sequence[Ray], t_min: float, t_max: float) -> List[Optional[SurfaceHit]]:
+    """
+    finds the closest hit of each of the `rays` with `root`, the same hits as calling `root.intersect()` for each
+    ray. Roots that are not a BvhNode are intersected one ray at a time
+
+    :param root: the hittable to intersect, usually the root BvhNode of the world
+    :param rays: the rays of the packet
+    :param t_min: minimum ray parameter for a hit to be valid
+    :param t_max: maximum ray parameter for a hit to be valid
+    :return: the closest SurfaceHit of each ray, or None for the rays that hit nothing
+    """
+    if not isinstance(root, BvhNode):
+        return [root.intersect(r, t_min, t_max) for r in rays]
+
+    origins = np.array([[r.orig.x, r.orig.y, r.orig.z] for r in rays])
+    directions = np.array([[r.dir.x, r.dir.y, r.dir.z] for r in rays])
+    with np.errstate(divide="ignore"):
+        inv_directions = 1.0 / directions
+
+    hits: List[Optional[SurfaceHit]] = [None] * len(rays)
+    closest = np.full(len(rays), t_max)
+    stack = [(root, np.arange(len(rays)))]
+    while stack:
+        node, active = stack.pop()
+        if isinstance(node, BvhNode):
+            # slab test of the node's box against the active rays. fmin and fmax ignore the NaNs of rays that are
+            # parallel to, and on, a slab's plane, so those rays are kept
+            box_min, box_max = _box_arrays(node)
+            with np.errstate(invalid="ignore"):
+                t0 = (box_min - origins[active]) * inv_directions[active]
+                t1 = (box_max - origins[active]) * inv_directions[active]
+            t_near = np.fmax(np.fmax.reduce(np.fmin(t0, t1), axis=1), t_min)
+            t_far = np.fmin(np.fmin.reduce(np.fmax(t0, t1), axis=1), closest[active])
+            active = active[t_near <= t_far]
+            if active.size:
+                if node.right is not node.left:
+                    stack.append((node.right, active))
+                stack.append((node.left, active))
+        else:
+            for i in active:
+                surface_hit = node.intersect(rays[i], t_min, closest[i])
+                if surface_hit:
+                    hits[i] = surface_hit
+                    closest[i] = surface_hit.t
+    return hits
+
+
+def hit_packet(root: Hittable, rays: Sequence[Ray], t_min: float, t_max: float) -> List[Optional[HitRecord]]:
+    """
+    the same as `intersect_packet()`, but returns the resolved HitRecord of each ray's closest hit
+    """
+    return [surface_hit.resolve() if surface_hit else None
+            for surface_hit in intersect_packet(root, rays, t_min, t_max)]
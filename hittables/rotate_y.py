@@ -3,11 +3,11 @@ from __future__ import annotations
 import copy
 import math
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Sequence, Tuple
 
 import common
 from common import Point3, Vec3, Ray
-from hittables import Hittable, Aabb, HitRecord
+from hittables import Hittable, Aabb, HitRecord, SurfaceHit
 
 
 @dataclass
@@ -20,7 +20,6 @@ class RotateY(Hittable):
     hittable: Hittable
     sin_theta: float
     cos_theta: float
-    bbox: Optional[Aabb]
 
     @classmethod
     def from_hittable(cls, hittable: Hittable, angle: float) -> RotateY:
@@ -32,33 +31,53 @@ class RotateY(Hittable):
         :param hittable: the hittable to be rotated
         :param angle: the rotation amount **in degrees**
         """
-        bbox = hittable.bounding_box(0.0, 1.0)
-        if not bbox:
+        if not hittable.bounding_box(0.0, 1.0):
             raise RuntimeError("cant construct a RotateY on a hittable that doesnt have a bounding box")
 
         sin_theta = math.sin(common.degrees_to_radians(angle))
         cos_theta = math.cos(common.degrees_to_radians(angle))
-        min_point = Point3(float("inf"), float("inf"), float("inf"))
-        max_point = Point3(float("-inf"), float("-inf"), float("-inf"))
+        return cls(hittable, sin_theta, cos_theta)
 
-        for i in range(2):
-            for j in range(2):
-                for k in range(2):
-                    x = float(i) * bbox.max.x + (1.0 - float(i)) * bbox.min.x
-                    y = float(j) * bbox.max.y + (1.0 - float(j)) * bbox.min.y
-                    z = float(k) * bbox.max.z + (1.0 - float(k)) * bbox.min.z
+    def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
+        surface_hit = self.intersect(r, t_min, t_max)
+        return surface_hit.resolve() if surface_hit else None
 
-                    new_x = cos_theta * x + sin_theta * z
-                    new_z = (-sin_theta * x) + (cos_theta * z)
-                    tester = Vec3(new_x, y, new_z)
+    def intersect(self, r: Ray, t_min: float, t_max: float) -> Optional[SurfaceHit]:
+        inner = self.hittable.intersect(self._rotate_ray(r), t_min, t_max)
+        if inner:
+            return SurfaceHit(inner.t, self, r, inner)
+        else:
+            return None
 
-                    for c in range(3):
-                        min_point[c] = min(min_point[c], tester[c])
-                        max_point[c] = max(max_point[c], tester[c])
+    def surface_interaction(self, hit: SurfaceHit) -> HitRecord:
+        # the inner hit was made by the rotated ray
+        rotated_r = hit.inner.ray
+        hit_rec = hit.inner.resolve()
 
-        return cls(hittable, sin_theta, cos_theta, Aabb(min_point, max_point))
+        p = copy.copy(hit_rec.p)
+        normal = copy.copy(hit_rec.normal)
 
-    def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
+        p[0] = self.cos_theta * hit_rec.p[0] + self.sin_theta * hit_rec.p[2]
+        p[2] = -self.sin_theta * hit_rec.p[0] + self.cos_theta * hit_rec.p[2]
+        normal[0] = self.cos_theta * hit_rec.normal[0] + self.sin_theta * hit_rec.normal[2]
+        normal[2] = -self.sin_theta * hit_rec.normal[0] + self.cos_theta * hit_rec.normal[2]
+
+        hit_rec.p = p
+        hit_rec.set_face_normal(rotated_r, normal)
+
+        return hit_rec
+
+    def occluded(self, r: Ray, t_min: float, t_max: float) -> bool:
+        return self.hittable.occluded(self._rotate_ray(r), t_min, t_max)
+
+    def hit_interval(self, r: Ray, t_min: float, t_max: float) -> Optional[Tuple[float, float]]:
+        # rotation does not change the ray parameter of the crossings
+        return self.hittable.hit_interval(self._rotate_ray(r), t_min, t_max)
+
+    def _rotate_ray(self, r: Ray) -> Ray:
+        """
+        returns a copy of the Ray 'r' rotated into the wrapped hittable's un-rotated space
+        """
         origin = copy.copy(r.orig)
         direction = copy.copy(r.dir)
 
@@ -68,26 +87,42 @@ class RotateY(Hittable):
         direction[0] = self.cos_theta * r.dir[0] - self.sin_theta * r.dir[2]
         direction[2] = self.sin_theta * r.dir[0] + self.cos_theta * r.dir[2]
 
-        rotated_r = Ray(origin, direction, r.time)
+        return Ray(origin, direction, r.time)
 
-        hit_rec = self.hittable.hit(rotated_r, t_min, t_max)
-        if hit_rec:
-            p = copy.copy(hit_rec.p)
-            normal = copy.copy(hit_rec.normal)
+    def children(self) -> Sequence[Hittable]:
+        return (self.hittable,)
 
-            p[0] = self.cos_theta * hit_rec.p[0] + self.sin_theta * hit_rec.p[2]
-            p[2] = -self.sin_theta * hit_rec.p[0] + self.cos_theta * hit_rec.p[2]
-            normal[0] = self.cos_theta * hit_rec.normal[0] + self.sin_theta * hit_rec.normal[2]
-            normal[2] = -self.sin_theta * hit_rec.normal[0] + self.cos_theta * hit_rec.normal[2]
+    def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
+        # the wrapped hittable can move, the rotated box is cached per time interval
+        if self._bbox is None:
+            self._bbox = {}
+        if (t0, t1) not in self._bbox:
+            bbox = self.hittable.bounding_box(t0, t1)
+            self._bbox[(t0, t1)] = self._rotate_box(bbox) if bbox else None
+        return self._bbox[(t0, t1)]
+
+    def _rotate_box(self, bbox: Aabb) -> Aabb:
+        """
+        returns the axis aligned box that bounds the eight corners of *bbox* once they are rotated
+        """
+        min_point = Point3(float("inf"), float("inf"), float("inf"))
+        max_point = Point3(float("-inf"), float("-inf"), float("-inf"))
 
-            hit_rec.p = p
-            hit_rec.set_face_normal(rotated_r, normal)
+        for i in range(2):
+            for j in range(2):
+                for k in range(2):
+                    x = float(i) * bbox.max.x + (1.0 - float(i)) * bbox.min.x
+                    y = float(j) * bbox.max.y + (1.0 - float(j)) * bbox.min.y
+                    z = float(k) * bbox.max.z + (1.0 - float(k)) * bbox.min.z
 
-            return hit_rec
-        else:
-            return None
+                    new_x = self.cos_theta * x + self.sin_theta * z
+                    new_z = (-self.sin_theta * x) + (self.cos_theta * z)
+                    tester = Vec3(new_x, y, new_z)
 
-    def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
-        return self.bbox
+                    for c in range(3):
+                        min_point[c] = min(min_point[c], tester[c])
+                        max_point[c] = max(max_point[c], tester[c])
+
+        return Aabb(min_point, max_point)
 
 
@@ -2,10 +2,10 @@ from __future__ import annotations
 
 import copy
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Sequence, Tuple
 
 from common import Vec3, Ray
-from hittables import Hittable, Aabb, HitRecord
+from hittables import Hittable, Aabb, HitRecord, SurfaceHit
 
 
 @dataclass
@@ -23,20 +23,46 @@ class Translate(Hittable):
     offset: Vec3
 
     def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
-        moved_r = Ray(r.orig - self.offset, copy.copy(r.dir), r.time)
+        surface_hit = self.intersect(r, t_min, t_max)
+        return surface_hit.resolve() if surface_hit else None
 
-        hit_rec = self.hittable.hit(moved_r, t_min, t_max)
-        if hit_rec:
-            hit_rec.p += self.offset
-            hit_rec.set_face_normal(moved_r, copy.copy(hit_rec.normal))
-            return hit_rec
+    def intersect(self, r: Ray, t_min: float, t_max: float) -> Optional[SurfaceHit]:
+        inner = self.hittable.intersect(self._move_ray(r), t_min, t_max)
+        if inner:
+            return SurfaceHit(inner.t, self, r, inner)
         else:
             return None
 
+    def surface_interaction(self, hit: SurfaceHit) -> HitRecord:
+        # the inner hit was made by the moved ray
+        moved_r = hit.inner.ray
+        hit_rec = hit.inner.resolve()
+        hit_rec.p += self.offset
+        hit_rec.set_face_normal(moved_r, copy.copy(hit_rec.normal))
+        return hit_rec
+
+    def occluded(self, r: Ray, t_min: float, t_max: float) -> bool:
+        return self.hittable.occluded(self._move_ray(r), t_min, t_max)
+
+    def hit_interval(self, r: Ray, t_min: float, t_max: float) -> Optional[Tuple[float, float]]:
+        # translation does not change the ray parameter of the crossings
+        return self.hittable.hit_interval(self._move_ray(r), t_min, t_max)
+
+    def _move_ray(self, r: Ray) -> Ray:
+        """
+        returns a copy of the Ray 'r' moved into the wrapped hittable's un-translated space
+        """
+        return Ray(r.orig - self.offset, copy.copy(r.dir), r.time)
+
+    def children(self) -> Sequence[Hittable]:
+        return (self.hittable,)
+
     def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
-        bbox = self.hittable.bounding_box(t0, t1)
-        if bbox:
-            return Aabb(bbox.min + self.offset, bbox.max + self.offset)
-        else:
-            return None
+        # the wrapped hittable can move, the moved box is cached per time interval
+        if self._bbox is None:
+            self._bbox = {}
+        if (t0, t1) not in self._bbox:
+            bbox = self.hittable.bounding_box(t0, t1)
+            self._bbox[(t0, t1)] = Aabb(bbox.min + self.offset, bbox.max + self.offset) if bbox else None
+        return self._bbox[(t0, t1)]
 
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Dict
+
+from common import Ray, Point3
+from hittables import Hittable, Aabb, HittableList, HitRecord, SurfaceHit
+
+# the number of cells along the longest axis of a grid is GRID_DENSITY ⋅ ∛(number of hittables)
+GRID_DENSITY = 3.0
+# the maximum number of cells along any axis of a grid
+MAX_RESOLUTION = 64
+# cells of a top level grid holding more than this many hittables get a grid of their own
+MAX_CELL_OBJECTS = 16
+
+
+@dataclass
+class UniformGrid(Hittable):
+    """
+    A UniformGrid is an acceleration structure, like a `BvhNode`, that divides its bounding box into
+    equally sized cells. Each cell holds the hittables whose bounding boxes overlap it.
+    Rays walk through the cells they pass through, front to back, using a 3D digital differential
+    analyzer (3D-DDA), and stop at the first cell containing a hit. Grids work best for content that
+    is spread evenly through the scene, like a box of spheres.
+
+    Cells holding many hittables can have a grid of their own, making this a two level grid.
+
+    use the from_hittable_list() staticmethod to construct an instance of this class
+    """
+    bbox: Aabb
+    # the number of cells along the x,y,z axis
+    resolution: Tuple[int, int, int]
+    # the hittables in each cell, indexed by x + nx ⋅ (y + ny ⋅ z)
+    cells: List[Tuple[Hittable, ...]]
+
+    @staticmethod
+    def from_hittable_list(hit_list: HittableList, time0: float, time1: float,
+                           max_cell_objects: Optional[int] = MAX_CELL_OBJECTS) -> UniformGrid:
+        """
+        returns a UniformGrid built from the given list of Hittables
+        :param hit_list: the hittables to build the grid from
+        :param time0: time interval begin
+        :param time1: time interval end
+        :param max_cell_objects: cells with more hittables than this get a nested grid. None builds
+        a single level grid
+        """
+        objects = hit_list.objects
+        if len(objects) == 0:
+            raise RuntimeError("can't build a grid from an empty list of hittables")
+        boxes = [hittable.bounding_box(time0, time1) for hittable in objects]
+        if any(box is None for box in boxes):
+            raise RuntimeError("a hittable did not have a bounding box during grid construction")
+
+        bounds = boxes[0]
+        for box in boxes[1:]:
+            bounds = Aabb.surrounding_box(bounds, box)
+        return UniformGrid._build(objects, boxes, bounds, max_cell_objects)
+
+    @staticmethod
+    def _build(objects: Sequence[Hittable], boxes: Sequence[Aabb], bounds: Aabb,
+               max_cell_objects: Optional[int]) -> UniformGrid:
+        """
+        builds a grid covering `bounds` over the given hittables and their bounding boxes
+        """
+        lo = bounds.min.to_tuple()
+        extent = [hi - l for hi, l in zip(bounds.max.to_tuple(), lo)]
+        cells_per_unit = GRID_DENSITY * len(objects) ** (1.0 / 3.0) / max(max(extent), 1e-9)
+        resolution = tuple(min(max(int(round(e * cells_per_unit)), 1), MAX_RESOLUTION) for e in extent)
+        grid = UniformGrid(bounds, resolution, [])
+
+        nx, ny, nz = resolution
+        cell_lists: List[List[int]] = [[] for _ in range(nx * ny * nz)]
+        for i, box in enumerate(boxes):
+            x0, y0, z0 = grid._cell_of(box.min.to_tuple())
+            x1, y1, z1 = grid._cell_of(box.max.to_tuple())
+            for z in range(z0, z1 + 1):
+                for y in range(y0, y1 + 1):
+                    for x in range(x0, x1 + 1):
+                        cell_lists[x + nx * (y + ny * z)].append(i)
+
+        for index, cell in enumerate(cell_lists):
+            if max_cell_objects is not None and len(cell) > max_cell_objects:
+                # the nested grid only covers the part of the cell its hittables overlap
+                cell_box = grid._cell_box(index)
+                cell_min = cell_box.min.to_tuple()
+                cell_max = cell_box.max.to_tuple()
+                union_min = _union_min(boxes, cell)
+                union_max = _union_max(boxes, cell)
+                nested_min = [max(a, b) for a, b in zip(cell_min, union_min)]
+                nested_max = [min(a, b) for a, b in zip(cell_max, union_max)]
+                for axis in range(3):
+                    # hittables that only touch the cell can leave an empty range, keep the cell's range
+                    if nested_min[axis] > nested_max[axis]:
+                        nested_min[axis], nested_max[axis] = cell_min[axis], cell_max[axis]
+                cell_bounds = Aabb(Point3(*nested_min), Point3(*nested_max))
+                nested = UniformGrid._build([objects[i] for i in cell], [boxes[i] for i in cell], cell_bounds, None)
+                grid.cells.append((nested,))
+            else:
+                grid.cells.append(tuple(objects[i] for i in cell))
+        return grid
+
+    def _cell_of(self, p: Tuple[float, float, float]) -> Tuple[int, int, int]:
+        """
+        :return: the x,y,z index of the cell containing the point `p`, clamped to the grid
+        """
+        return tuple(self._axis_cell(p[axis], axis) for axis in range(3))
+
+    def _axis_cell(self, v: float, axis: int) -> int:
+        lo = self.bbox.min[axis]
+        extent = self.bbox.max[axis] - lo
+        n = self.resolution[axis]
+        cell = int((v - lo) / extent * n) if extent > 0.0 else 0
+        return min(max(cell, 0), n - 1)
+
+    def _cell_box(self, index: int) -> Aabb:
+        """
+        :return: the bounding box of the cell at `index`
+        """
+        nx, ny, _ = self.resolution
+        cell = (index % nx, (index // nx) % ny, index // (nx * ny))
+        lo = self.bbox.min.to_tuple()
+        hi = self.bbox.max.to_tuple()
+        size = [(h - l) / n for l, h, n in zip(lo, hi, self.resolution)]
+        return Aabb(Point3(*(l + c * s for l, c, s in zip(lo, cell, size))),
+                    Point3(*(l + (c + 1) * s for l, c, s in zip(lo, cell, size))))
+
+    def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
+        surface_hit = self.intersect(r, t_min, t_max)
+        return surface_hit.resolve() if surface_hit else None
+
+    def intersect(self, r: Ray, t_min: float, t_max: float) -> Optional[SurfaceHit]:
+        # hittables can overlap several cells, so the closest hit of every hittable is remembered
+        # (mailboxed) the first time it is tested. A hit only counts once the walk reaches the cell it is in
+        tested: Dict[int, Optional[SurfaceHit]] = {}
+        for cell, cell_exit in self._walk(r, t_min, t_max):
+            closest: Optional[SurfaceHit] = None
+            for hittable in cell:
+                key = id(hittable)
+                if key in tested:
+                    surface_hit = tested[key]
+                else:
+                    surface_hit = hittable.intersect(r, t_min, t_max)
+                    tested[key] = surface_hit
+                if surface_hit and surface_hit.t <= cell_exit and (closest is None or surface_hit.t < closest.t):
+                    closest = surface_hit
+            if closest:
+                return closest
+        return None
+
+    def occluded(self, r: Ray, t_min: float, t_max: float) -> bool:
+        tested = set()
+        for cell, _ in self._walk(r, t_min, t_max):
+            for hittable in cell:
+                if id(hittable) not in tested:
+                    if hittable.occluded(r, t_min, t_max):
+                        return True
+                    tested.add(id(hittable))
+        return False
+
+    def _walk(self, r: Ray, t_min: float, t_max: float):
+        """
+        yields (the hittables in the cell, the ray parameter where the ray leaves the cell) for every
+        non-empty cell the ray `r` passes through between `t_min` and `t_max`, front to back
+        """
+        origin = r.orig.to_tuple()
+        direction = r.dir.to_tuple()
+        lo = self.bbox.min.to_tuple()
+        hi = self.bbox.max.to_tuple()
+
+        # clip the ray to the grid's bounding box
+        t_enter, t_exit = t_min, t_max
+        for axis in range(3):
+            if direction[axis] == 0.0:
+                if origin[axis] < lo[axis] or origin[axis] > hi[axis]:
+                    return
+                continue
+            inv_d = 1.0 / direction[axis]
+            t0 = (lo[axis] - origin[axis]) * inv_d
+            t1 = (hi[axis] - origin[axis]) * inv_d
+            if inv_d < 0.0:
+                t0, t1 = t1, t0
+            t_enter = max(t_enter, t0)
+            t_exit = min(t_exit, t1)
+            if t_exit < t_enter:
+                return
+
+        # the cell the ray enters the grid in, how far the ray travels to cross one cell along each
+        # axis and the ray parameter of the next cell boundary along each axis
+        cell = [0, 0, 0]
+        step = [0, 0, 0]
+        t_delta = [math.inf, math.inf, math.inf]
+        t_next = [math.inf, math.inf, math.inf]
+        for axis in range(3):
+            cell[axis] = self._axis_cell(origin[axis] + t_enter * direction[axis], axis)
+            if direction[axis] == 0.0:
+                continue
+            size = (hi[axis] - lo[axis]) / self.resolution[axis]
+            if direction[axis] > 0.0:
+                step[axis] = 1
+                t_next[axis] = (lo[axis] + (cell[axis] + 1) * size - origin[axis]) / direction[axis]
+                t_delta[axis] = size / direction[axis]
+            else:
+                step[axis] = -1
+                t_next[axis] = (lo[axis] + cell[axis] * size - origin[axis]) / direction[axis]
+                t_delta[axis] = -size / direction[axis]
+
+        nx, ny, nz = self.resolution
+        while True:
+            axis = 0 if t_next[0] < t_next[1] else 1
+            axis = axis if t_next[axis] < t_next[2] else 2
+            cell_exit = min(t_next[axis], t_exit)
+
+            hittables = self.cells[cell[0] + nx * (cell[1] + ny * cell[2])]
+            if hittables:
+                yield hittables, cell_exit
+            if t_next[axis] > t_exit:
+                return
+
+            cell[axis] += step[axis]
+            if cell[axis] < 0 or cell[axis] >= self.resolution[axis]:
+                return
+            t_next[axis] += t_delta[axis]
+
+    def children(self) -> Sequence[Hittable]:
+        # hittables overlapping several cells are in each of them
+        return list({id(hittable): hittable for cell in self.cells for hittable in cell}.values())
+
+    def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
+        return self.bbox
+
+
+def _union_min(boxes: Sequence[Aabb], indices: Sequence[int]) -> Tuple[float, float, float]:
+    return tuple(min(boxes[i].min[axis] for i in indices) for axis in range(3))
+
+
+def _union_max(boxes: Sequence[Aabb], indices: Sequence[int]) -> Tuple[float, float, float]:
+    return tuple(max(boxes[i].max[axis] for i in indices) for axis in range(3))
@@ -1 +1,2 @@
 from .constant_medium import ConstantMedium
+from .global_medium import GlobalMedium
@@ -1,10 +1,9 @@
 from __future__ import annotations
 import math
-import random
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Sequence
 
-from common import Ray, Vec3
+from common import Ray, Vec3, rng
 from hittables import Hittable, Aabb, HitRecord
 from materials import Material, Isotropic
 from textures import Texture
@@ -51,32 +50,53 @@ class ConstantMedium(Hittable):
         Returns a HitRecord if the ray `r` hits this constant medium. This hit function
         assumes the boundary shape is **convex**. It will not work for shapes like toruses or
         shapes that contain voids.
+        The u,v coordinates of the hit are those of the point where the ray enters the boundary, they are only
+        computed if the phase function's texture uses them, else they are 0.0
         """
-        rec1 = self.boundary.hit(r, float("-inf"), float("inf"))
-        if rec1:
-            rec2 = self.boundary.hit(r, rec1.t + 0.00001, float("inf"))
-            if rec2:
-                if rec1.t < t_min:
-                    rec1.t = t_min
-                if rec2.t > t_max:
-                    rec2.t = t_max
-                if rec1.t >= rec2.t:
-                    return None
-                if rec1.t < 0.0:
-                    rec1.t = 0.0
+        # only the entry and exit points of the boundary are needed, not its surface details
+        interval = self.boundary.hit_interval(r, float("-inf"), float("inf"))
+        if interval:
+            t_enter, t_exit = interval
+            if t_enter < t_min:
+                t_enter = t_min
+            if t_exit > t_max:
+                t_exit = t_max
+            if t_enter >= t_exit:
+                return None
+            if t_enter < 0.0:
+                t_enter = 0.0
 
-                ray_length = r.dir.length()
-                distance_inside_boundary = (rec2.t - rec1.t) * ray_length
-                hit_distance = self.neg_inv_density * math.log(random.random())
+            ray_length = r.dir.length()
+            distance_inside_boundary = (t_exit - t_enter) * ray_length
+            hit_distance = self.neg_inv_density * math.log(rng.random())
 
-                if hit_distance > distance_inside_boundary:
-                    return None
-                else:
-                    t = rec1.t + hit_distance / ray_length
-                    p = r.at(t)
-                    normal = Vec3(1.0, 0.0, 0.0)
-                    material = self.phase_function
-                    return HitRecord(p, normal, material, t, rec1.u, rec1.v, True)
+            if hit_distance > distance_inside_boundary:
+                return None
+            else:
+                t = t_enter + hit_distance / ray_length
+                p = r.at(t)
+                normal = Vec3(1.0, 0.0, 0.0)
+                material = self.phase_function
+                u, v = 0.0, 0.0
+                if self._uses_uv():
+                    entry = self.boundary.hit(r, float("-inf"), float("inf"))
+                    if entry:
+                        u, v = entry.u, entry.v
+                return HitRecord(p, normal, material, t, u, v, True)
+
+    def _uses_uv(self) -> bool:
+        """
+        returns True if the phase function's texture is mapped by u,v, or if the phase function is not `Isotropic`,
+        and may use them
+        """
+        return not isinstance(self.phase_function, Isotropic) or self.phase_function.albedo.uses_uv()
+
+    def has_stochastic_hits(self) -> bool:
+        # the distance a ray travels before scattering is random
+        return True
+
+    def children(self) -> Sequence[Hittable]:
+        return (self.boundary,)
 
     def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
         # returns the bounding box of this volumes boundary
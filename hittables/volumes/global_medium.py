@@ -0,0 +1,69 @@
+from __future__ import annotations
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+from common import Ray, Vec3, rng
+from hittables import Hittable, Aabb, HitRecord
+from materials import Material, Isotropic
+from textures import Texture
+
+
+@dataclass
+class GlobalMedium(Hittable):
+    """
+    GlobalMedium models a homogeneous participating medium, like a mist or haze, that fills
+    the entire scene.
+    Unlike a `ConstantMedium` it has no boundary shape. The distance a Ray travels before
+    scattering is sampled analytically, `distance = -(1 / density) ⋅ ln(ξ)`, and the Ray only
+    scatters if that distance is shorter than the distance to the closest surface it hits.
+
+    A GlobalMedium has no bounding box, so it never takes part in BVH traversal. Renderers
+    pull it out of the world and test it against the closest surface hit of each Ray.
+
+    use the from_density() classmethod to construct an instance of this class
+    """
+    phase_function: Material
+    neg_inv_density: float
+    # Rays that travel further than this distance (from their origin) without hitting
+    # anything leave the medium. This keeps rays that miss all geometry from always scattering
+    extent: float
+
+    @classmethod
+    def from_density(cls, density: float, texture: Texture, extent: float = float("inf")) -> GlobalMedium:
+        """
+        Returns a new `GlobalMedium` with the given density and texture
+        :param density: the density amount of this medium, for example 0.0001 is a thin mist
+        :param texture: texture to apply to this medium, usually a SolidTexture
+        :param extent: the maximum distance a Ray can travel through this medium
+        :return: a new GlobalMedium
+        """
+        return cls(
+            Isotropic(texture),
+            -1.0 / density,
+            extent
+        )
+
+    def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
+        """
+        Returns a HitRecord if the ray `r` scatters inside this medium before reaching `t_max`.
+        `t_max` should be the ray parameter of the closest surface hit, or infinity if the ray
+        didn't hit any surface
+        """
+        hit_distance = self.neg_inv_density * math.log(rng.random())
+        if hit_distance > self.extent:
+            return None
+
+        t = t_min + hit_distance / r.dir.length()
+        if t >= t_max:
+            return None
+
+        return HitRecord(r.at(t), Vec3(1.0, 0.0, 0.0), self.phase_function, t, 0.0, 0.0, True)
+
+    def has_stochastic_hits(self) -> bool:
+        # the distance a ray travels before scattering is random
+        return True
+
+    def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
+        # a global medium is unbounded
+        return None
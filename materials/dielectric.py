@@ -1,8 +1,7 @@
 import math
-import random
 from dataclasses import dataclass
 
-from common import Point3, ColorRgb, Ray, Vec3
+from common import Point3, ColorRgb, Ray, Vec3, rng
 import materials
 from materials import Material, ScatterRecord
 
@@ -29,7 +28,7 @@ class Dielectric(Material):
         reflect_prob = materials.schlick(cos_theta, etai_over_etat)
 
         # this implementation of dielectric will randomly decide if a ray will reflect or refract
-        if etai_over_etat * sin_theta > 1.0 or random.random() < reflect_prob:
+        if etai_over_etat * sin_theta > 1.0 or rng.random() < reflect_prob:
             # ray is always reflected OR had a chance to reflect
             reflected = materials.reflect(unit_direction, normal)
             return ScatterRecord(attenuation, Ray(p, reflected, r_in.time))
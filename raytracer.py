@@ -1,11 +1,13 @@
 import argparse
+import random
 import sys
 import os
 
 import scenes
 
 import common
-from renderer import MultiprocessRenderer
+from renderer import MultiprocessRenderer, ACCELERATORS, SAMPLERS
+from renderer.denoiser import denoise, save_buffers
 from scenes import Scene
 
 
@@ -20,12 +22,12 @@ def parse_args():
         4 = Cornell Box,
         5 = Cornell Smoke Boxes,
         6 = Final Scene (a bunch of random boxes and spheres in volumetric fog) 
+        The format of scene files is described in scenes/scene_loader.py
         """
     )
-    parser.add_argument('scene_number',
-                        type=int,
-                        choices=[1, 2, 3, 4, 5, 6],
-                        help='the scene number to generate, 1 - 6')
+    parser.add_argument('scene',
+                        help='the scene number to generate, 1 - 6, or the path to a JSON scene file, '
+                             'see scenes/examples')
     parser.add_argument('outfile',
                         action='store',
                         nargs='?',
@@ -58,6 +60,54 @@ def parse_args():
                         type=int,
                         dest='samples_per_pixel',
                         help='the number of samples to take per pixel. Higher values will increase the render time.')
+    parser.add_argument('--accel',
+                        action='store',
+                        default='bvh',
+                        choices=ACCELERATORS,
+                        dest='accelerator',
+                        help="the acceleration structure to build over the scene. bvh (the default) is a median "
+                             "split BVH, lbvh is a Morton code linear BVH that builds faster but traces slower, "
+                             "grid is a two level uniform grid")
+    parser.add_argument('--seed',
+                        action='store',
+                        default=None,
+                        type=int,
+                        dest='seed',
+                        help="seeds the generation of the scene, its BVH and every sample, so that the same seed "
+                             "renders the exact same image. Unseeded renders differ on every run")
+    parser.add_argument('--sampler',
+                        action='store',
+                        default='independent',
+                        choices=SAMPLERS,
+                        dest='sampler',
+                        help="the sampler that generates the samples of each pixel. independent (the default) draws "
+                             "random numbers, stratified, halton and sobol spread each pixel's samples evenly, "
+                             "so fewer samples per pixel are needed for the same image quality")
+    parser.add_argument('--gbuffer',
+                        action='store',
+                        default=0,
+                        type=int,
+                        dest='gbuffer_positions',
+                        help="caches the first hit of this many sub-sample positions per pixel, and reuses them for "
+                             "all of the pixel's samples, so only the bounces of most samples are traced. Only used "
+                             "with a pinhole camera (no defocus blur) and a scene that doesn't move")
+    parser.add_argument('--packet',
+                        action='store',
+                        default=64,
+                        type=int,
+                        dest='packet_size',
+                        help="the number of primary rays, of neighbouring pixels, traced through the BVH together as "
+                             "a packet. Defaults to 64, 0 traces every ray on its own")
+    parser.add_argument('--denoise',
+                        action='store_true',
+                        dest='denoise',
+                        help="denoises the image, guided by the albedo and normals of the surfaces first hit by each "
+                             "pixel, so that far fewer samples per pixel are needed for a smooth image")
+    parser.add_argument('--buffers',
+                        action='store_true',
+                        dest='buffers',
+                        help="also saves the image, before denoising, and its albedo and normal buffers, as floats in "
+                             "the NumPy file <outfile>.npz, which `python -m renderer.denoiser` can denoise later")
 
     args = parser.parse_args()
 
@@ -66,43 +116,71 @@ def parse_args():
 
 if __name__ == "__main__":
     args = parse_args()
-    cpu_cores = 0
+    cpu_cores = args.cores
     if args.width < 100:
         sys.exit(f"width must be >= 100")
     if args.cores <= 0:
         cpu_cores = os.cpu_count() // 2 if os.cpu_count() > 2 else 1
 
-    # build a pre-made scene based on the entered scene number
-    match args.scene_number:
-        case Scene.RANDOM_SPHERES.value:
-            camera, world, background = scenes.build_scene_random_spheres(args.width, args.aspect_ratio)
-        case Scene.PERLIN_SPHERES.value:
-            camera, world, background = scenes.build_scene_two_perlin_spheres(args.width, args.aspect_ratio)
-        case Scene.EARTH.value:
-            camera, world, background = scenes.build_earth_scene(args.width, args.aspect_ratio)
-        case Scene.CORNELL_BOX.value:
-            camera, world, background = scenes.build_scene_cornell_box_with_two_boxes(args.width, args.aspect_ratio)
-        case Scene.CORNELL_SMOKE_BOXES.value:
-            camera, world, background = scenes.build_scene_cornell_smoke_boxes(args.width, args.aspect_ratio)
-        case Scene.FINAL.value:
-            camera, world, background = scenes.build_scene_final(args.width, args.aspect_ratio)
-        case n:
-            sys.exit(f"unknown scene numer: {n}")
+    # the random number generator for the scene and its BVHs, None uses the global generator
+    rng = None if args.seed is None else random.Random(args.seed)
+
+    if args.scene.isdigit():
+        # build a pre-made scene based on the entered scene number
+        match int(args.scene):
+            case Scene.RANDOM_SPHERES.value:
+                camera, world, background = scenes.build_scene_random_spheres(args.width, args.aspect_ratio, rng)
+            case Scene.PERLIN_SPHERES.value:
+                camera, world, background = scenes.build_scene_two_perlin_spheres(args.width, args.aspect_ratio, rng)
+            case Scene.EARTH.value:
+                camera, world, background = scenes.build_earth_scene(args.width, args.aspect_ratio)
+            case Scene.CORNELL_BOX.value:
+                camera, world, background = scenes.build_scene_cornell_box_with_two_boxes(args.width, args.aspect_ratio)
+            case Scene.CORNELL_SMOKE_BOXES.value:
+                camera, world, background = scenes.build_scene_cornell_smoke_boxes(args.width, args.aspect_ratio)
+            case Scene.FINAL.value:
+                camera, world, background = scenes.build_scene_final(args.width, args.aspect_ratio, rng)
+            case n:
+                sys.exit(f"unknown scene numer: {n}")
+        scene_name = Scene.get_scene_name(int(args.scene))
+    else:
+        # load the scene from a scene file
+        if not os.path.isfile(args.scene):
+            sys.exit(f"scene file not found: {args.scene}")
+        scene_name = os.path.splitext(os.path.basename(args.scene))[0]
+        camera, world, background = scenes.load_scene(args.scene, args.width, args.aspect_ratio, rng)
 
-    print(f"rendering scene {Scene.get_scene_name(args.scene_number)} at {camera.image_width}x{camera.image_height} "
+    print(f"rendering scene {scene_name} at {camera.image_width}x{camera.image_height} "
           f"at {args.samples_per_pixel} samples-per-pixel, using {cpu_cores} cpu cores")
+    print(f"scene hash {common.content_hash(camera, world, background)}")
 
     # build the renderer object with a default bounce-depth of 50
     renderer = MultiprocessRenderer(
         background,
         50,
         args.samples_per_pixel,
-        cpu_cores
+        cpu_cores,
+        args.accelerator,
+        args.seed,
+        args.sampler,
+        args.gbuffer_positions,
+        packet_size=args.packet_size
     )
 
-    colors = renderer.render(camera, world)
-
     if not args.outfile:
-        args.outfile = f"scene_{Scene.get_scene_name(args.scene_number)}_{camera.image_width}x{camera.image_height}"
+        args.outfile = f"scene_{scene_name}_{camera.image_width}x{camera.image_height}"
+
+    if args.denoise or args.buffers:
+        colors, albedo, normals = renderer.render_with_features(camera, world)
+        if args.buffers:
+            save_buffers(args.outfile, colors, albedo, normals)
+            print(f"image and feature buffers saved as {args.outfile}.npz")
+        if args.denoise:
+            colors = denoise(colors, albedo, normals)
+        # the colors are linear averages
+        colors = MultiprocessRenderer.post_process(colors, 1)
+    else:
+        colors = renderer.render(camera, world)
+
     common.save_as_ppm_image(args.outfile, colors)
     print(f"final image saved as {args.outfile}")
@@ -1,2 +1,2 @@
 from .background_type import BackgroundType, SolidBackground, LinearInterpBackground
-from .multi_proc_renderer import MultiprocessRenderer
+from .multi_proc_renderer import MultiprocessRenderer, ACCELERATORS, SAMPLERS
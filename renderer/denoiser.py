@@ -0,0 +1,124 @@
+"""
+An edge-avoiding à-trous wavelet denoiser, from "Edge-Avoiding À-Trous Wavelet Transform for fast Global
+Illumination Filtering" by Dammertz et al.
+
+The denoiser blurs the noisy image with a 5x5 B-spline kernel whose taps are spread further apart on each
+iteration, so a few iterations cover a large footprint. Each tap is weighted by how similar its color, its first hit
+albedo and its first hit normal are to the filtered pixel's, so the blur stops at the edges of objects, of shadows
+and of textures. The albedo is divided out of the colors before filtering, and multiplied back in afterwards, so
+textures stay sharp while the lighting is smoothed.
+
+The denoiser filters the linear, unclamped, average color of each pixel, so that no energy is lost to clamping
+before filtering. The filtered image is converted for display afterwards, by `MultiprocessRenderer.post_process()`.
+The linear colors and the feature buffers are rendered by `MultiprocessRenderer.render_with_features()`. Renders
+can be saved, with their feature buffers, by `save_buffers()` and denoised later by `denoise_buffers()`, or from
+the command line:
+> python -m renderer.denoiser buffers.npz denoised
+"""
+import argparse
+from typing import Tuple
+
+import numpy as np
+
+import common
+from renderer.multi_proc_renderer import MultiprocessRenderer
+
+# the weights of the taps of the à-trous kernel, along each axis
+KERNEL = (1.0 / 16.0, 1.0 / 4.0, 3.0 / 8.0, 1.0 / 4.0, 1.0 / 16.0)
+
+# keeps black albedo from dividing by zero when the albedo is divided out of the colors
+ALBEDO_EPSILON = 1e-3
+
+
+def denoise(colors: common.NDArrayFloat, albedo: common.NDArrayFloat, normals: common.NDArrayFloat,
+            iterations: int = 4, color_sigma: float = 2.0, albedo_sigma: float = 0.1,
+            normal_sigma: float = 0.3) -> common.NDArrayFloat:
+    """
+    denoises a rendered image, guided by its feature buffers
+
+    :param colors: the rendered image, a height x width x 3 NDArray of the linear average RGB color of each pixel,
+    as returned by `MultiprocessRenderer.render_with_features()`
+    :param albedo: the first hit albedo of each pixel, a height x width x 3 NDArray
+    :param normals: the first hit normal of each pixel, a height x width x 3 NDArray
+    :param iterations: the number of à-trous passes, the filter's footprint is 4 * 2^iterations pixels wide
+    :param color_sigma: how different, in linear color, the lighting of two pixels can be and still be blurred
+    together. It is halved on every pass, as the noise decreases. Noisier renders, with fewer samples per pixel,
+    need a larger value
+    :param albedo_sigma: how different the albedo of two pixels can be and still be blurred together
+    :param normal_sigma: how different the normals of two pixels can be and still be blurred together
+    :return: the denoised image, in the same format as `colors`
+    """
+    albedo = albedo + ALBEDO_EPSILON
+    lighting = colors / albedo
+    for i in range(iterations):
+        lighting = _atrous_pass(lighting, albedo, normals, 1 << i, color_sigma / (1 << i), albedo_sigma,
+                                normal_sigma)
+    return lighting * albedo
+
+
+def _atrous_pass(lighting: common.NDArrayFloat, albedo: common.NDArrayFloat, normals: common.NDArrayFloat,
+                 step: int, color_sigma: float, albedo_sigma: float,
+                 normal_sigma: float) -> common.NDArrayFloat:
+    """
+    filters `lighting` once with the 5x5 à-trous kernel, with its taps `step` pixels apart
+    """
+    height, width, _ = lighting.shape
+    reach = 2 * step
+    # edge padding makes the taps outside the image repeat its border pixels
+    padded = [np.pad(buffer, ((reach, reach), (reach, reach), (0, 0)), mode="edge")
+              for buffer in (lighting, albedo, normals)]
+
+    total = np.zeros_like(lighting)
+    total_weight = np.zeros((height, width, 1))
+    for i, ky in enumerate(KERNEL):
+        y = reach + (i - 2) * step
+        for j, kx in enumerate(KERNEL):
+            x = reach + (j - 2) * step
+            tap_lighting, tap_albedo, tap_normals = (buffer[y:y + height, x:x + width] for buffer in padded)
+            distance = (np.sum((tap_lighting - lighting) ** 2, axis=2, keepdims=True) / color_sigma ** 2 +
+                        np.sum((tap_albedo - albedo) ** 2, axis=2, keepdims=True) / albedo_sigma ** 2 +
+                        np.sum((tap_normals - normals) ** 2, axis=2, keepdims=True) / normal_sigma ** 2)
+            weight = ky * kx * np.exp(-distance)
+            total += weight * tap_lighting
+            total_weight += weight
+    # the center tap always has weight, so total_weight is never 0
+    return total / total_weight
+
+
+def save_buffers(filename: str, colors: common.NDArrayFloat, albedo: common.NDArrayFloat,
+                 normals: common.NDArrayFloat):
+    """
+    saves a rendered image, as linear colors, and its feature buffers, as floats, in a NumPy .npz file
+    :param filename: the file name, ".npz" is appended
+    """
+    np.savez(filename + ".npz", colors=colors, albedo=albedo, normals=normals)
+
+
+def load_buffers(filename: str) -> Tuple[common.NDArrayFloat, common.NDArrayFloat, common.NDArrayFloat]:
+    """
+    :return: the (colors, albedo, normals) buffers saved by `save_buffers()` in the .npz file `filename`
+    """
+    with np.load(filename) as buffers:
+        return buffers["colors"], buffers["albedo"], buffers["normals"]
+
+
+def denoise_buffers(filename: str, **kwargs) -> common.NDArrayFloat:
+    """
+    denoises the image saved, with its feature buffers, in the .npz file `filename`
+    :param kwargs: passed on to `denoise()`
+    :return: the denoised image, as linear colors
+    """
+    return denoise(*load_buffers(filename), **kwargs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="denoises an image saved by the raytracer's --buffers option, and "
+                                                 "saves it as a .PPM image file")
+    parser.add_argument('buffers', help="the .npz file holding the image and its feature buffers")
+    parser.add_argument('outfile', help="filename to use for the denoised image")
+    parser.add_argument('-i', action='store', default=4, type=int, dest='iterations',
+                        help="the number of filter passes, each doubles the filter's footprint")
+    args = parser.parse_args()
+    denoised = denoise_buffers(args.buffers, iterations=args.iterations)
+    common.save_as_ppm_image(args.outfile, MultiprocessRenderer.post_process(denoised, 1))
+    print(f"denoised image saved as {args.outfile}")
@@ -0,0 +1,62 @@
+"""
+Frustum tests of the primary rays of whole pixels against a bounding box, so that the renderer can find the pixels
+whose rays cannot hit anything, and fill them with the background without tracing them.
+
+The primary rays of a pixel, of a pinhole camera, all start at the camera's origin and pass through the pixel's
+footprint on the focus plane, so they lie in the pyramid (frustum) whose apex is the camera's origin and whose
+four side planes pass through the edges of the footprint. A box that lies entirely outside one of those planes
+can't be hit by any of the pixel's rays.
+"""
+import numpy as np
+
+from common import Camera, Vec3
+from hittables import Aabb
+
+
+def _array(v: Vec3) -> np.ndarray:
+    return np.array([v.x, v.y, v.z])
+
+
+def pixels_missing_box(camera: Camera, row: int, box: Aabb) -> np.ndarray:
+    """
+    tests the frustum of every pixel of a row against a box. The test is conservative, a pixel whose rays miss the
+    box may still be reported as not missing it. Cameras with a lens have no single apex, none of their pixels are
+    reported as missing
+
+    :param camera: the camera
+    :param row: the index of the row, 0-based
+    :param box: the box, the bounds of the world
+    :return: a boolean array, with an element per pixel of the row, True if all the primary rays of the pixel,
+    through any point of its footprint, miss the box
+    """
+    width = camera.image_width
+    if camera.lens_radius != 0.0:
+        return np.zeros(width, dtype=bool)
+
+    origin = _array(camera.look_from)
+    corner = _array(camera.lower_left_corner) - origin
+    horizontal = _array(camera.horizontal)
+    vertical = _array(camera.vertical)
+
+    # the directions to the 4 corners of the footprint of each pixel, in winding order: shape (width, 4, 3)
+    s = np.arange(width + 1) / (camera.image_width - 1)
+    t0, t1 = row / (camera.image_height - 1), (row + 1) / (camera.image_height - 1)
+    left, right = s[:-1, np.newaxis], s[1:, np.newaxis]
+    corners = np.stack([corner + left * horizontal + t0 * vertical,
+                        corner + right * horizontal + t0 * vertical,
+                        corner + right * horizontal + t1 * vertical,
+                        corner + left * horizontal + t1 * vertical], axis=1)
+
+    # the normals of the side planes, through consecutive corners, made to point into the frustum
+    normals = np.cross(corners, np.roll(corners, -1, axis=1))
+    center = corners.mean(axis=1, keepdims=True)
+    normals *= np.sign(np.sum(normals * center, axis=2, keepdims=True))
+
+    # the 8 corners of the box, relative to the apex
+    lo, hi = _array(box.min), _array(box.max)
+    box_corners = np.array([[(hi if i & 1 else lo)[0], (hi if i & 2 else lo)[1], (hi if i & 4 else lo)[2]]
+                            for i in range(8)]) - origin
+
+    # a pixel misses the box when all the box's corners are outside one of its side planes
+    outside = np.einsum("wpk,jk->wpj", normals, box_corners) < 0.0
+    return np.any(np.all(outside, axis=2), axis=1)
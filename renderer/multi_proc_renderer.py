@@ -1,19 +1,38 @@
-import math
 import random
 import time
 import concurrent.futures
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple
 import numpy as np
 
 import common
-from common import Camera, ColorRgb, Ray
-from hittables import HittableList, Hittable
-from hittables.bvh_node import BvhNode
+from common import Camera, ColorRgb, Ray, Vec3, Point3, rng
+from common.sampler import Sampler, IndependentSampler, StratifiedSampler, HaltonSampler, SobolSampler, \
+    radical_inverse
+from hittables import HittableList, Hittable, HitRecord
+from hittables.bvh_builder import build_bvh_parallel, build_lbvh
+from hittables.ray_packet import hit_packet
+from hittables.uniform_grid import UniformGrid
+from hittables.volumes import GlobalMedium
 from renderer import background_type
+from renderer.frustum import pixels_missing_box
 
-# RenderResult holds the result of rendering a single row: (row_start, ndarray[[ColorRgb], [ColorRgb], ...])
+# RenderResult holds the result of rendering a single row: (row_start, ndarray of the pixels' linear R,G,B color sums)
 RenderResult = (int, common.NDArrayFloat)
+# FeatureRenderResult also holds the row's first hit albedo and normal buffers: (row_start, colors, albedo, normals)
+FeatureRenderResult = (int, common.NDArrayFloat, common.NDArrayFloat, common.NDArrayFloat)
+
+# the acceleration structures the renderer can build over the world:
+# bvh = median split BVH, lbvh = Morton code linear BVH, faster to build but slower to traverse,
+# grid = two level uniform grid
+ACCELERATORS = ("bvh", "lbvh", "grid")
+
+# the samplers that generate the samples of each pixel, see `common.sampler`:
+# independent = random numbers, stratified = jittered strata, halton = Halton sequence, sobol = scrambled Sobol
+SAMPLERS = ("independent", "stratified", "halton", "sobol")
+
+# the number of random numbers each sample draws for its camera ray: the pixel offset (2), the lens (2) and the time
+CAMERA_DIMENSIONS = 5
 
 
 @dataclass
@@ -29,11 +48,31 @@ class MultiprocessRenderer:
      image and produces less "spotty" images. 50 is the default, which will definitely produce a "spotty" image.
      Increasing this to 500 or even 1000 will make a "smoother" image but will **drastically** increase render times,
      especially when using Python
+     cpu_cores - the number of processes to render with
+     accelerator - the acceleration structure to build over the world, one of `ACCELERATORS`
+     seed - every sample draws its random numbers from its own counter-based stream (see `common.rng`),
+     identified by (seed, pixel, sample), so samples are independent of each other, and of which worker renders
+     them. If set, the BVH is also built from it and renders are reproducible, else a seed is drawn for each render
+     sampler - the sampler generating the first dimensions of each sample (pixel offset, lens, time and the first
+     bounce), one of `SAMPLERS`. The low discrepancy samplers need fewer samples per pixel for the same noise
+     gbuffer_positions - if > 0, and the primary hits are cacheable (see `primary_hits_cacheable()`), each pixel's
+     samples go through only this many sub-sample positions. The first hit of each position is traced once, kept in
+     the pixel's G-buffer, and reused by every later sample through that position, so only their bounces are traced
+     background_fast_path - pixels whose primary rays can't hit the bounds of the world (see `renderer.frustum`) are
+     not traced, their background is computed for the whole row at once, at a fixed set of sub-pixel positions
+     packet_size - if > 0, the primary rays of about this many samples, of neighbouring pixels, are traced through
+     the BVH together as a packet (see `hittables.ray_packet`), unless finding hits draws random numbers
     """
     background_color: background_type.BackgroundType
     ray_bounce_depth: int
     samples_per_pixel: int
     cpu_cores: int
+    accelerator: str = "bvh"
+    seed: Optional[int] = None
+    sampler: str = "independent"
+    gbuffer_positions: int = 0
+    background_fast_path: bool = True
+    packet_size: int = 64
 
     def render(self, camera: Camera, world: HittableList) -> common.NDArrayFloat:
         """Renders a raytraced image, using the provided `Camera` and `World`.
@@ -42,66 +81,248 @@ class MultiprocessRenderer:
         :param camera:the camera object to use for rendering
         :param world: a list of Hittables to render
         """
+        colors, _, _ = self._render(camera, world, False)
+        return MultiprocessRenderer.post_process(colors, self.samples_per_pixel)
+
+    def render_sums(self, camera: Camera, world: HittableList) -> common.NDArrayFloat:
+        """Renders a raytraced image, like `render()`, but returns the raw sums of each pixel's linear sample colors.
+
+        The sums of renders with different seeds can be added together, and the total converted for display by
+        `post_process()` with the total number of samples per pixel, to refine an image progressively
+        :param camera:the camera object to use for rendering
+        :param world: a list of Hittables to render
+        """
+        colors, _, _ = self._render(camera, world, False)
+        return colors
+
+    def render_with_features(self, camera: Camera, world: HittableList) \
+            -> Tuple[common.NDArrayFloat, common.NDArrayFloat, common.NDArrayFloat]:
+        """Renders a raytraced image, like `render()`, along with the feature buffers that guide the denoiser,
+        see `renderer.denoiser`.
+
+        Returns three ndarrays with shape: (height, width, 3), the linear R,G,B color of each pixel, the albedo of
+        the surface first hit by each pixel's rays and the normal at the first hit, all averaged over the pixel's
+        samples. The colors are not gamma corrected or clamped, `post_process()` converts them for display
+        :param camera:the camera object to use for rendering
+        :param world: a list of Hittables to render
+        """
+        colors, albedo, normals = self._render(camera, world, True)
+        return colors / self.samples_per_pixel, albedo, normals
+
+    def _render(self, camera: Camera, world: HittableList, features: bool) \
+            -> Tuple[common.NDArrayFloat, Optional[common.NDArrayFloat], Optional[common.NDArrayFloat]]:
+        """
+        renders the sums of the image's linear sample colors, and the first hit albedo and normal buffers if
+        `features` is True, else those are None
+        """
         start = time.time()
 
-        # build a bvh
-        world_bvh = BvhNode.from_hittable_list(world, 0.0, 1.0)
+        # global media are unbounded, so they are kept out of the bvh and tested separately
+        # against the closest surface hit of each ray
+        media = [hittable for hittable in world.objects if isinstance(hittable, GlobalMedium)]
+        surfaces = HittableList()
+        for hittable in world.objects:
+            if not isinstance(hittable, GlobalMedium):
+                surfaces.add(hittable)
+
+        world_bvh = self.build_accelerator(surfaces)
+        gbuffer = self.gbuffer_positions > 0 and MultiprocessRenderer.primary_hits_cacheable(camera, surfaces)
+        packets = self.packet_size > 0 and MultiprocessRenderer.primary_hits_deterministic(surfaces)
+        if self.gbuffer_positions > 0 and not gbuffer:
+            print("primary hits are not cached, the camera has a lens or the scene is not static")
+        if self.packet_size > 0 and not packets:
+            print("primary rays are not traced as packets, the scene contains smoke")
+        # drawn here, once, workers forked from this process would all draw the same seed
+        seed = self.seed if self.seed is not None else random.getrandbits(63)
 
         with concurrent.futures.ProcessPoolExecutor(max_workers=self.cpu_cores) as executor:
             # futures will hold completed render jobs
             futures = []
 
-            # stores the final R,G,B color data of each pixel in a height x width x 3 numpy ndarray
+            # accumulates the linear R,G,B color sums of each pixel in a height x width x 3 numpy ndarray
             colors = np.empty((camera.image_height, camera.image_width, 3), dtype=np.float_)
+            albedo = np.empty_like(colors) if features else None
+            normals = np.empty_like(colors) if features else None
 
             # submit each row of the image to the executor
             for row_idx in range(camera.image_height):
                 futures.append(
-                    executor.submit(self.render_scanline, row_idx, world_bvh, camera)
+                    executor.submit(self.render_scanline, row_idx, world_bvh, camera, media, seed, features,
+                                    gbuffer, packets)
                 )
 
             print(f"submitted {camera.image_height:4d} rows to the process pool for rendering...")
 
             # wait for each row to complete and store the results in the color array
             for fut in concurrent.futures.as_completed(futures):
-                row_start, row_colors = fut.result()
+                row_start, row_colors, *row_features = fut.result()
                 colors[row_start] = row_colors
+                if features:
+                    albedo[row_start], normals[row_start] = row_features
                 print(f"row {row_start:04d} of {camera.image_height-1:04d} finished...")
 
         elapsed_secs = (time.time() - start)
         print("done rendering, total elapsed {0:8.3f}secs".format(elapsed_secs))
-        return colors
+        return colors, albedo, normals
 
-    def render_scanline(self, row: int, world: HittableList, camera: Camera) -> RenderResult:
+    def build_accelerator(self, surfaces: HittableList) -> Hittable:
+        """
+        builds the acceleration structure selected by `accelerator` over the given hittables, and prepares it, along
+        with the hittables it contains (see `Hittable.prepare()`), so the render workers receive it built
+        :param surfaces: the (bounded) hittables in the world
+        """
+        accelerator: Hittable
+        match self.accelerator:
+            case "bvh":
+                # large scenes have their subtrees built in parallel
+                build_rng = None if self.seed is None else random.Random(self.seed)
+                accelerator = build_bvh_parallel(surfaces, 0.0, 1.0, workers=self.cpu_cores, rng=build_rng)
+            case "lbvh":
+                accelerator = build_lbvh(surfaces, 0.0, 1.0)
+            case "grid":
+                accelerator = UniformGrid.from_hittable_list(surfaces, 0.0, 1.0)
+            case name:
+                raise RuntimeError(f"unknown acceleration structure: {name}")
+        accelerator.prepare()
+        return accelerator
+
+    @staticmethod
+    def primary_hits_cacheable(camera: Camera, surfaces: HittableList) -> bool:
+        """
+        primary hits can be cached when every primary ray through the same point of a pixel hits the same surface:
+        the camera is a pinhole, nothing in the world moves while the shutter is open (see `Hittable.moves_between()`),
+        and no surface hit is random, as hits with a `ConstantMedium` are
+        :param camera: the camera rendering the image
+        :param surfaces: the (bounded) hittables in the world
+        """
+        return camera.lens_radius == 0.0 and MultiprocessRenderer.primary_hits_deterministic(surfaces) and \
+            not surfaces.moves_between(camera.open_time, camera.close_time)
+
+    @staticmethod
+    def primary_hits_deterministic(surfaces: HittableList) -> bool:
+        """
+        primary hits are deterministic when finding them draws no random numbers, which hits with a
+        `ConstantMedium` do, wherever it is in the world (see `Hittable.has_stochastic_hits()`). Only then can the
+        primary rays of many samples be traced before their samples are shaded
+        :param surfaces: the (bounded) hittables in the world
+        """
+        return not surfaces.has_stochastic_hits()
+
+    def build_sampler(self, seed: int) -> Sampler:
+        """
+        :return: the sampler selected by `sampler`, seeded with `seed`
+        """
+        match self.sampler:
+            case "independent":
+                return IndependentSampler(seed)
+            case "stratified":
+                return StratifiedSampler(seed, self.samples_per_pixel)
+            case "halton":
+                return HaltonSampler(seed)
+            case "sobol":
+                return SobolSampler(seed)
+            case name:
+                raise RuntimeError(f"unknown sampler: {name}")
+
+    def render_scanline(self, row: int, world: Hittable, camera: Camera,
+                        media: Sequence[GlobalMedium] = (), seed: Optional[int] = None,
+                        features: bool = False, gbuffer: bool = False, packets: bool = False) -> RenderResult:
         """
         Renders one row (a.k.a. scanline) of pixels
 
         :param row: the index of the row being rendered, 0-based
         :param world: list of all the Hittables in the world
         :param camera: the camera object
-        :return: a list of ColorRgb representing the final pixel colors for the row
+        :param media: global participating media that fill the world
+        :param seed: the seed of the samples' random number streams, defaults to `seed`, or a random seed
+        :param features: if True, a FeatureRenderResult is returned, with the row's first hit albedo and normals
+        :param gbuffer: if True, the first hits of `gbuffer_positions` sub-sample positions of each pixel are cached
+        and reused by all its samples, only valid if `primary_hits_cacheable()`
+        :param packets: if True, the primary rays of `packet_size` samples are traced together, as a packet, only
+        valid if `primary_hits_deterministic()`
+        :return: the row's index and a width x 3 ndarray holding the sums of each pixel's linear sample colors,
+        see `post_process()`
         """
-        # holds the row of RGB data
+        if seed is None:
+            seed = self.seed if self.seed is not None else random.getrandbits(63)
+        sampler = self.build_sampler(seed)
+
+        # holds the row's sums of linear RGB sample colors
         colors: common.NDArrayFloat = np.zeros((camera.image_width, 3))
+        if features:
+            albedo: common.NDArrayFloat = np.zeros((camera.image_width, 3))
+            normals: common.NDArrayFloat = np.zeros((camera.image_width, 3))
+
+        # pixels whose rays can't hit the world see only the background. Global media fill the world,
+        # so with media every ray has to be traced
+        background_pixels = np.zeros(camera.image_width, dtype=bool)
+        if self.background_fast_path and not media:
+            bounds = world.bounding_box(camera.open_time, camera.close_time)
+            if bounds is not None:
+                background_pixels = pixels_missing_box(camera, row, bounds)
+            if background_pixels.any():
+                background = self._background_pixels(camera, row, np.flatnonzero(background_pixels))
+                colors[background_pixels] = background * self.samples_per_pixel
+                if features:
+                    albedo[background_pixels] = np.clip(background, 0.0, 1.0)
 
         # for each pixel in the current row, generate multiple rays from the camera to the current
-        # pixel, offset by some u,v amount, and compute the final pixel color via calls to the ray_color()
-        # method. The final pixel_color is multi-sampled before being stored in the final colors list
-        for col in range(camera.image_width):
-            pixel_color = ColorRgb()
-            for _ in range(self.samples_per_pixel):
-                # u,v are offsets that randomly choose a point close to the current pixel
-                u = (float(col) + random.random()) / (camera.image_width - 1)
-                v = (float(row) + random.random()) / (camera.image_height - 1)
-                r = camera.get_ray(u, v)
-                pixel_color += self.ray_color(r, world, self.ray_bounce_depth)
-            r, g, b = MultiprocessRenderer._multi_sample(pixel_color, self.samples_per_pixel).to_tuple()
-            colors[col][0] = r
-            colors[col][1] = g
-            colors[col][2] = b
+        # pixel, offset by some u,v amount, and compute the final pixel color via calls to the shade()
+        # method. The sum of each pixel's sample colors is stored in the colors array.
+        # The pixels are rendered in groups, the camera rays of a group are generated all at once, and traced
+        # together as a packet
+        spp = self.samples_per_pixel
+        group_size = max(1, self.packet_size // spp)
+        # the sample whose sub-sample position, and first hit, each sample of a pixel goes through
+        if gbuffer and self.gbuffer_positions < spp:
+            position_of = np.arange(spp) % self.gbuffer_positions
+        else:
+            position_of = np.arange(spp)
+        cols = np.flatnonzero(~background_pixels).tolist()
+        for first in range(0, len(cols), group_size):
+            group = cols[first:first + group_size]
+            # the first dimensions of every sample of the group, its pixel offset, lens point and shutter time
+            dims = np.concatenate([sampler.sample_array(row * camera.image_width + col, spp, CAMERA_DIMENSIONS)
+                                   for col in group])
+            # u,v are offsets that randomly choose a point close to the current pixel, the point of the
+            # sub-sample position of the sample when the G-buffer is used
+            offsets = dims.reshape(len(group), spp, CAMERA_DIMENSIONS)[:, position_of, :2].reshape(-1, 2)
+            u = (np.repeat(group, spp) + offsets[:, 0]) / (camera.image_width - 1)
+            v = (row + offsets[:, 1]) / (camera.image_height - 1)
+            origins, directions, times = camera.get_rays(u, v, dims[:, 2:4], dims[:, 4])
+            rays = [Ray(Point3(*origin), Vec3(*direction), time) for origin, direction, time
+                    in zip(origins.tolist(), directions.tolist(), times.tolist())]
+
+            # the closest hit of the ray through each sub-sample position, by the index of its ray
+            hits: Dict[int, Optional[HitRecord]] = {}
+            if packets:
+                traced = [i for i in range(len(rays)) if position_of[i % spp] == i % spp]
+                hits = dict(zip(traced, hit_packet(world, [rays[i] for i in traced], 0.001, float("inf"))))
+
+            pixel_colors = {col: ColorRgb() for col in group}
+            for i, r in enumerate(rays):
+                col, sample = group[i // spp], i % spp
+                # everything else this sample draws, from the first bounce to the last, comes from the
+                # sampler and then from the sample's own stream
+                sampler.start_sample(row * camera.image_width + col, sample)
+                rng.skip(CAMERA_DIMENSIONS)
+                position = i - sample + position_of[sample]
+                if position not in hits:
+                    hits[position] = world.hit(r, 0.001, float("inf"))
+                if features:
+                    color, hit_albedo, hit_normal = self.shade_features(r, hits[position], world,
+                                                                        self.ray_bounce_depth, media)
+                    pixel_colors[col] += color
+                    albedo[col] += hit_albedo.to_tuple()
+                    normals[col] += hit_normal.to_tuple()
+                else:
+                    pixel_colors[col] += self.shade(r, hits[position], world, self.ray_bounce_depth, media)
+            colors[group] = [pixel_colors[col].to_tuple() for col in group]
+        if features:
+            return row, colors, albedo / self.samples_per_pixel, normals / self.samples_per_pixel
         return row, colors
 
-    def ray_color(self, ray: Ray, world: Hittable, depth: int) -> ColorRgb:
+    def ray_color(self, ray: Ray, world: Hittable, depth: int, media: Sequence[GlobalMedium] = ()) -> ColorRgb:
         """
         determines if a Ray has hit a `Hittable` object in the `world` and computes the overall color
         of the Ray. The Hittable's `Material` is taken into account when performing ray bouncing
@@ -111,29 +332,118 @@ class MultiprocessRenderer:
         :param ray: the Ray to color
         :param world: HittableList of objects in the world
         :param depth: max number of times the ray can bounce off of hittables before we stop coloring
+        :param media: global participating media, a ray can scatter inside them before reaching the closest hit
         :return: the final color of the given Ray
         """
         if depth == 0:
             # exceeded the ray bounce limit, no more light is gathered
             return ColorRgb()
 
+        return self.shade(ray, world.hit(ray, 0.001, float("inf")), world, depth, media)
+
+    def shade(self, ray: Ray, surface_rec: Optional[HitRecord], world: Hittable, depth: int,
+              media: Sequence[GlobalMedium] = ()) -> ColorRgb:
+        """
+        computes the overall color of a Ray, like `ray_color()`, when its closest hit with the `world` is already
+        known, for example when it was cached (see `gbuffer_positions`). Only the bounces are traced
+
+        :param ray: the Ray to color
+        :param surface_rec: the closest hit of `ray` with the world, None if it hit nothing
+        :param world: HittableList of objects in the world
+        :param depth: max number of times the ray can bounce off of hittables before we stop coloring
+        :param media: global participating media, a ray can scatter inside them before reaching the closest hit
+        :return: the final color of the given Ray
+        """
+        if depth == 0:
+            return ColorRgb()
+
         # if a hittable was hit, determine if its material will scatter the incoming ray,
         # AND how much light the material emits
-        rec = world.hit(ray, 0.001, float("inf"))
+        rec = MultiprocessRenderer._medium_hit(ray, surface_rec, media)
         if rec:
             emitted = rec.material.emitted(rec.u, rec.v, rec.p)
             scatter_rec = rec.material.scatter(ray, rec.p, rec.normal, rec.t, rec.u, rec.v, rec.front_face)
             if scatter_rec:
-                return emitted + scatter_rec.attenuation ** self.ray_color(scatter_rec.scattered, world, depth - 1)
+                return emitted + scatter_rec.attenuation ** self.ray_color(scatter_rec.scattered, world, depth - 1, media)
             else:
                 return emitted
         else:
             # nothing was hit, return the background color
-            if isinstance(self.background_color, background_type.SolidBackground):
-                return self.background_color.color1
+            return self._background(ray)
+
+    def shade_features(self, ray: Ray, surface_rec: Optional[HitRecord], world: Hittable, depth: int,
+                       media: Sequence[GlobalMedium] = ()) -> Tuple[ColorRgb, ColorRgb, Vec3]:
+        """
+        computes the color of a Ray, like `shade()`, along with the albedo and normal of its first hit.
+        The albedo is the attenuation of the hit material, or its emitted color, clamped to 1.0, if it doesn't
+        scatter. Rays that hit nothing have the background color as albedo and a zero normal
+        :return: (color, albedo, normal)
+        """
+        if depth == 0:
+            return ColorRgb(), ColorRgb(), Vec3()
+
+        rec = MultiprocessRenderer._medium_hit(ray, surface_rec, media)
+        if rec:
+            emitted = rec.material.emitted(rec.u, rec.v, rec.p)
+            scatter_rec = rec.material.scatter(ray, rec.p, rec.normal, rec.t, rec.u, rec.v, rec.front_face)
+            if scatter_rec:
+                color = emitted + scatter_rec.attenuation ** self.ray_color(scatter_rec.scattered, world, depth - 1,
+                                                                            media)
+                return color, MultiprocessRenderer._albedo(scatter_rec.attenuation), rec.normal
             else:
-                # linear interpolate background color
-                return MultiprocessRenderer._linear_blend(ray, self.background_color.frm, self.background_color.to)
+                return emitted, MultiprocessRenderer._albedo(emitted), rec.normal
+        else:
+            background = self._background(ray)
+            return background, MultiprocessRenderer._albedo(background), Vec3()
+
+    @staticmethod
+    def _medium_hit(ray: Ray, surface_rec: Optional[HitRecord], media: Sequence[GlobalMedium]) \
+            -> Optional[HitRecord]:
+        """
+        :return: the hit of `ray` with the global media, if it scatters before reaching its closest surface hit
+        `surface_rec`, else `surface_rec`
+        """
+        rec = surface_rec
+        for medium in media:
+            medium_rec = medium.hit(ray, 0.001, rec.t if rec else float("inf"))
+            if medium_rec:
+                rec = medium_rec
+        return rec
+
+    def _background_pixels(self, camera: Camera, row: int, cols: np.ndarray) -> common.NDArrayFloat:
+        """
+        computes the background colors of the given pixels of a row all at once, averaged over
+        `samples_per_pixel` (at most 16) fixed sub-pixel positions, the first points of the Halton sequence
+        :param camera: the camera
+        :param row: the index of the row, 0-based
+        :param cols: the column indices of the pixels
+        :return: the linear background color of each pixel, an array of shape (len(cols), 3)
+        """
+        if isinstance(self.background_color, background_type.SolidBackground):
+            return np.tile(self.background_color.color1.to_tuple(), (len(cols), 1))
+
+        offsets = radical_inverse(np.array([2, 3]), np.arange(min(self.samples_per_pixel, 16))[:, np.newaxis])
+        u = (cols[:, np.newaxis] + offsets[:, 0]) / (camera.image_width - 1)
+        v = (row + offsets[:, 1]) / (camera.image_height - 1)
+        corner = camera.lower_left_corner - camera.look_from
+        directions = np.stack([corner.x + u * camera.horizontal.x + v * camera.vertical.x,
+                               corner.y + u * camera.horizontal.y + v * camera.vertical.y,
+                               corner.z + u * camera.horizontal.z + v * camera.vertical.z], axis=2)
+        # the same blend as _linear_blend()
+        t = 0.5 * (directions[..., 1] / np.linalg.norm(directions, axis=2) + 1.0)
+        blend = (1.0 - t[..., np.newaxis]) * self.background_color.frm.to_tuple() + \
+            t[..., np.newaxis] * self.background_color.to.to_tuple()
+        return blend.mean(axis=1)
+
+    def _background(self, ray: Ray) -> ColorRgb:
+        """
+        :return: the background color seen by a Ray that hit nothing
+        """
+        if isinstance(self.background_color, background_type.SolidBackground):
+            return self.background_color.color1
+        else:
+            # linear interpolate background color
+            return MultiprocessRenderer._linear_blend(ray, self.background_color.frm, self.background_color.to)
 
     @staticmethod
     def _linear_blend(ray: Ray, frm: ColorRgb, to: ColorRgb) -> ColorRgb:
@@ -148,26 +458,23 @@ class MultiprocessRenderer:
         return (1.0 - t) * frm + t * to
 
     @staticmethod
-    def _multi_sample(pixel_color: ColorRgb, samples_per_pixel: int) -> ColorRgb:
+    def _albedo(color: ColorRgb) -> ColorRgb:
         """
-        returns a new pixel color using multi-sample color computation
-
-        :param pixel_color: the color to multisample
-        :param samples_per_pixel:
+        returns a copy of `color` clamped to the range 0.0..1.0, `color` itself may be shared by a material
         """
-        r, g, b = pixel_color.to_tuple()
+        return ColorRgb(min(max(color.x, 0.0), 1.0), min(max(color.y, 0.0), 1.0), min(max(color.z, 0.0), 1.0))
 
-        # divide the color total by the numer of samples and gamma correct for gamma = 2.0
-        scale = 1.0 / float(samples_per_pixel)
-        r = math.sqrt(scale * r)
-        g = math.sqrt(scale * g)
-        b = math.sqrt(scale * b)
+    @staticmethod
+    def post_process(sums: common.NDArrayFloat, samples_per_pixel: int) -> common.NDArrayFloat:
+        """
+        converts the sums of the pixels' linear sample colors, of a row or of a whole image, to display colors in a
+        single vectorized pass: averages them, gamma corrects for gamma = 2.0 and scales them to 0.0..256.0, clamped
+        below 256.0 so that they quantize to 0..255
 
-        return ColorRgb(
-            256.0 * common.clamp(r, 0.0, 0.999),
-            256.0 * common.clamp(g, 0.0, 0.999),
-            256.0 * common.clamp(b, 0.0, 0.999)
-        )
+        :param sums: an ndarray of R,G,B color sums, as returned by `render_sums()` or `render_scanline()`
+        :param samples_per_pixel: the number of samples summed into each pixel
+        """
+        return 256.0 * np.clip(np.sqrt(sums / float(samples_per_pixel)), 0.0, 0.999)
 
     @staticmethod
     def _index_chunks(max_index: int, size: int) -> List:
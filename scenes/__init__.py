@@ -7,3 +7,4 @@ from .scene_builder import \
     build_earth_scene, \
     build_scene_two_perlin_spheres, \
     build_scene_final
+from .scene_loader import load_scene, SceneLoader
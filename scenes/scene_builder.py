@@ -2,24 +2,45 @@
 Functions for building a camera and a list of hittable primitives that make up one of the
 pre-built scenes from the Raytracing in a Weekend series of books.
 """
+import functools
 import random
+from typing import Optional
 
-from common import Camera, CameraBuilder, Point3, Vec3, ColorRgb
+from common import Camera, CameraBuilder, Point3, Vec3, ColorRgb, InternRegistry
 from hittables import HittableList, FlipFace, RotateY, Hittable
 from hittables.bvh_node import BvhNode
-from hittables.primitives import Sphere, XZRect, YZRect, XYRect, BoxInst, MovingSphere
+from hittables.primitives import Sphere, XZRect, YZRect, XYRect, BoxInst, MovingSphere, RectSet
 from hittables.translate import Translate
-from hittables.volumes import ConstantMedium
-from materials import Lambertian, Dielectric, Metal
+from hittables.volumes import ConstantMedium, GlobalMedium
+from materials import Lambertian, Dielectric, Metal, Material
 from materials.diffuse_light import DiffuseLight
 from renderer import BackgroundType, LinearInterpBackground, SolidBackground
-from textures import SolidColor, ImageTexture, NoiseTexture
+from textures import SolidColor, ImageTexture, NoiseTexture, Texture
 from textures.checker_texture import CheckerTexture
 
 # path to the earth texture file
 EARTH_TEXTURE_PATH = "./earthmap.jpg"
 
+# the textures and materials built by the scene builder that is running, equal ones are only kept once, and shared.
+# It is emptied before and after each scene is built, so scenes don't share them and they aren't kept alive
+REGISTRY = InternRegistry()
 
+
+def _interning(builder):
+    """
+    decorates a scene builder, so that the textures and materials it interns are only shared within its scene
+    """
+    @functools.wraps(builder)
+    def build(*args, **kwargs):
+        REGISTRY.clear()
+        try:
+            return builder(*args, **kwargs)
+        finally:
+            REGISTRY.clear()
+    return build
+
+
+@_interning
 def build_scene_cornell_box_with_two_boxes(image_width: float, aspect_ratio: float) -> (Camera, HittableList, BackgroundType):
     """
     builds the standard cornell box scene
@@ -42,12 +63,9 @@ def build_scene_cornell_box_with_two_boxes(image_width: float, aspect_ratio: flo
         .build()
 
     # build solid color materials
-    red = SolidColor.from_rgb(0.65, 0.05, 0.05)
-    white = SolidColor.from_rgb(0.73, 0.73, 0.73)
-    green = SolidColor.from_rgb(0.12, 0.45, 0.15)
-    red_mat = Lambertian(red)
-    white_mat = Lambertian(white)
-    green_mat = Lambertian(green)
+    red_mat = build_lambertian(ColorRgb(0.65, 0.05, 0.05))
+    white_mat = build_lambertian(ColorRgb(0.73, 0.73, 0.73))
+    green_mat = build_lambertian(ColorRgb(0.12, 0.45, 0.15))
 
     # build the walls of the room
     green_wall = FlipFace(YZRect(0.0, 555.0, 0.0, 555.0, 555.0, green_mat))
@@ -74,12 +92,8 @@ def build_scene_cornell_box_with_two_boxes(image_width: float, aspect_ratio: flo
     # per_sphere = Translate(per_sphere, Vec3(175.0, 225.0, 170.0))
 
     world = HittableList()
-    world.add(green_wall)
-    world.add(red_wall)
-    world.add(light)
-    world.add(floor)
-    world.add(ceiling)
-    world.add(back_wall)
+    # the walls and the light are packed into a single hittable, that tests them all at once
+    world.add(RectSet.from_rects([green_wall, red_wall, light, floor, ceiling, back_wall]))
     world.add(rect_box)
     world.add(square_box)
 
@@ -89,6 +103,7 @@ def build_scene_cornell_box_with_two_boxes(image_width: float, aspect_ratio: flo
     return camera, world, background
 
 
+@_interning
 def build_scene_cornell_smoke_boxes(image_width: float, aspect_ratio: float) -> (Camera, HittableList, BackgroundType):
     """
     builds a cornell box scene except the two interior boxes are made out of a smoke-like material
@@ -111,12 +126,9 @@ def build_scene_cornell_smoke_boxes(image_width: float, aspect_ratio: float) ->
         .build()
 
     # build solid color materials
-    red = SolidColor.from_rgb(0.65, 0.05, 0.05)
-    white = SolidColor.from_rgb(0.73, 0.73, 0.73)
-    green = SolidColor.from_rgb(0.12, 0.45, 0.15)
-    red_mat = Lambertian(red)
-    white_mat = Lambertian(white)
-    green_mat = Lambertian(green)
+    red_mat = build_lambertian(ColorRgb(0.65, 0.05, 0.05))
+    white_mat = build_lambertian(ColorRgb(0.73, 0.73, 0.73))
+    green_mat = build_lambertian(ColorRgb(0.12, 0.45, 0.15))
 
     # build the walls of the room
     green_wall = FlipFace(YZRect(0.0, 555.0, 0.0, 555.0, 555.0, green_mat))
@@ -139,17 +151,13 @@ def build_scene_cornell_smoke_boxes(image_width: float, aspect_ratio: float) ->
     square_box = Translate(square_box2, Vec3(130.0, 0.0, 100.0))
 
     # fog box has a black color applied to its fog
-    fog_box = ConstantMedium.from_density(rect_box, 0.01, SolidColor.from_rgb(0.0, 0.0, 0.0))
+    fog_box = build_constant_medium(rect_box, 0.01, ColorRgb(0.0, 0.0, 0.0))
     # smoke box has white color applied for its smoke
-    smoke_box = ConstantMedium.from_density(square_box, 0.01, SolidColor.from_rgb(1.0, 1.0, 1.0))
+    smoke_box = build_constant_medium(square_box, 0.01, ColorRgb(1.0, 1.0, 1.0))
 
     world = HittableList()
-    world.add(green_wall)
-    world.add(red_wall)
-    world.add(light)
-    world.add(floor)
-    world.add(ceiling)
-    world.add(back_wall)
+    # the walls and the light are packed into a single hittable, that tests them all at once
+    world.add(RectSet.from_rects([green_wall, red_wall, light, floor, ceiling, back_wall]))
     world.add(smoke_box)
     world.add(fog_box)
 
@@ -159,9 +167,13 @@ def build_scene_cornell_smoke_boxes(image_width: float, aspect_ratio: float) ->
     return camera, world, background
 
 
-def build_scene_two_perlin_spheres(image_width: int, aspect_ratio: float) -> (Camera, HittableList, BackgroundType):
+@_interning
+def build_scene_two_perlin_spheres(image_width: int, aspect_ratio: float,
+                                   rng: Optional[random.Random] = None) -> (Camera, HittableList, BackgroundType):
     """
     builds a scene with two "marble" textured sphere on top of each other, and a linear blended blue background
+    :param rng: the random number generator the scene is generated with, defaults to the `random` module's
+    global generator
     """
     camera = CameraBuilder() \
         .look_from(Point3(13.0, 2.0, 3.0)) \
@@ -176,8 +188,8 @@ def build_scene_two_perlin_spheres(image_width: int, aspect_ratio: float) -> (Ca
         .build()
 
     background = LinearInterpBackground(ColorRgb(1.0, 1.0, 1.0), ColorRgb(0.5, 0.5, 1.0))
-    sphere1 = build_perlin_sphere(Point3(0.0, -1000.0, 0.0), 1000.0, 0.8)
-    sphere2 = build_perlin_sphere(Point3(0.0, 2.0, 0.0), 2.0, 0.5)
+    sphere1 = build_perlin_sphere(Point3(0.0, -1000.0, 0.0), 1000.0, 0.8, rng)
+    sphere2 = build_perlin_sphere(Point3(0.0, 2.0, 0.0), 2.0, 0.5, rng)
 
     world = HittableList()
     world.add(sphere1)
@@ -186,6 +198,7 @@ def build_scene_two_perlin_spheres(image_width: int, aspect_ratio: float) -> (Ca
     return camera, world, background
 
 
+@_interning
 def build_scene_two_checkered_spheres(image_width: int, aspect_ratio: float) -> (Camera, HittableList, BackgroundType):
     """
     builds a scene with two checkered spheres on top of each other. The top sphere has a grey checkerboard pattern
@@ -238,13 +251,18 @@ def build_scene_two_checkered_spheres(image_width: int, aspect_ratio: float) ->
     return camera, world, background
 
 
-def build_scene_random_spheres(image_width: int, aspect_ratio: float) -> (Camera, HittableList, BackgroundType):
+@_interning
+def build_scene_random_spheres(image_width: int, aspect_ratio: float,
+                               rng: Optional[random.Random] = None) -> (Camera, HittableList, BackgroundType):
     """
     builds a scene consisting of 484 random spheres above a gigantic checkerboard sphere
     :param image_width:
     :param aspect_ratio:
+    :param rng: the random number generator the scene is generated with, defaults to the `random` module's
+    global generator
     :return:
     """
+    rng = random if rng is None else rng
     camera = CameraBuilder() \
         .look_from(Point3(13.0, 2.0, 3.0)) \
         .look_at(Point3(0.0, 0.0, 0.0)) \
@@ -279,29 +297,29 @@ def build_scene_random_spheres(image_width: int, aspect_ratio: float) -> (Camera
     for a in range(-11, 11):
         for b in range(-11, 11):
             # generate a random center point for the sphere, right above the y-plane
-            x = a + 0.9 * random.random()
-            z = b + 0.9 * random.random()
+            x = a + 0.9 * rng.random()
+            z = b + 0.9 * rng.random()
             center = Point3(x, 0.2, z)
 
             if (center - Vec3(4.0, 0.2, 0.0)).length() > 0.9:
                 # randomly select a material
-                prob = random.random()
+                prob = rng.random()
                 if prob < 0.1:
                     # create a moving sphere
-                    center2 = center + Vec3(0.0, random.random(), 0.0)
-                    random_color = ColorRgb.random() ** ColorRgb.random()
+                    center2 = center + Vec3(0.0, rng.random(), 0.0)
+                    random_color = ColorRgb.random(rng) ** ColorRgb.random(rng)
                     moving_sphere = build_solid_moving_sphere(random_color, center, center2, 0.0, 1.0, default_radius)
                     world.add(moving_sphere)
                 elif prob < 0.7:
                     # create a solid, random color sphere, offset from the center
-                    random_color = ColorRgb.random() ** ColorRgb.random()
-                    center_offset = center + Vec3(0.0, random.random(), 0.0)
+                    random_color = ColorRgb.random(rng) ** ColorRgb.random(rng)
+                    center_offset = center + Vec3(0.0, rng.random(), 0.0)
                     sphere = build_solid_sphere(center_offset, default_radius, random_color)
                     world.add(sphere)
                 elif prob < 0.95:
                     # build a metal sphere
-                    random_color = ColorRgb.random_range(0.5, 1.0)
-                    fuzz = random.uniform(0.0, 0.5)
+                    random_color = ColorRgb.random_range(0.5, 1.0, rng)
+                    fuzz = rng.uniform(0.0, 0.5)
                     sphere = build_metal_sphere(center, default_radius, random_color, fuzz)
                     world.add(sphere)
                 else:
@@ -314,7 +332,7 @@ def build_scene_random_spheres(image_width: int, aspect_ratio: float) -> (Camera
     world.add(glass_sphere)
 
     # add a single perlin noise sphere
-    perlin_sphere = build_perlin_sphere(Point3(-4.0, 1.0, 0.0), 1.0, 0.9)
+    perlin_sphere = build_perlin_sphere(Point3(-4.0, 1.0, 0.0), 1.0, 0.9, rng)
     world.add(perlin_sphere)
 
     # add a tan colored sphere
@@ -324,6 +342,7 @@ def build_scene_random_spheres(image_width: int, aspect_ratio: float) -> (Camera
     return camera, world, background_color
 
 
+@_interning
 def build_earth_scene(image_width: int, aspect_ratio: float) -> (Camera, HittableList, BackgroundType):
     """
     returns a scene consisting of the camera looking at a single earth textured sphere, against a blue
@@ -353,13 +372,18 @@ def build_earth_scene(image_width: int, aspect_ratio: float) -> (Camera, Hittabl
     return camera, world, background_color
 
 
-def build_scene_final(image_width: int, aspect_ratio: int) -> (Camera, HittableList, BackgroundType):
+@_interning
+def build_scene_final(image_width: int, aspect_ratio: int,
+                      rng: Optional[random.Random] = None) -> (Camera, HittableList, BackgroundType):
     """
     builds the "final" scene of the book "Raytracing the Next Week"
     This scene is a ground plane made of 400 green boxes, along with a glass sphere, earth texture sphere,
     perlin noise sphere, metal sphere, a foggy sphere, and then a large box made up of 1000 smaller spheres.
-    There is a mist sphere applied to the entire scene
+    There is a global mist applied to the entire scene
+    :param rng: the random number generator the scene, and its BVHs, are generated with, defaults to the
+    `random` module's global generator
     """
+    rng = random if rng is None else rng
     camera = CameraBuilder() \
         .look_from(Point3(178.0, 278.0, -800.0)) \
         .look_at(Point3(278.0, 278.0, 0.0)) \
@@ -377,7 +401,7 @@ def build_scene_final(image_width: int, aspect_ratio: int) -> (Camera, HittableL
 
     # build a ground layer consisting of ~ 400 boxes of various widths and heights
     ground_boxes = HittableList()
-    ground_mat = Lambertian.from_color(0.48, 0.83, 0.53)
+    ground_mat = build_lambertian(ColorRgb(0.48, 0.83, 0.53))
     boxes_per_side = 20
     for i in range(boxes_per_side):
         for j in range(boxes_per_side):
@@ -386,14 +410,14 @@ def build_scene_final(image_width: int, aspect_ratio: int) -> (Camera, HittableL
             z0 = -1000.0 + j * w
             y0 = 0.0
             x1 = x0 + w
-            y1 = random.uniform(1.0, 101.0)
+            y1 = rng.uniform(1.0, 101.0)
             z1 = z0 + w
             box = BoxInst.from_material(Point3(x0, y0, z0), Point3(x1, y1, z1), ground_mat)
             ground_boxes.add(box)
 
     # objects holds all the hittable objects in the scene
     objects = HittableList()
-    objects.add(BvhNode.from_hittable_list(ground_boxes, 0.0, 1.0))
+    objects.add(BvhNode.from_hittable_list(ground_boxes, 0.0, 1.0, rng=rng))
 
     # build a light source at the top of the scene
     light = build_xz_diff_light(ColorRgb(7.0, 7.0, 7.0), 123.0, 423.0, 147.0, 412.0, 554.0)
@@ -425,9 +449,8 @@ def build_scene_final(image_width: int, aspect_ratio: int) -> (Camera, HittableL
     fog_volume = build_constant_medium(sphere_boundary, 0.2, ColorRgb(0.2, 0.4, 0.9))
     objects.add(fog_volume)
 
-    # build a spherical mist volume throughout the whole scene
-    sphere_mist_boundary = build_dielectric_sphere(Point3(), 5000., 1.5)
-    mist_volume = build_constant_medium(sphere_mist_boundary, 0.0001, ColorRgb(1., 1., 1.))
+    # build a mist throughout the whole scene, rays leave the mist after travelling 5000 units
+    mist_volume = build_global_medium(0.0001, ColorRgb(1., 1., 1.), 5000.)
     objects.add(mist_volume)
 
     # build a sphere with the earth texture mapped to it
@@ -435,18 +458,18 @@ def build_scene_final(image_width: int, aspect_ratio: int) -> (Camera, HittableL
     objects.add(earth)
 
     # build a sphere with perlin noise texture
-    perlin_sphere = build_perlin_sphere(Point3(220., 280., 300.), 80., 0.1)
+    perlin_sphere = build_perlin_sphere(Point3(220., 280., 300.), 80., 0.1, rng)
     objects.add(perlin_sphere)
 
     # build a box composed of ~1000 smaller spheres
     ns = 1000
     box_of_spheres = HittableList()
     for _ in range(ns):
-        sphere = build_solid_sphere(Point3.random_range(0.0, 165.0), 10.0, ColorRgb(0.73, 0.73, 0.73))
+        sphere = build_solid_sphere(Point3.random_range(0.0, 165.0, rng), 10.0, ColorRgb(0.73, 0.73, 0.73))
         box_of_spheres.add(sphere)
 
     # add the box of spheres to the BVH and then rotate and translate the entire box
-    sphere_node = BvhNode.from_hittable_list(box_of_spheres, 0.0, 1.0)
+    sphere_node = BvhNode.from_hittable_list(box_of_spheres, 0.0, 1.0, rng=rng)
     rotated_spheres = RotateY.from_hittable(sphere_node, 15.0)
     translated_spheres = Translate(rotated_spheres, Vec3(-100., 270., 395.))
     objects.add(translated_spheres)
@@ -454,13 +477,25 @@ def build_scene_final(image_width: int, aspect_ratio: int) -> (Camera, HittableL
     return camera, objects, background
 
 
+def build_solid_texture(color: ColorRgb) -> Texture:
+    """
+    returns the (shared) solid texture of the specified color
+    """
+    return REGISTRY.intern(SolidColor(color))
+
+
+def build_lambertian(color: ColorRgb) -> Material:
+    """
+    returns the (shared) lambertian material of the specified color
+    """
+    return REGISTRY.intern(Lambertian(build_solid_texture(color)))
+
+
 def build_solid_sphere(center: Point3, radius: float, color: ColorRgb) -> Sphere:
     """
     returns a lambertian sphere of the specified color
     """
-    tex = SolidColor(color)
-    mat = Lambertian(tex)
-    return Sphere(center, radius, mat)
+    return Sphere(center, radius, build_lambertian(color))
 
 
 def build_solid_moving_sphere(color: ColorRgb, c0: Point3, c1: Point3, t0: float, t1: float, radius: float) -> MovingSphere:
@@ -474,22 +509,21 @@ def build_solid_moving_sphere(color: ColorRgb, c0: Point3, c1: Point3, t0: float
     :param radius:
     :return:
     """
-    mat = Lambertian.from_color(color.r, color.g, color.b)
-    return MovingSphere(c0, c1, t0, t1, radius, mat)
+    return MovingSphere(c0, c1, t0, t1, radius, build_lambertian(color))
 
 
 def build_dielectric_sphere(center: Point3, radius: float, ref_idx: float) -> Sphere:
     """
     builds a dielectric sphere with the specified refractive index
     """
-    return Sphere(center, radius, Dielectric(ref_idx))
+    return Sphere(center, radius, REGISTRY.intern(Dielectric(ref_idx)))
 
 
 def build_metal_sphere(center: Point3, radius: float, color: ColorRgb, fuzz: float) -> Sphere:
     """
     builds a metal sphere with the specified color and fuzziness
     """
-    metal = Metal(color, fuzz)
+    metal = REGISTRY.intern(Metal(color, fuzz))
     return Sphere(center, radius, metal)
 
 
@@ -497,10 +531,8 @@ def build_checkered_sphere(center: Point3, radius: float, even: ColorRgb, odd: C
     """
     Returns a Checkered sphere using the colors in even and odd as the checkerboard colors
     """
-    even = SolidColor(even)
-    odd = SolidColor(odd)
-    tex = CheckerTexture(odd, even)
-    mat = Lambertian(tex)
+    tex = REGISTRY.intern(CheckerTexture(build_solid_texture(odd), build_solid_texture(even)))
+    mat = REGISTRY.intern(Lambertian(tex))
     return Sphere(center, radius, mat)
 
 
@@ -508,25 +540,35 @@ def build_constant_medium(bound: Hittable, density: float, color: ColorRgb) -> C
     """
     builds a ConstantMedium from the specified bound, density and color
     """
-    return ConstantMedium.from_density(bound, density, SolidColor(color))
+    return ConstantMedium.from_density(bound, density, build_solid_texture(color))
+
+
+def build_global_medium(density: float, color: ColorRgb, extent: float) -> GlobalMedium:
+    """
+    builds a GlobalMedium, filling the whole scene, from the specified density, color and extent
+    """
+    return GlobalMedium.from_density(density, build_solid_texture(color), extent)
 
 
 def build_earth_sphere(center: Point3, radius: float) -> Sphere:
     """
     builds a sphere with an image of the earth applied to it as its texture
     """
-    tex = ImageTexture(EARTH_TEXTURE_PATH)
-    mat = Lambertian(tex)
+    tex = REGISTRY.intern(ImageTexture(EARTH_TEXTURE_PATH))
+    mat = REGISTRY.intern(Lambertian(tex))
     return Sphere(center, radius, mat)
 
 
-def build_perlin_sphere(center: Point3, radius: float, noise_scale: float) -> Sphere:
+def build_perlin_sphere(center: Point3, radius: float, noise_scale: float,
+                        rng: Optional[random.Random] = None) -> Sphere:
     """
     builds a solid sphere with a Perlin noise as its texture
     :param noise_scale: the amount of noise to generate in the texture. Higher = more noise
+    :param rng: the random number generator the noise is generated with
     """
-    tex = NoiseTexture(noise_scale)
-    mat = Lambertian(tex)
+    # every noise texture has its own random noise, so they are never equal, only the material is interned
+    tex = NoiseTexture(noise_scale, rng)
+    mat = REGISTRY.intern(Lambertian(tex))
     return Sphere(center, radius, mat)
 
 
@@ -534,12 +576,10 @@ def build_xz_diff_light(light_color: ColorRgb, x0: float, x1: float, z0: float,
     """
     Returns a XZ-Rectangle diffuse light material with the specified light_color and coordinates
     """
-    light_color = SolidColor(light_color)
-    diff_light = DiffuseLight(light_color)
+    diff_light = REGISTRY.intern(DiffuseLight(build_solid_texture(light_color)))
     return XZRect(x0, x1, z0, z1, k, diff_light)
 
 
 def build_xy_diff_light(light_color: ColorRgb, x0: float, x1: float, y0: float, y1: float, k: float) -> XYRect:
-    solid_light = SolidColor(light_color)
-    diff_light = DiffuseLight(solid_light)
+    diff_light = REGISTRY.intern(DiffuseLight(build_solid_texture(light_color)))
     return XYRect(x0, x1, y0, y1, k, diff_light)
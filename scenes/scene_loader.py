@@ -0,0 +1,338 @@
+"""
+Loads a scene from a declarative JSON scene file, instead of building it with one of the functions in
+`scene_builder`. A scene file is a JSON object with these members:
+
+ camera - {"look_from": [x,y,z], "look_at": [x,y,z], "up": [x,y,z], "vertical_fov": degrees,
+   "focus_distance": d, "aperture": a, "open_close_time": [t0, t1]}. The image width and aspect ratio
+   are given to the loader, "up", "focus_distance", "aperture" and "open_close_time" are optional
+ background - [r,g,b] for a solid background, or {"from": [r,g,b], "to": [r,g,b]} for a linearly
+   interpolated one
+ textures - optional, named textures: {"name": texture, ...}
+ materials - optional, named materials: {"name": material, ...}
+ objects - a list of objects
+
+A texture is the name of a texture, [r,g,b] for a solid color, or one of
+ {"type": "solid", "color": [r,g,b]}, {"type": "checker", "odd": texture, "even": texture},
+ {"type": "image", "path": path}, {"type": "noise", "scale": s}
+
+A material is the name of a material or one of
+ {"type": "lambertian", "albedo": texture}, {"type": "metal", "albedo": [r,g,b], "fuzz": f},
+ {"type": "dielectric", "ref_idx": i}, {"type": "diffuse_light", "emit": texture},
+ {"type": "isotropic", "albedo": texture}
+
+An object is one of
+ {"type": "sphere", "center": [x,y,z], "radius": r, "material": material}
+ {"type": "moving_sphere", "center0": [x,y,z], "center1": [x,y,z], "time0": t0, "time1": t1, "radius": r,
+   "material": material}
+ {"type": "xy_rect", "x0", "x1", "y0", "y1", "k", "material"} (and "xz_rect", "yz_rect" likewise)
+ {"type": "box", "min": [x,y,z], "max": [x,y,z], "material": material}
+ {"type": "rect_set", "rects": [rect objects]} - rects packed into a single `RectSet`
+ {"type": "mesh", "path": .OBJ path, "material": material, "cache_dir": optional mesh cache directory}
+ {"type": "triangle_mesh", "vertices": [[x,y,z], ...], "indices": [[i,j,k], ...], "material": material}
+ {"type": "constant_medium", "boundary": object, "density": d, "texture": texture}
+ {"type": "global_medium", "density": d, "texture": texture, "extent": optional distance} - fills the whole
+   world, only allowed in the scene's top level "objects", and can't be transformed
+ {"type": "group", "objects": [objects], "accelerator": optional "bvh", "lbvh" or "grid"}
+ {"type": "spheres", "centers": [[x,y,z], ...], "radii": r or [r, ...], "material": material}
+ {"type": "boxes", "mins": [[x,y,z], ...], "maxs": [[x,y,z], ...], "material": material}
+Any object can also have "flip": true, "rotate_y": degrees and "translate": [x,y,z], which are applied
+in that order.
+
+"spheres" and "boxes" describe many objects at once, as arrays, which keeps large scene files
+small and quick to load. Instead of a single "material", they can have a "materials" list along with
+"material_ids", the index into "materials" of each object's material. Without an "accelerator" they
+add their objects to the enclosing list.
+
+Identical materials and textures, whether named or written out in place, are only built once and
+shared by all the objects using them. Relative paths are relative to the directory of the scene file.
+"""
+from __future__ import annotations
+
+import json
+import os
+import random
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from common import Camera, CameraBuilder, Point3, Vec3, ColorRgb
+from hittables import HittableList, FlipFace, RotateY, Hittable
+from hittables.bvh_builder import build_lbvh
+from hittables.bvh_node import BvhNode
+from hittables.primitives import Sphere, XZRect, YZRect, XYRect, BoxInst, MovingSphere, RectSet, TriangleMesh
+from hittables.translate import Translate
+from hittables.uniform_grid import UniformGrid
+from hittables.volumes import ConstantMedium, GlobalMedium
+from materials import Material, Lambertian, Dielectric, Metal, Isotropic
+from materials.diffuse_light import DiffuseLight
+from renderer import BackgroundType, LinearInterpBackground, SolidBackground
+from textures import Texture, SolidColor, ImageTexture, NoiseTexture
+from textures.checker_texture import CheckerTexture
+
+
+def load_scene(path: str, image_width: int, aspect_ratio: float,
+               rng: Optional[random.Random] = None) -> (Camera, HittableList, BackgroundType):
+    """
+    loads a scene from a JSON scene file
+    :param path: path to the scene file
+    :param image_width: the width of the rendered image
+    :param aspect_ratio: the aspect ratio of the rendered image
+    :param rng: the random number generator for noise textures and BVH split axes
+    :return: the scene's camera, a list of the hittables in the scene and its background
+    """
+    with open(path) as scene_file:
+        description = json.load(scene_file)
+    return SceneLoader(os.path.dirname(path), rng).load(description, image_width, aspect_ratio)
+
+
+class SceneLoader:
+    """
+    Builds a scene from a scene description, the decoded contents of a scene file. See this module's
+    documentation for the format of the description
+    """
+
+    def __init__(self, base_dir: str = ".", rng: Optional[random.Random] = None):
+        """
+        :param base_dir: the directory relative paths in the description are relative to
+        :param rng: the random number generator for noise textures and BVH split axes, defaults to the
+        `random` module's global generator
+        """
+        self.base_dir = base_dir
+        self.rng = rng
+        self._named_textures: Dict[str, Any] = {}
+        self._named_materials: Dict[str, Any] = {}
+        # every texture and material built so far, keyed by its canonical description
+        self._interned: Dict[str, Any] = {}
+        self._time0 = 0.0
+        self._time1 = 1.0
+
+    def load(self, description: dict, image_width: int, aspect_ratio: float) -> (Camera, HittableList, BackgroundType):
+        """
+        :return: the scene's camera, a list of the hittables in the scene and its background
+        """
+        camera = self.camera(description["camera"], image_width, aspect_ratio)
+        self._time0, self._time1 = camera.open_time, camera.close_time
+        self._named_textures = description.get("textures", {})
+        self._named_materials = description.get("materials", {})
+
+        world = HittableList(time0=self._time0, time1=self._time1)
+        for spec in description.get("objects", []):
+            if spec.get("type") == "global_medium":
+                world.add(self._global_medium(spec))
+            else:
+                self._add_object(world, spec)
+        return camera, world, self.background(description["background"])
+
+    @staticmethod
+    def camera(spec: dict, image_width: int, aspect_ratio: float) -> Camera:
+        open_time, close_time = spec.get("open_close_time", (0.0, 1.0))
+        return CameraBuilder() \
+            .look_from(Point3(*spec["look_from"])) \
+            .look_at(Point3(*spec["look_at"])) \
+            .up_direction(Vec3(*spec.get("up", (0.0, 1.0, 0.0)))) \
+            .aspect_ratio(aspect_ratio) \
+            .image_width(image_width) \
+            .focus_distance(spec.get("focus_distance", 10.0)) \
+            .aperture(spec.get("aperture", 0.0)) \
+            .vertical_field_of_view(spec["vertical_fov"]) \
+            .open_close_time(open_time, close_time) \
+            .build()
+
+    @staticmethod
+    def background(spec) -> BackgroundType:
+        if isinstance(spec, list):
+            return SolidBackground(ColorRgb(*spec))
+        return LinearInterpBackground(ColorRgb(*spec["from"]), ColorRgb(*spec["to"]))
+
+    def texture(self, spec) -> Texture:
+        """
+        :return: the texture described by `spec`, identical descriptions return the same texture
+        """
+        if isinstance(spec, str):
+            if spec not in self._named_textures:
+                raise RuntimeError(f"unknown texture: {spec}")
+            spec = self._named_textures[spec]
+        if isinstance(spec, list):
+            spec = {"type": "solid", "color": spec}
+        return self._intern("texture", spec, self._build_texture)
+
+    def material(self, spec) -> Material:
+        """
+        :return: the material described by `spec`, identical descriptions return the same material
+        """
+        if isinstance(spec, str):
+            if spec not in self._named_materials:
+                raise RuntimeError(f"unknown material: {spec}")
+            spec = self._named_materials[spec]
+        return self._intern("material", spec, self._build_material)
+
+    def _intern(self, kind: str, spec: dict, build):
+        # the key keeps the names of nested textures, so a material using a named texture and one
+        # spelling out the same texture are two materials, which share one texture
+        key = kind + json.dumps(spec, sort_keys=True)
+        interned = self._interned.get(key)
+        if interned is None:
+            interned = build(spec)
+            self._interned[key] = interned
+        return interned
+
+    def _build_texture(self, spec: dict) -> Texture:
+        match spec.get("type"):
+            case "solid":
+                return SolidColor(ColorRgb(*spec["color"]))
+            case "checker":
+                return CheckerTexture(self.texture(spec["odd"]), self.texture(spec["even"]))
+            case "image":
+                return ImageTexture(self._path(spec["path"]))
+            case "noise":
+                return NoiseTexture(spec["scale"], self.rng)
+            case kind:
+                raise RuntimeError(f"unknown texture type: {kind}")
+
+    def _build_material(self, spec: dict) -> Material:
+        match spec.get("type"):
+            case "lambertian":
+                return Lambertian(self.texture(spec["albedo"]))
+            case "metal":
+                return Metal(ColorRgb(*spec["albedo"]), spec["fuzz"])
+            case "dielectric":
+                return Dielectric(spec["ref_idx"])
+            case "diffuse_light":
+                return DiffuseLight(self.texture(spec["emit"]))
+            case "isotropic":
+                return Isotropic(self.texture(spec["albedo"]))
+            case kind:
+                raise RuntimeError(f"unknown material type: {kind}")
+
+    def _path(self, path: str) -> str:
+        return os.path.join(self.base_dir, path)
+
+    def _add_object(self, hit_list: HittableList, spec: dict):
+        """
+        adds the object(s) described by `spec` to `hit_list`
+        """
+        if spec.get("type") in ("spheres", "boxes"):
+            objects = self._build_array(spec)
+            if "accelerator" in spec:
+                hit_list.add(self._transform(self._accelerate(objects, spec["accelerator"]), spec))
+            elif any(key in spec for key in ("flip", "rotate_y", "translate")):
+                raise RuntimeError(f"{spec['type']} can only be transformed if they have an accelerator")
+            else:
+                hit_list.extend(objects)
+        else:
+            hit_list.add(self.object(spec))
+
+    def object(self, spec: dict) -> Hittable:
+        """
+        :return: the (transformed) hittable described by `spec`
+        """
+        return self._transform(self._build_object(spec), spec)
+
+    def _build_object(self, spec: dict) -> Hittable:
+        match spec.get("type"):
+            case "sphere":
+                return Sphere(Point3(*spec["center"]), spec["radius"], self.material(spec["material"]))
+            case "moving_sphere":
+                return MovingSphere(Point3(*spec["center0"]), Point3(*spec["center1"]), spec["time0"],
+                                    spec["time1"], spec["radius"], self.material(spec["material"]))
+            case "xy_rect":
+                return XYRect(spec["x0"], spec["x1"], spec["y0"], spec["y1"], spec["k"],
+                              self.material(spec["material"]))
+            case "xz_rect":
+                return XZRect(spec["x0"], spec["x1"], spec["z0"], spec["z1"], spec["k"],
+                              self.material(spec["material"]))
+            case "yz_rect":
+                return YZRect(spec["y0"], spec["y1"], spec["z0"], spec["z1"], spec["k"],
+                              self.material(spec["material"]))
+            case "box":
+                return BoxInst.from_material(Point3(*spec["min"]), Point3(*spec["max"]),
+                                             self.material(spec["material"]))
+            case "rect_set":
+                return RectSet.from_rects([self.object(rect) for rect in spec["rects"]])
+            case "mesh":
+                return TriangleMesh.from_obj(self._path(spec["path"]), self.material(spec["material"]),
+                                             cache_dir=spec.get("cache_dir"))
+            case "triangle_mesh":
+                return TriangleMesh.from_arrays(np.array(spec["vertices"], dtype=np.float64),
+                                                np.array(spec["indices"], dtype=np.int64),
+                                                self.material(spec["material"]))
+            case "constant_medium":
+                return ConstantMedium.from_density(self.object(spec["boundary"]), spec["density"],
+                                                   self.texture(spec["texture"]))
+            case "global_medium":
+                # the renderer only takes global media out of the world's top level list, elsewhere they
+                # would be unbounded surfaces
+                raise ValueError("a global_medium can only be a top level object of the scene")
+            case "group":
+                group = HittableList(time0=self._time0, time1=self._time1)
+                for child in spec["objects"]:
+                    self._add_object(group, child)
+                accelerator = spec.get("accelerator")
+                return self._accelerate(group.objects, accelerator) if accelerator else group
+            case kind:
+                raise RuntimeError(f"unknown object type: {kind}")
+
+    def _global_medium(self, spec: dict) -> GlobalMedium:
+        """
+        :return: the GlobalMedium described by a top level "global_medium" object
+        """
+        if any(key in spec for key in ("flip", "rotate_y", "translate")):
+            raise ValueError("a global_medium fills the whole world and can't be transformed")
+        return GlobalMedium.from_density(spec["density"], self.texture(spec["texture"]),
+                                         spec.get("extent", float("inf")))
+
+    def _build_array(self, spec: dict) -> List[Hittable]:
+        """
+        :return: the hittables described by a "spheres" or "boxes" array object
+        """
+        if "material" in spec:
+            materials = [self.material(spec["material"])]
+            material_ids = None
+        else:
+            materials = [self.material(material) for material in spec["materials"]]
+            material_ids = spec["material_ids"]
+
+        match spec["type"]:
+            case "spheres":
+                centers = spec["centers"]
+                radii = spec["radii"]
+                if not isinstance(radii, list):
+                    radii = [radii] * len(centers)
+                if material_ids is None:
+                    material_ids = [0] * len(centers)
+                if not len(centers) == len(radii) == len(material_ids):
+                    raise RuntimeError("spheres must have the same number of centers, radii and material_ids")
+                return [Sphere(Point3(x, y, z), radius, materials[material_id])
+                        for (x, y, z), radius, material_id in zip(centers, radii, material_ids)]
+            case _:
+                mins = spec["mins"]
+                maxs = spec["maxs"]
+                if material_ids is None:
+                    material_ids = [0] * len(mins)
+                if not len(mins) == len(maxs) == len(material_ids):
+                    raise RuntimeError("boxes must have the same number of mins, maxs and material_ids")
+                return [BoxInst.from_material(Point3(*p0), Point3(*p1), materials[material_id])
+                        for p0, p1, material_id in zip(mins, maxs, material_ids)]
+
+    def _accelerate(self, objects: List[Hittable], accelerator: Optional[str]) -> Hittable:
+        hit_list = HittableList(time0=self._time0, time1=self._time1)
+        hit_list.extend(objects)
+        match accelerator:
+            case "bvh":
+                return BvhNode.from_hittable_list(hit_list, self._time0, self._time1, rng=self.rng)
+            case "lbvh":
+                return build_lbvh(hit_list, self._time0, self._time1)
+            case "grid":
+                return UniformGrid.from_hittable_list(hit_list, self._time0, self._time1)
+            case name:
+                raise RuntimeError(f"unknown acceleration structure: {name}")
+
+    @staticmethod
+    def _transform(hittable: Hittable, spec: dict) -> Hittable:
+        if spec.get("flip"):
+            hittable = FlipFace(hittable)
+        if "rotate_y" in spec:
+            hittable = RotateY.from_hittable(hittable, spec["rotate_y"])
+        if "translate" in spec:
+            hittable = Translate(hittable, Vec3(*spec["translate"]))
+        return hittable
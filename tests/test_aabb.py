@@ -1,3 +1,4 @@
+import dataclasses
 from unittest import TestCase
 
 from common import Point3
@@ -9,3 +10,8 @@ class TestAabb(TestCase):
         bb1 = Aabb(Point3(0.5, 1.0, 1.5), Point3(2.5, 3.0, 3.5))
         bb2 = Aabb(Point3(0.5, 1.0, 1.5), Point3(2.5, 3.0, 3.5))
         self.assertEqual(bb1, bb2)
+
+    def test_aabb_is_read_only(self):
+        bb = Aabb(Point3(0.5, 1.0, 1.5), Point3(2.5, 3.0, 3.5))
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            bb.min = Point3(0.0, 0.0, 0.0)
@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+from common import Point3, Vec3, Ray
+from hittables import Hittable, RotateY
+from hittables.primitives import BoxInst
+from hittables.translate import Translate
+from materials import Lambertian
+
+
+class TestBoxInst(TestCase):
+
+    def test_hit_interval_matches_the_crossings_found_by_hit(self):
+        box = BoxInst.from_material(Point3(0.0, 0.0, 0.0), Point3(2.0, 2.0, 2.0), Lambertian.from_color(0.5, 0.5, 0.5))
+        ray = Ray(Point3(1.1, 0.9, -5.0), Vec3(0.1, 0.2, 1.0), 0.0)
+        t_enter, t_exit = box.hit_interval(ray, float("-inf"), float("inf"))
+        expected_enter, expected_exit = Hittable.hit_interval(box, ray, float("-inf"), float("inf"))
+        self.assertAlmostEqual(t_enter, expected_enter)
+        self.assertAlmostEqual(t_exit, expected_exit)
+
+    def test_hit_interval_through_rotate_and_translate(self):
+        box = BoxInst.from_material(Point3(0.0, 0.0, 0.0), Point3(2.0, 2.0, 2.0), Lambertian.from_color(0.5, 0.5, 0.5))
+        moved = Translate(RotateY.from_hittable(box, 15.0), Vec3(3.0, 0.0, 3.0))
+        ray = Ray(Point3(4.0, 1.0, -5.0), Vec3(0.01, 0.02, 1.0), 0.0)
+        t_enter, t_exit = moved.hit_interval(ray, float("-inf"), float("inf"))
+        expected_enter, expected_exit = Hittable.hit_interval(moved, ray, float("-inf"), float("inf"))
+        self.assertAlmostEqual(t_enter, expected_enter)
+        self.assertAlmostEqual(t_exit, expected_exit)
+
+    def test_hit_interval_is_none_when_ray_misses(self):
+        box = BoxInst.from_material(Point3(0.0, 0.0, 0.0), Point3(2.0, 2.0, 2.0), Lambertian.from_color(0.5, 0.5, 0.5))
+        ray = Ray(Point3(5.0, 5.0, -5.0), Vec3(0.01, 0.02, 1.0), 0.0)
+        self.assertIsNone(box.hit_interval(ray, float("-inf"), float("inf")))
@@ -0,0 +1,93 @@
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from common import Point3, Vec3, Ray
+from hittables import HittableList
+from hittables.bvh_builder import build_bvh_parallel, build_lbvh, morton_codes, MORTON_BITS
+from hittables.bvh_node import BvhNode
+from hittables.primitives import Sphere, MovingSphere
+from materials import Lambertian
+
+
+def _random_world(count: int) -> HittableList:
+    mat = Lambertian.from_color(0.5, 0.5, 0.5)
+    world = HittableList()
+    for i in range(count):
+        center = Point3.random_range(-50.0, 50.0)
+        if i % 5 == 0:
+            world.add(MovingSphere(center, center + Vec3.random_range(-2.0, 2.0), 0.0, 1.0, 0.5, mat))
+        else:
+            # snap some centers to a grid so that there are ties while sorting
+            world.add(Sphere(Point3(float(round(center.x)), center.y, center.z), 0.5, mat))
+    return world
+
+
+def _copy_list(hit_list: HittableList) -> HittableList:
+    copied = HittableList()
+    for hittable in hit_list.objects:
+        copied.add(hittable)
+    return copied
+
+
+def _assert_same_tree(test: TestCase, a, b):
+    test.assertIs(type(a), type(b))
+    if isinstance(a, BvhNode):
+        test.assertEqual(a.bbox, b.bbox)
+        test.assertEqual(a.motion_bbox, b.motion_bbox)
+        _assert_same_tree(test, a.left, b.left)
+        _assert_same_tree(test, a.right, b.right)
+    else:
+        test.assertIs(a, b)
+
+
+class TestBvhBuilder(TestCase):
+
+    def test_array_build_matches_serial_build(self):
+        world = _random_world(301)
+        random.seed(9)
+        serial = BvhNode.from_hittable_list(_copy_list(world), 0.0, 1.0)
+        random.seed(9)
+        built = build_bvh_parallel(_copy_list(world), 0.0, 1.0)
+        _assert_same_tree(self, serial, built)
+
+    def test_parallel_build_matches_serial_build(self):
+        world = _random_world(400)
+        random.seed(4)
+        serial = BvhNode.from_hittable_list(_copy_list(world), 0.0, 1.0)
+        random.seed(4)
+        built = build_bvh_parallel(_copy_list(world), 0.0, 1.0, workers=2, parallel_threshold=50)
+        _assert_same_tree(self, serial, built)
+
+    def test_lbvh_contains_every_hittable_once(self):
+        world = _random_world(257)
+        root = build_lbvh(_copy_list(world), 0.0, 1.0)
+        leaves = root.leaves()
+        self.assertEqual(len(leaves), len(world.objects))
+        self.assertEqual({id(hittable) for hittable in leaves}, {id(hittable) for hittable in world.objects})
+
+    def test_lbvh_hits_match_hittable_list(self):
+        world = _random_world(200)
+        root = build_lbvh(_copy_list(world), 0.0, 1.0)
+        random.seed(3)
+        for _ in range(200):
+            ray = Ray(Point3.random_range(-60.0, 60.0), Vec3.random_unit_vector(), random.random())
+            expected = world.hit(ray, 0.001, float("inf"))
+            actual = root.hit(ray, 0.001, float("inf"))
+            self.assertEqual(expected is None, actual is None)
+            if expected:
+                self.assertAlmostEqual(expected.t, actual.t)
+
+    def test_lbvh_of_single_hittable(self):
+        world = _random_world(1)
+        root = build_lbvh(world, 0.0, 1.0)
+        self.assertIs(root.left, world.objects[0])
+        self.assertIs(root.right, world.objects[0])
+
+    def test_morton_codes_interleave_axes(self):
+        points = np.array([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+        codes = morton_codes(points)
+        # a point at the max of z sets every third bit, starting from the lowest
+        z_max = sum(1 << (3 * bit) for bit in range(MORTON_BITS))
+        self.assertEqual(codes.tolist(), [0, z_max << 2, z_max << 1, z_max])
@@ -0,0 +1,109 @@
+import random
+from unittest import TestCase
+
+from common import Point3, Vec3, Ray, content_hash
+from hittables import HittableList, RotateY
+from hittables.bvh_node import BvhNode
+from hittables.primitives import Sphere, MovingSphere
+from materials import Lambertian
+
+
+class TestBvhNode(TestCase):
+
+    def setUp(self):
+        mat = Lambertian.from_color(0.5, 0.5, 0.5)
+        self.world = HittableList()
+        self.world.add(MovingSphere(Point3(0.0, 0.0, 0.0), Point3(10.0, 0.0, 0.0), 0.0, 1.0, 1.0, mat))
+        self.world.add(Sphere(Point3(0.0, 5.0, 0.0), 1.0, mat))
+
+    def test_nodes_with_moving_hittables_store_motion_bounds(self):
+        bvh = BvhNode.from_hittable_list(self.world, 0.0, 1.0)
+        self.assertIsNotNone(bvh.motion_bbox)
+        self.assertEqual(bvh.bbox_at(0.0).max.x, 1.0)
+        self.assertEqual(bvh.bbox_at(1.0).min.x, -1.0)
+        self.assertEqual(bvh.bbox_at(1.0).max.x, 11.0)
+        self.assertEqual(bvh.bounding_box(0.0, 1.0), bvh.bbox)
+
+    def test_static_nodes_do_not_store_motion_bounds(self):
+        mat = Lambertian.from_color(0.5, 0.5, 0.5)
+        world = HittableList()
+        world.add(Sphere(Point3(0.0, 0.0, 0.0), 1.0, mat))
+        world.add(Sphere(Point3(0.0, 5.0, 0.0), 1.0, mat))
+        bvh = BvhNode.from_hittable_list(world, 0.0, 1.0)
+        self.assertIsNone(bvh.motion_bbox)
+
+    def test_ray_misses_the_interpolated_box_of_a_moving_sphere(self):
+        bvh = BvhNode.from_hittable_list(self.world, 0.0, 1.0)
+        # at time 0.0 the moving sphere is at x=0, at time 1.0 it's at x=10
+        ray_t0 = Ray(Point3(10.0, 0.01, -10.0), Vec3(0.001, 0.001, 1.0), 0.0)
+        ray_t1 = Ray(Point3(10.0, 0.01, -10.0), Vec3(0.001, 0.001, 1.0), 1.0)
+        self.assertIsNone(bvh.hit(ray_t0, 0.001, float("inf")))
+        self.assertIsNotNone(bvh.hit(ray_t1, 0.001, float("inf")))
+        self.assertFalse(bvh.occluded(ray_t0, 0.001, float("inf")))
+        self.assertTrue(bvh.occluded(ray_t1, 0.001, float("inf")))
+
+    def test_refit_updates_bounds_after_hittables_move(self):
+        bvh = BvhNode.from_hittable_list(self.world, 0.0, 1.0)
+        sphere = next(h for h in bvh.leaves() if isinstance(h, Sphere))
+        sphere.center = Point3(0.0, 50.0, 0.0)
+        bvh.refit(0.0, 1.0)
+        self.assertEqual(bvh.bbox.max.y, 51.0)
+
+    def test_refit_updates_the_bounds_of_rotated_hittables(self):
+        mat = Lambertian.from_color(0.5, 0.5, 0.5)
+        sphere = Sphere(Point3(0.0, 0.0, 0.0), 1.0, mat)
+        rotated = RotateY.from_hittable(sphere, 45.0)
+        world = HittableList()
+        world.add(rotated)
+        world.add(Sphere(Point3(0.0, 5.0, 0.0), 1.0, mat))
+        bvh = BvhNode.from_hittable_list(world, 0.0, 1.0)
+        sphere.center = Point3(0.0, -50.0, 0.0)
+        bvh.refit(0.0, 1.0)
+        self.assertEqual(bvh.bbox.min.y, -51.0)
+        ray = Ray(Point3(0.0, -50.0, -10.0), Vec3(0.0, 0.0, 1.0), 0.0)
+        self.assertIsNotNone(rotated.hit(ray, 0.001, float("inf")))
+        self.assertAlmostEqual(rotated.hit(ray, 0.001, float("inf")).t, bvh.hit(ray, 0.001, float("inf")).t)
+
+    def test_leaves_returns_each_hittable_once(self):
+        bvh = BvhNode.from_hittable_list(self.world, 0.0, 1.0)
+        self.assertEqual(len(bvh.leaves()), 2)
+
+    def test_refit_or_rebuild_keeps_the_tree_for_small_motion(self):
+        world = self._sphere_grid()
+        bvh = BvhNode.from_hittable_list(world, 0.0, 1.0)
+        for sphere in world.objects:
+            sphere.center = sphere.center + Vec3(0.1, 0.0, 0.0)
+        self.assertIs(bvh.refit_or_rebuild(0.0, 1.0), bvh)
+
+    def test_refit_or_rebuild_rebuilds_a_degraded_tree(self):
+        world = self._sphere_grid()
+        bvh = BvhNode.from_hittable_list(world, 0.0, 1.0)
+        # reverse the positions of all spheres, so that every node now spans the whole scene
+        centers = [sphere.center for sphere in bvh.leaves()]
+        for sphere, center in zip(bvh.leaves(), reversed(centers[1:] + centers[:1])):
+            sphere.center = center
+        rebuilt = bvh.refit_or_rebuild(0.0, 1.0)
+        self.assertIsNot(rebuilt, bvh)
+        self.assertLess(rebuilt.surface_area_cost(), bvh.surface_area_cost())
+        self.assertEqual(len(rebuilt.leaves()), len(world.objects))
+
+    def test_seeded_rebuilds_are_reproducible(self):
+        rebuilt = []
+        for _ in range(2):
+            world = self._sphere_grid()
+            bvh = BvhNode.from_hittable_list(world, 0.0, 1.0, rng=random.Random(2))
+            centers = [sphere.center for sphere in bvh.leaves()]
+            for sphere, center in zip(bvh.leaves(), reversed(centers[1:] + centers[:1])):
+                sphere.center = center
+            rebuilt.append(bvh.refit_or_rebuild(0.0, 1.0, rng=random.Random(3)))
+        self.assertIsNot(rebuilt[0], bvh)
+        self.assertEqual(content_hash(rebuilt[0]), content_hash(rebuilt[1]))
+
+    @staticmethod
+    def _sphere_grid() -> HittableList:
+        mat = Lambertian.from_color(0.5, 0.5, 0.5)
+        world = HittableList()
+        for i in range(8):
+            for j in range(8):
+                world.add(Sphere(Point3(float(i) * 3.0, 0.0, float(j) * 3.0), 1.0, mat))
+        return world
@@ -1,8 +1,10 @@
 from unittest import TestCase
 
+import numpy as np
+
 import common
 from common import CameraBuilder
-from common import Vec3, Point3
+from common import Vec3, Point3, rng
 
 
 class TestCamera(TestCase):
@@ -21,3 +23,39 @@ class TestCamera(TestCase):
             .open_close_time(0.0, 1.0) \
             .build()
         self.assertIsNotNone(camera)
+
+    def _camera(self, aperture: float, close_time: float):
+        return CameraBuilder() \
+            .look_from(Point3(13.0, 2.0, 3.0)) \
+            .look_at(Point3(0.0, 0.0, 0.0)) \
+            .up_direction(Vec3(0.0, 1.0, 0.0)) \
+            .vertical_field_of_view(25.0) \
+            .aspect_ratio(1.5) \
+            .image_width(60) \
+            .aperture(aperture) \
+            .focus_distance(10.0) \
+            .open_close_time(0.0, close_time) \
+            .build()
+
+    def test_get_rays_matches_get_ray(self):
+        gen = np.random.default_rng(1)
+        s, t = gen.random(50), gen.random(50)
+        lens, shutter = gen.random((50, 2)), gen.random(50)
+        for aperture, close_time in ((0.0, 0.0), (0.0, 1.0), (0.5, 0.0), (0.5, 1.0)):
+            camera = self._camera(aperture, close_time)
+            origins, directions, times = camera.get_rays(s, t, lens, shutter)
+            for i in range(50):
+                # get_ray() draws the lens point and the time from the selected stream
+                dims = [lens[i][0], lens[i][1], shutter[i]]
+                rng.select_stream(0, prefix=lambda dimension: dims[dimension], prefix_dimensions=3)
+                ray = camera.get_ray(s[i], t[i])
+                np.testing.assert_allclose(ray.orig.to_tuple(), origins[i], rtol=1e-12)
+                np.testing.assert_allclose(ray.dir.to_tuple(), directions[i], rtol=1e-12)
+                self.assertAlmostEqual(ray.time, times[i], places=12)
+
+    def test_pinhole_and_instant_shutter_need_no_random_numbers(self):
+        camera = self._camera(0.0, 0.0)
+        origins, directions, times = camera.get_rays(np.array([0.0, 1.0]), np.array([0.5, 0.5]))
+        np.testing.assert_array_equal([camera.look_from.to_tuple()] * 2, origins)
+        np.testing.assert_array_equal([0.0, 0.0], times)
+        self.assertNotEqual(directions[0].tolist(), directions[1].tolist())
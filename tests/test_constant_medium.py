@@ -0,0 +1,38 @@
+from unittest import TestCase
+
+from common import Point3, Vec3, Ray, ColorRgb
+from hittables.primitives import Sphere
+from hittables.volumes import ConstantMedium
+from materials import Lambertian
+from textures import SolidColor, Texture
+from textures.checker_texture import CheckerTexture
+
+
+class _UTexture(Texture):
+    """
+    a texture mapped by u, like an image texture
+    """
+
+    def value(self, u: float, v: float, p: Point3) -> ColorRgb:
+        return ColorRgb(u, u, u)
+
+
+class TestConstantMedium(TestCase):
+
+    def setUp(self):
+        self.boundary = Sphere(Point3(0.0, 0.0, 0.0), 1.0, Lambertian.from_color(0.5, 0.5, 0.5))
+        self.ray = Ray(Point3(0.3, 0.2, -5.0), Vec3(0.0, 0.0, 1.0), 0.0)
+
+    def test_uv_mapped_textures_get_the_entry_point_uv(self):
+        entry = self.boundary.hit(self.ray, float("-inf"), float("inf"))
+        for texture in (_UTexture(), CheckerTexture(SolidColor.from_rgb(0.0, 0.0, 0.0), _UTexture())):
+            medium = ConstantMedium.from_density(self.boundary, 1000.0, texture)
+            rec = medium.hit(self.ray, 0.001, float("inf"))
+            self.assertAlmostEqual(entry.u, rec.u)
+            self.assertAlmostEqual(entry.v, rec.v)
+
+    def test_solid_textures_skip_the_uv(self):
+        medium = ConstantMedium.from_density(self.boundary, 1000.0, SolidColor.from_rgb(1.0, 1.0, 1.0))
+        rec = medium.hit(self.ray, 0.001, float("inf"))
+        self.assertGreater(rec.t, 4.0)
+        self.assertEqual((0.0, 0.0), (rec.u, rec.v))
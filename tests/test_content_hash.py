@@ -0,0 +1,42 @@
+from unittest import TestCase
+
+import numpy as np
+
+from common import content_hash, Point3, Vec3, Ray
+from hittables import HittableList
+from hittables.primitives import Sphere
+from materials import Lambertian
+
+
+class TestContentHash(TestCase):
+
+    def test_equal_contents_have_equal_hashes(self):
+        first = Sphere(Point3(1.0, 2.0, 3.0), 0.5, Lambertian.from_color(0.1, 0.2, 0.3))
+        second = Sphere(Point3(1.0, 2.0, 3.0), 0.5, Lambertian.from_color(0.1, 0.2, 0.3))
+        self.assertEqual(content_hash(first), content_hash(second))
+        self.assertEqual(64, len(content_hash(first)))
+
+    def test_different_contents_have_different_hashes(self):
+        sphere = Sphere(Point3(1.0, 2.0, 3.0), 0.5, Lambertian.from_color(0.1, 0.2, 0.3))
+        hashes = {
+            content_hash(sphere),
+            content_hash(Sphere(Point3(1.0, 2.0, 3.0), 0.5 + 1e-15, Lambertian.from_color(0.1, 0.2, 0.3))),
+            content_hash(Sphere(Point3(1.0, 2.0, 3.0), 0.5, Lambertian.from_color(0.1, 0.2, 0.4))),
+            content_hash(sphere, sphere),
+            content_hash([1, 2]),
+            content_hash([2, 1]),
+            content_hash(np.zeros(3)),
+            content_hash(np.zeros(4)),
+        }
+        self.assertEqual(8, len(hashes))
+
+    def test_cached_data_is_not_hashed(self):
+        hit_list = HittableList()
+        for i in range(20):
+            center = Point3(float(i % 5) - 2.0, float(i // 5) - 2.0, 0.0)
+            hit_list.add(Sphere(center, 0.4, Lambertian.from_color(0.5, 0.5, 0.5)))
+        before = content_hash(hit_list)
+        # the first ray builds the list's bounds and acceleration structure
+        hit_list.hit(Ray(Point3(0.0, 0.0, -10.0), Vec3(0.0, 0.0, 1.0)), 0.001, float("inf"))
+        self.assertIsNotNone(hit_list._accel)
+        self.assertEqual(before, content_hash(hit_list))
@@ -0,0 +1,78 @@
+import os
+import random
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from renderer import MultiprocessRenderer
+from renderer.denoiser import denoise, save_buffers, load_buffers, denoise_buffers
+from scenes import build_scene_random_spheres
+
+
+def _noisy_halves(seed: int = 0):
+    """
+    an image, of linear colors, whose left half faces +x and is gray, and whose right half faces +y and is white,
+    with noise
+    """
+    gen = np.random.default_rng(seed)
+    linear = np.full((32, 32, 3), 0.25)
+    linear[:, 16:] = 0.64
+    colors = linear * gen.uniform(0.5, 1.5, (32, 32, 1))
+    albedo = np.full((32, 32, 3), 0.5)
+    albedo[:, 16:] = 1.0
+    normals = np.zeros((32, 32, 3))
+    normals[:, :16, 0] = 1.0
+    normals[:, 16:, 1] = 1.0
+    return colors, albedo, normals
+
+
+class TestDenoiser(TestCase):
+
+    def test_constant_image_is_unchanged(self):
+        colors = np.full((20, 30, 3), 0.25)
+        albedo = np.full((20, 30, 3), 0.7)
+        normals = np.zeros((20, 30, 3))
+        normals[..., 2] = 1.0
+        np.testing.assert_allclose(colors, denoise(colors, albedo, normals))
+
+    def test_noise_is_reduced_and_edges_are_kept(self):
+        colors, albedo, normals = _noisy_halves()
+        denoised = denoise(colors, albedo, normals)
+        self.assertEqual(colors.shape, denoised.shape)
+        for half in (np.s_[:, :16], np.s_[:, 16:]):
+            self.assertLess(denoised[half].std(), colors[half].std() / 4.0)
+        # the halves don't bleed into each other
+        self.assertAlmostEqual(0.25, denoised[:, 15].mean(), delta=0.03)
+        self.assertAlmostEqual(0.64, denoised[:, 16].mean(), delta=0.05)
+
+    def test_bright_pixels_are_not_clamped(self):
+        colors, albedo, normals = _noisy_halves()
+        colors *= 4.0
+        denoised = denoise(colors, albedo, normals)
+        # the white half is brighter than the display range, its energy is kept
+        self.assertAlmostEqual(2.56, denoised[:, 16:].mean(), delta=0.2)
+
+    def test_saved_buffers_are_denoised(self):
+        colors, albedo, normals = _noisy_halves()
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "buffers")
+            save_buffers(filename, colors, albedo, normals)
+            for saved, buffer in zip(load_buffers(filename + ".npz"), (colors, albedo, normals)):
+                np.testing.assert_array_equal(buffer, saved)
+            np.testing.assert_array_equal(denoise(colors, albedo, normals, iterations=3),
+                                          denoise_buffers(filename + ".npz", iterations=3))
+
+    def test_feature_rows_have_the_same_colors(self):
+        camera, world, background = build_scene_random_spheres(40, 1.0, random.Random(5))
+        renderer = MultiprocessRenderer(background, 5, 2, 1, seed=9)
+        bvh = renderer.build_accelerator(world)
+        _, colors = renderer.render_scanline(20, bvh, camera)
+        row, feature_colors, albedo, normals = renderer.render_scanline(20, bvh, camera, features=True)
+        self.assertEqual(20, row)
+        np.testing.assert_array_equal(colors, feature_colors)
+        self.assertEqual((camera.image_width, 3), albedo.shape)
+        self.assertTrue(np.all((albedo >= 0.0) & (albedo <= 1.0)))
+        self.assertTrue(np.all(np.linalg.norm(normals, axis=1) <= 1.0 + 1e-9))
+        # the row looks at the spheres, so some of its rays hit something
+        self.assertTrue(np.any(np.linalg.norm(normals, axis=1) > 0.5))
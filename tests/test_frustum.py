@@ -0,0 +1,68 @@
+import dataclasses
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from hittables import Aabb
+from renderer import MultiprocessRenderer
+from renderer.frustum import pixels_missing_box
+from scenes import build_earth_scene, build_scene_cornell_box_with_two_boxes
+from tests.test_gbuffer import _CountingHittable
+
+
+class TestFrustum(TestCase):
+
+    def test_missing_pixels_have_no_rays_hitting_the_box(self):
+        camera, world, _ = build_earth_scene(60, 1.5)
+        box = world.bounding_box(camera.open_time, camera.close_time)
+        gen = random.Random(3)
+        missing_count = 0
+        for row in range(0, camera.image_height, 4):
+            missing = pixels_missing_box(camera, row, box)
+            missing_count += missing.sum()
+            for col in range(camera.image_width):
+                hits = 0
+                for _ in range(20):
+                    u = (col + gen.random()) / (camera.image_width - 1)
+                    v = (row + gen.random()) / (camera.image_height - 1)
+                    if box.hit(camera.get_ray(u, v), 0.001, float("inf")):
+                        hits += 1
+                if missing[col]:
+                    self.assertEqual(0, hits)
+                elif u > 0.4 and u < 0.6 and v > 0.4 and v < 0.6:
+                    # the earth is in the center of the image
+                    self.assertGreater(hits, 0)
+        self.assertGreater(missing_count, 0)
+
+    def test_boxes_around_the_camera_are_never_missed(self):
+        camera, _, _ = build_earth_scene(60, 1.5)
+        box = Aabb(camera.look_from - camera.horizontal, camera.look_from + camera.horizontal + camera.vertical)
+        self.assertFalse(pixels_missing_box(camera, 0, box).any())
+
+    def test_lens_cameras_have_no_missing_pixels(self):
+        camera, world, _ = build_earth_scene(60, 1.5)
+        camera = dataclasses.replace(camera, lens_radius=0.1)
+        self.assertFalse(pixels_missing_box(camera, 0, world.bounding_box(0.0, 1.0)).any())
+
+    def test_background_rows_are_not_traced(self):
+        camera, world, background = build_earth_scene(60, 1.5)
+        renderer = MultiprocessRenderer(background, 5, 16, 1, seed=2)
+        bvh = _CountingHittable(renderer.build_accelerator(world))
+        _, fast = renderer.render_scanline(0, bvh, camera)
+        self.assertEqual(0, bvh.hits)
+        _, traced = dataclasses.replace(renderer, background_fast_path=False).render_scanline(0, bvh, camera)
+        self.assertGreater(bvh.hits, 0)
+        # the background is smooth, the fixed sub-pixel positions give about the same colors
+        np.testing.assert_allclose(MultiprocessRenderer.post_process(traced, 16),
+                                   MultiprocessRenderer.post_process(fast, 16), atol=0.5)
+
+    def test_solid_backgrounds_are_filled(self):
+        camera, world, background = build_scene_cornell_box_with_two_boxes(40, 1.0)
+        renderer = MultiprocessRenderer(background, 5, 4, 1, seed=2)
+        bvh = renderer.build_accelerator(world)
+        missing = pixels_missing_box(camera, 20, world.bounding_box(0.0, 1.0))
+        _, colors = renderer.render_scanline(20, bvh, camera)
+        _, traced = dataclasses.replace(renderer, background_fast_path=False).render_scanline(20, bvh, camera)
+        np.testing.assert_array_equal(traced[missing], colors[missing])
+        np.testing.assert_array_equal(traced[~missing], colors[~missing])
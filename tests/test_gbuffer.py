@@ -0,0 +1,99 @@
+import dataclasses
+import random
+from typing import Optional
+from unittest import TestCase
+
+import numpy as np
+
+from common import Ray, Point3, Vec3
+from hittables import Hittable, HitRecord, Aabb, HittableList
+from hittables.bvh_node import BvhNode
+from hittables.primitives import Sphere, MovingSphere
+from hittables.translate import Translate
+from materials import Lambertian
+from renderer import MultiprocessRenderer
+from scenes import build_scene_cornell_box_with_two_boxes, build_scene_cornell_smoke_boxes, \
+    build_scene_random_spheres, SceneLoader
+from tests.test_ray_packet import NESTED_SMOKE_OBJECTS
+
+
+class _CountingHittable(Hittable):
+    """
+    counts the calls to the hit() of the hittable it wraps
+    """
+
+    def __init__(self, hittable: Hittable):
+        self.hittable = hittable
+        self.hits = 0
+
+    def hit(self, r: Ray, t_min: float, t_max: float) -> Optional[HitRecord]:
+        self.hits += 1
+        return self.hittable.hit(r, t_min, t_max)
+
+    def bounding_box(self, t0: float, t1: float) -> Optional[Aabb]:
+        return self.hittable.bounding_box(t0, t1)
+
+
+class TestGBuffer(TestCase):
+
+    def test_cacheable_scenes(self):
+        camera, world, _ = build_scene_cornell_box_with_two_boxes(40, 1.0)
+        self.assertTrue(MultiprocessRenderer.primary_hits_cacheable(camera, world))
+        # a lens blurs the primary rays
+        self.assertFalse(MultiprocessRenderer.primary_hits_cacheable(dataclasses.replace(camera, lens_radius=0.1),
+                                                                     world))
+        # the smoke's hits are random
+        camera, world, _ = build_scene_cornell_smoke_boxes(40, 1.0)
+        self.assertFalse(MultiprocessRenderer.primary_hits_cacheable(camera, world))
+        # the small spheres move while the shutter is open
+        camera, world, _ = build_scene_random_spheres(40, 1.0, random.Random(5))
+        self.assertFalse(MultiprocessRenderer.primary_hits_cacheable(camera, world))
+        self.assertTrue(MultiprocessRenderer.primary_hits_cacheable(
+            dataclasses.replace(camera, close_time=camera.open_time), world))
+
+    def test_nested_smoke_is_not_cacheable(self):
+        for objects in NESTED_SMOKE_OBJECTS:
+            description = {"camera": {"look_from": [0.0, 0.0, -10.0], "look_at": [0.0, 0.0, 0.0],
+                                      "vertical_fov": 40.0},
+                           "background": [0.7, 0.8, 1.0], "objects": objects}
+            camera, world, _ = SceneLoader().load(description, 20, 1.0)
+            self.assertFalse(MultiprocessRenderer.primary_hits_cacheable(camera, world))
+
+    def test_nested_motion_is_not_cacheable(self):
+        camera, _, _ = build_scene_cornell_box_with_two_boxes(40, 1.0)
+        material = Lambertian.from_color(0.5, 0.5, 0.5)
+        # the moving sphere stays inside the box of the large sphere, the group's box doesn't change
+        moving = MovingSphere(Point3(0.0, 0.0, 0.0), Point3(1.0, 0.0, 0.0), 0.0, 1.0, 0.5, material)
+        group = HittableList()
+        group.extend([Sphere(Point3(0.0, 0.0, 0.0), 10.0, material), moving])
+        static = HittableList()
+        static.add(Sphere(Point3(0.0, 0.0, 0.0), 10.0, material))
+        for nested in (group, Translate(group, Vec3(1.0, 2.0, 3.0)),
+                       BvhNode.from_hittable_list(group, 0.0, 1.0, motion_bounds=False)):
+            world = HittableList()
+            world.add(nested)
+            self.assertFalse(MultiprocessRenderer.primary_hits_cacheable(camera, world))
+        self.assertTrue(MultiprocessRenderer.primary_hits_cacheable(camera, static))
+
+    def test_a_position_per_sample_renders_the_same_row(self):
+        camera, world, background = build_scene_cornell_box_with_two_boxes(40, 1.0)
+        renderer = MultiprocessRenderer(background, 5, 4, 1, seed=3)
+        bvh = renderer.build_accelerator(world)
+        _, expected = renderer.render_scanline(20, bvh, camera)
+        cached = dataclasses.replace(renderer, gbuffer_positions=4)
+        _, colors = cached.render_scanline(20, bvh, camera, gbuffer=True)
+        np.testing.assert_array_equal(expected, colors)
+
+    def test_cached_positions_are_traced_once(self):
+        camera, world, background = build_scene_cornell_box_with_two_boxes(40, 1.0)
+        renderer = MultiprocessRenderer(background, 1, 8, 1, seed=3, background_fast_path=False)
+        bvh = _CountingHittable(renderer.build_accelerator(world))
+        renderer.render_scanline(20, bvh, camera)
+        self.assertEqual(8 * camera.image_width, bvh.hits)
+
+        bvh.hits = 0
+        cached = dataclasses.replace(renderer, gbuffer_positions=2)
+        _, colors = cached.render_scanline(20, bvh, camera, gbuffer=True)
+        # with a bounce depth of 1 only the primary rays are traced
+        self.assertEqual(2 * camera.image_width, bvh.hits)
+        self.assertTrue(np.all(np.isfinite(colors)))
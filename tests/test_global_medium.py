@@ -0,0 +1,30 @@
+from unittest import TestCase
+
+from common import Point3, Vec3, Ray
+from hittables.volumes import GlobalMedium
+from textures import SolidColor
+
+
+class TestGlobalMedium(TestCase):
+
+    def test_has_no_bounding_box(self):
+        medium = GlobalMedium.from_density(0.01, SolidColor.from_rgb(1.0, 1.0, 1.0))
+        self.assertIsNone(medium.bounding_box(0.0, 1.0))
+
+    def test_never_scatters_beyond_the_closest_hit(self):
+        medium = GlobalMedium.from_density(0.01, SolidColor.from_rgb(1.0, 1.0, 1.0))
+        ray = Ray(Point3(0.0, 0.0, 0.0), Vec3(0.0, 0.0, -1.0), 0.0)
+        for _ in range(200):
+            rec = medium.hit(ray, 0.001, 5.0)
+            if rec:
+                self.assertLess(rec.t, 5.0)
+
+    def test_dense_medium_scatters_before_a_distant_hit(self):
+        medium = GlobalMedium.from_density(1000.0, SolidColor.from_rgb(1.0, 1.0, 1.0))
+        ray = Ray(Point3(0.0, 0.0, 0.0), Vec3(0.0, 0.0, -1.0), 0.0)
+        self.assertIsNotNone(medium.hit(ray, 0.001, 100.0))
+
+    def test_rays_leave_the_medium_after_its_extent(self):
+        medium = GlobalMedium.from_density(1e-9, SolidColor.from_rgb(1.0, 1.0, 1.0), 10.0)
+        ray = Ray(Point3(0.0, 0.0, 0.0), Vec3(0.0, 0.0, -1.0), 0.0)
+        self.assertIsNone(medium.hit(ray, 0.001, float("inf")))
@@ -0,0 +1,100 @@
+import pickle
+import random
+from unittest import TestCase
+
+from common import Point3, Vec3, Ray
+from hittables import HittableList
+from hittables.translate import Translate
+from hittables.bvh_node import BvhNode
+from hittables.primitives import Sphere
+from hittables.volumes import GlobalMedium
+from materials import Lambertian
+from renderer import MultiprocessRenderer
+from textures import SolidColor
+
+
+def _spheres(hit_list: HittableList, count: int) -> HittableList:
+    mat = Lambertian.from_color(0.5, 0.5, 0.5)
+    for _ in range(count):
+        hit_list.add(Sphere(Point3.random_range(-10.0, 10.0), 0.5, mat))
+    return hit_list
+
+
+class TestHittableList(TestCase):
+
+    def setUp(self):
+        random.seed(3)
+
+    def test_acceleration_structure_is_built_on_first_ray(self):
+        hit_list = _spheres(HittableList(accel_threshold=8), 20)
+        self.assertIsNone(hit_list._accel)
+        hit_list.hit(Ray(Point3(0.0, 0.0, 20.0), Vec3(0.01, 0.01, -1.0)), 0.001, float("inf"))
+        self.assertIsInstance(hit_list._accel, BvhNode)
+
+    def test_nested_lists_are_prepared_with_the_accelerator(self):
+        nested = _spheres(HittableList(accel_threshold=8), 20)
+        world = HittableList()
+        world.add(Translate(nested, Vec3(0.0, 30.0, 0.0)))
+        world.add(Sphere(Point3(0.0, 0.0, 0.0), 1.0, Lambertian.from_color(0.5, 0.5, 0.5)))
+        bvh = MultiprocessRenderer(None, 5, 1, 1, seed=1).build_accelerator(world)
+        self.assertIsInstance(nested._accel, BvhNode)
+        # the render workers receive the built structure
+        unpickled = pickle.loads(pickle.dumps(bvh))
+        translate = next(hittable for hittable in unpickled.children() if isinstance(hittable, Translate))
+        self.assertTrue(translate.hittable._prepared)
+        self.assertIsInstance(translate.hittable._accel, BvhNode)
+
+    def test_short_list_only_caches_bounds(self):
+        hit_list = _spheres(HittableList(accel_threshold=8), 8)
+        hit_list.occluded(Ray(Point3(0.0, 0.0, 20.0), Vec3(0.01, 0.01, -1.0)), 0.001, float("inf"))
+        self.assertIsNone(hit_list._accel)
+        self.assertEqual(hit_list._bounds, hit_list.bounding_box(0.0, 1.0))
+
+    def test_add_and_clear_invalidate(self):
+        hit_list = _spheres(HittableList(accel_threshold=8), 20)
+        ray = Ray(Point3(0.0, 0.0, 50.0), Vec3(0.0, 0.0, -1.0))
+        hit_list.hit(ray, 0.001, float("inf"))
+
+        # a sphere in the path of the ray, in front of everything else
+        hit_list.add(Sphere(Point3(0.0, 0.0, 40.0), 1.0, Lambertian.from_color(0.1, 0.1, 0.1)))
+        self.assertIsNone(hit_list._accel)
+        self.assertAlmostEqual(hit_list.hit(ray, 0.001, float("inf")).t, 9.0)
+
+        hit_list.clear()
+        self.assertIsNone(hit_list.hit(ray, 0.001, float("inf")))
+
+    def test_accelerated_hits_match_linear_scan(self):
+        accelerated = _spheres(HittableList(accel_threshold=8), 100)
+        scanned = HittableList(accel_threshold=None)
+        for hittable in accelerated.objects:
+            scanned.add(hittable)
+        for _ in range(300):
+            ray = Ray(Point3.random_range(-15.0, 15.0), Vec3.random_unit_vector(), random.random())
+            expected = scanned.hit(ray, 0.001, float("inf"))
+            actual = accelerated.hit(ray, 0.001, float("inf"))
+            self.assertEqual(expected is None, actual is None)
+            if expected:
+                self.assertAlmostEqual(expected.t, actual.t)
+            self.assertEqual(expected is not None, accelerated.occluded(ray, 0.001, float("inf")))
+
+    def test_unbounded_hittable_disables_prefilter(self):
+        hit_list = _spheres(HittableList(accel_threshold=8), 20)
+        hit_list.add(GlobalMedium.from_density(1.0, SolidColor.from_rgb(1.0, 1.0, 1.0)))
+        # the ray misses every sphere but still scatters inside the medium
+        ray = Ray(Point3(0.0, 100.0, 0.0), Vec3(0.0, 1.0, 0.0))
+        self.assertIsNotNone(hit_list.hit(ray, 0.001, float("inf")))
+        self.assertIsNone(hit_list._accel)
+
+    def test_bounding_box_is_cached_until_invalidated(self):
+        hit_list = _spheres(HittableList(), 5)
+        aabb = hit_list.bounding_box(0.0, 1.0)
+        self.assertIs(hit_list.bounding_box(0.0, 1.0), aabb)
+
+        hit_list.objects[0].center = Point3(100.0, 0.0, 0.0)
+        self.assertIs(hit_list.bounding_box(0.0, 1.0), aabb)
+        hit_list.invalidate_bounds()
+        moved = hit_list.bounding_box(0.0, 1.0)
+        self.assertAlmostEqual(moved.max.x, 100.5)
+
+        hit_list.add(Sphere(Point3(0.0, 200.0, 0.0), 1.0, hit_list.objects[0].material))
+        self.assertAlmostEqual(hit_list.bounding_box(0.0, 1.0).max.y, 201.0)
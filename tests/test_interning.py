@@ -0,0 +1,69 @@
+from unittest import TestCase
+
+from common import ColorRgb, InternRegistry
+from materials import Lambertian, Metal
+from scenes import build_scene_final, build_scene_cornell_box_with_two_boxes, scene_builder
+from textures import SolidColor, NoiseTexture
+from textures.checker_texture import CheckerTexture
+
+
+class TestInternRegistry(TestCase):
+
+    def setUp(self):
+        self.registry = InternRegistry()
+
+    def test_equal_values_are_shared(self):
+        first = self.registry.intern(Lambertian(SolidColor(ColorRgb(0.5, 0.5, 0.5))))
+        second = self.registry.intern(Lambertian(SolidColor(ColorRgb(0.5, 0.5, 0.5))))
+        self.assertIs(first, second)
+        self.assertEqual(1, len(self.registry))
+
+    def test_different_values_are_not_shared(self):
+        materials = [
+            Lambertian(SolidColor(ColorRgb(0.5, 0.5, 0.5))),
+            Lambertian(SolidColor(ColorRgb(0.5, 0.5, 0.6))),
+            Metal(ColorRgb(0.5, 0.5, 0.5), 0.0),
+            Lambertian(CheckerTexture(SolidColor(ColorRgb(0.5, 0.5, 0.5)), SolidColor(ColorRgb()))),
+            Lambertian(CheckerTexture(SolidColor(ColorRgb()), SolidColor(ColorRgb(0.5, 0.5, 0.5)))),
+        ]
+        interned = [self.registry.intern(material) for material in materials]
+        self.assertEqual([id(material) for material in materials], [id(material) for material in interned])
+
+    def test_noise_textures_with_different_noise_are_not_shared(self):
+        noise = NoiseTexture(0.5)
+        self.assertIs(noise, self.registry.intern(noise))
+        self.assertIsNot(noise, self.registry.intern(NoiseTexture(0.5)))
+
+    def test_final_scene_shares_the_sphere_materials(self):
+        _, world, _ = build_scene_final(100, 1.0)
+        # the box of 1000 spheres
+        spheres = world.objects[-1].hittable.hittable
+        materials = {id(hittable.material) for hittable in _leaves(spheres)}
+        self.assertEqual(1, len(materials))
+
+    def test_scenes_do_not_share_materials(self):
+        _, first, _ = build_scene_cornell_box_with_two_boxes(40, 1.0)
+        self.assertEqual(0, len(scene_builder.REGISTRY))
+        _, second, _ = build_scene_cornell_box_with_two_boxes(40, 1.0)
+        first_materials = _material_ids(first)
+        second_materials = _material_ids(second)
+        self.assertTrue(first_materials)
+        self.assertFalse(first_materials & second_materials)
+
+
+def _leaves(node):
+    if hasattr(node, "left"):
+        return _leaves(node.left) + _leaves(node.right)
+    return [node]
+
+
+def _material_ids(root):
+    ids = set()
+    stack = [root]
+    while stack:
+        hittable = stack.pop()
+        # a RectSet holds the materials of all its rects
+        ids.update(id(material) for material in getattr(hittable, "materials", [getattr(hittable, "material", None)])
+                   if material is not None)
+        stack.extend(hittable.children())
+    return ids
@@ -0,0 +1,30 @@
+import random
+from unittest import TestCase
+
+from common import Point3, Vec3, Ray
+import scenes
+from hittables.bvh_node import BvhNode
+
+
+class TestOccluded(TestCase):
+
+    def test_occluded_agrees_with_hit_in_the_cornell_box(self):
+        random.seed(3)
+        _, world, _ = scenes.build_scene_cornell_box_with_two_boxes(100, 1.0)
+        bvh = BvhNode.from_hittable_list(world, 0.0, 1.0)
+        for _ in range(300):
+            origin = Point3.random_range(50.0, 500.0)
+            ray = Ray(origin, Vec3.random_range(-1.0, 1.0), 0.0)
+            t_max = random.uniform(10.0, 600.0)
+            expected = bvh.hit(ray, 0.001, t_max) is not None
+            self.assertEqual(bvh.occluded(ray, 0.001, t_max), expected)
+            self.assertEqual(world.occluded(ray, 0.001, t_max), expected)
+
+    def test_occluded_agrees_with_hit_for_spheres(self):
+        random.seed(5)
+        _, world, _ = scenes.build_scene_random_spheres(100, 1.77)
+        bvh = BvhNode.from_hittable_list(world, 0.0, 1.0)
+        for _ in range(300):
+            ray = Ray(Point3.random_range(-10.0, 10.0), Vec3.random_range(-1.0, 1.0), random.random())
+            t_max = random.uniform(0.5, 20.0)
+            self.assertEqual(bvh.occluded(ray, 0.001, t_max), bvh.hit(ray, 0.001, t_max) is not None)
@@ -0,0 +1,34 @@
+import math
+import random
+from unittest import TestCase
+
+import numpy as np
+
+import common
+from renderer import MultiprocessRenderer
+from scenes import build_scene_cornell_box_with_two_boxes
+
+
+class TestPostProcess(TestCase):
+
+    def test_matches_the_per_pixel_conversion(self):
+        gen = random.Random(4)
+        sums = np.array([[gen.uniform(0.0, 20.0) for _ in range(3)] for _ in range(50)])
+        sums[0] = (0.0, 5.0, 1000.0)
+        expected = [[256.0 * common.clamp(math.sqrt(c / 5.0), 0.0, 0.999) for c in pixel] for pixel in sums]
+        np.testing.assert_allclose(expected, MultiprocessRenderer.post_process(sums, 5))
+        self.assertTrue(np.all(MultiprocessRenderer.post_process(sums, 5).astype(np.ubyte) <= 255))
+
+    def test_sums_of_renders_accumulate(self):
+        camera, world, background = build_scene_cornell_box_with_two_boxes(40, 1.0)
+        renderer = MultiprocessRenderer(background, 5, 4, 1, seed=3)
+        bvh = renderer.build_accelerator(world)
+        _, first = renderer.render_scanline(20, bvh, camera, seed=1)
+        _, second = renderer.render_scanline(20, bvh, camera, seed=2)
+        self.assertTrue(np.all(first >= 0.0))
+        accumulated = MultiprocessRenderer.post_process(first + second, 8)
+        # the pixels that only see the background have the same color however many samples they accumulate
+        background = np.all(first == second, axis=1)
+        self.assertTrue(background.any())
+        np.testing.assert_allclose(MultiprocessRenderer.post_process(first, 4)[background],
+                                   accumulated[background])
@@ -0,0 +1,95 @@
+import dataclasses
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from common import rng, Ray, Point3, Vec3
+from hittables.ray_packet import intersect_packet, hit_packet
+from renderer import MultiprocessRenderer
+from scenes import build_scene_random_spheres, build_scene_cornell_smoke_boxes, \
+    build_scene_cornell_box_with_two_boxes, SceneLoader
+
+GRAY = {"type": "lambertian", "albedo": [0.5, 0.5, 0.5]}
+# smoke wrapped in a transform, or nested in a group along with a sphere
+SMOKE = {"type": "constant_medium", "density": 0.5, "texture": [1.0, 1.0, 1.0],
+         "boundary": {"type": "sphere", "center": [0.0, 0.0, 0.0], "radius": 2.0, "material": GRAY}}
+NESTED_SMOKE_OBJECTS = [
+    [dict(SMOKE, translate=[0.0, 0.0, -3.0])],
+    [{"type": "group", "accelerator": "bvh", "objects": [
+        SMOKE, {"type": "sphere", "center": [3.0, 0.0, 0.0], "radius": 1.0, "material": GRAY}]}],
+]
+
+
+def _camera_rays(camera, row: int, samples: int):
+    rng.select_stream(3, row)
+    rays = []
+    for col in range(camera.image_width):
+        for _ in range(samples):
+            u = (col + rng.random()) / (camera.image_width - 1)
+            v = (row + rng.random()) / (camera.image_height - 1)
+            rays.append(camera.get_ray(u, v))
+    return rays
+
+
+class TestRayPacket(TestCase):
+
+    def test_packets_find_the_same_closest_hits(self):
+        camera, world, background = build_scene_random_spheres(40, 1.0, random.Random(5))
+        bvh = MultiprocessRenderer(background, 5, 1, 1, seed=1).build_accelerator(world)
+        for row in (0, 12, 20, 30):
+            rays = _camera_rays(camera, row, 2)
+            expected = [bvh.intersect(r, 0.001, float("inf")) for r in rays]
+            hits = intersect_packet(bvh, rays, 0.001, float("inf"))
+            self.assertEqual([h.t if h else None for h in expected], [h.t if h else None for h in hits])
+            self.assertEqual([h.hittable if h else None for h in expected], [h.hittable if h else None for h in hits])
+
+    def test_axis_parallel_rays(self):
+        camera, world, background = build_scene_random_spheres(40, 1.0, random.Random(5))
+        bvh = MultiprocessRenderer(background, 5, 1, 1, seed=1).build_accelerator(world)
+        rays = [Ray(Point3(x, 1.0, 20.0), Vec3(0.0, 0.0, -1.0), 0.0) for x in np.linspace(-10.0, 10.0, 40)]
+        rays += [Ray(Point3(x, 20.0, 0.5), Vec3(0.0, -1.0, 0.0), 0.5) for x in np.linspace(-10.0, 10.0, 40)]
+        expected = [bvh.hit(r, 0.001, float("inf")) for r in rays]
+        hits = hit_packet(bvh, rays, 0.001, float("inf"))
+        self.assertEqual([h.t if h else None for h in expected], [h.t if h else None for h in hits])
+        self.assertTrue(any(hits))
+
+    def test_other_roots_are_traced_ray_by_ray(self):
+        camera, world, _ = build_scene_cornell_box_with_two_boxes(20, 1.0)
+        rays = _camera_rays(camera, 10, 1)
+        expected = [world.hit(r, 0.001, float("inf")) for r in rays]
+        hits = hit_packet(world, rays, 0.001, float("inf"))
+        self.assertEqual([h.t if h else None for h in expected], [h.t if h else None for h in hits])
+
+    def test_rows_traced_with_packets_are_the_same(self):
+        camera, world, background = build_scene_random_spheres(40, 1.0, random.Random(5))
+        renderer = MultiprocessRenderer(background, 5, 4, 1, seed=9, sampler="sobol", gbuffer_positions=2)
+        bvh = renderer.build_accelerator(world)
+        for gbuffer in (False, True):
+            _, expected = renderer.render_scanline(20, bvh, camera, gbuffer=gbuffer)
+            for packet_size in (1, 16, 64):
+                packets = dataclasses.replace(renderer, packet_size=packet_size)
+                _, colors = packets.render_scanline(20, bvh, camera, gbuffer=gbuffer, packets=True)
+                np.testing.assert_array_equal(expected, colors)
+
+    def test_smoke_is_not_traced_as_packets(self):
+        _, world, _ = build_scene_cornell_smoke_boxes(20, 1.0)
+        self.assertFalse(MultiprocessRenderer.primary_hits_deterministic(world))
+        _, world, _ = build_scene_cornell_box_with_two_boxes(20, 1.0)
+        self.assertTrue(MultiprocessRenderer.primary_hits_deterministic(world))
+
+    def test_nested_smoke_is_not_traced_as_packets(self):
+        for objects in NESTED_SMOKE_OBJECTS:
+            description = {"camera": {"look_from": [0.0, 0.0, -10.0], "look_at": [0.0, 0.0, 0.0],
+                                      "vertical_fov": 40.0},
+                           "background": [0.7, 0.8, 1.0], "objects": objects}
+            camera, world, background = SceneLoader().load(description, 20, 1.0)
+            self.assertFalse(MultiprocessRenderer.primary_hits_deterministic(world))
+            # the packet size doesn't change the image, whether packets are used or not is decided by the world
+            images = []
+            for packet_size in (0, 64):
+                renderer = MultiprocessRenderer(background, 5, 4, 1, seed=3, packet_size=packet_size)
+                bvh = renderer.build_accelerator(world)
+                packets = packet_size > 0 and MultiprocessRenderer.primary_hits_deterministic(world)
+                images.append(renderer.render_scanline(10, bvh, camera, packets=packets)[1])
+            np.testing.assert_array_equal(images[0], images[1])
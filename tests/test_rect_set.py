@@ -0,0 +1,89 @@
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from common import Point3, Vec3, Ray
+from hittables import HittableList, FlipFace
+from hittables.primitives import XYRect, XZRect, YZRect, RectSet, Sphere
+from materials import Lambertian
+
+
+class TestRectSet(TestCase):
+
+    def setUp(self):
+        random.seed(2)
+        self.red = Lambertian.from_color(0.65, 0.05, 0.05)
+        self.white = Lambertian.from_color(0.73, 0.73, 0.73)
+        # a box shaped room, like the cornell box
+        self.rects = [
+            FlipFace(YZRect(0.0, 10.0, 0.0, 10.0, 10.0, self.red)),
+            YZRect(0.0, 10.0, 0.0, 10.0, 0.0, self.red),
+            FlipFace(XZRect(0.0, 10.0, 0.0, 10.0, 10.0, self.white)),
+            XZRect(0.0, 10.0, 0.0, 10.0, 0.0, self.white),
+            FlipFace(XYRect(0.0, 10.0, 0.0, 10.0, 10.0, self.white)),
+            XZRect(3.0, 6.0, 3.0, 6.0, 9.9, self.white),
+        ]
+        self.rect_list = HittableList()
+        for rect in self.rects:
+            self.rect_list.add(rect)
+
+    def test_materials_are_shared(self):
+        rect_set = RectSet.from_rects(self.rects)
+        self.assertEqual(len(rect_set), 6)
+        self.assertEqual(len(rect_set.materials), 2)
+        self.assertEqual(rect_set.flip.tolist(), [True, False, True, False, True, False])
+
+    def test_rect_sets_compare_by_identity(self):
+        rect_set = RectSet.from_rects(self.rects)
+        other = RectSet.from_rects(self.rects)
+        self.assertEqual(rect_set, rect_set)
+        self.assertNotEqual(rect_set, other)
+        hit_list = HittableList()
+        hit_list.add(other)
+        self.assertNotIn(rect_set, hit_list.objects)
+        self.assertIn(other, hit_list.objects)
+
+    def test_hits_match_rects(self):
+        rect_set = RectSet.from_rects(self.rects)
+        for _ in range(500):
+            ray = Ray(Point3.random_range(0.5, 9.5), Vec3.random_unit_vector())
+            expected = self.rect_list.hit(ray, 0.001, float("inf"))
+            actual = rect_set.hit(ray, 0.001, float("inf"))
+            self.assertEqual(expected is None, actual is None)
+            if expected:
+                self.assertAlmostEqual(expected.t, actual.t)
+                self.assertEqual(expected.normal, actual.normal)
+                self.assertEqual(expected.front_face, actual.front_face)
+                self.assertAlmostEqual(expected.u, actual.u)
+                self.assertAlmostEqual(expected.v, actual.v)
+                self.assertIs(expected.material, actual.material)
+
+    def test_intersect_arrays_matches_intersect(self):
+        rect_set = RectSet.from_rects(self.rects)
+        rays = [Ray(Point3.random_range(-5.0, 15.0), Vec3.random_unit_vector()) for _ in range(200)]
+        origins = np.array([ray.orig.to_tuple() for ray in rays])
+        directions = np.array([ray.dir.to_tuple() for ray in rays])
+        t, index = rect_set.intersect_arrays(origins, directions, 0.001, float("inf"))
+        for ray, ray_t, ray_index in zip(rays, t, index):
+            surface_hit = rect_set.intersect(ray, 0.001, float("inf"))
+            if surface_hit:
+                self.assertAlmostEqual(surface_hit.t, ray_t)
+                self.assertEqual(surface_hit.index, ray_index)
+            else:
+                self.assertEqual(ray_index, -1)
+
+    def test_ray_parallel_to_a_rect(self):
+        rect_set = RectSet.from_rects([XYRect(0.0, 1.0, 0.0, 1.0, 0.0, self.white)])
+        ray = Ray(Point3(0.5, 0.5, 0.0), Vec3(1.0, 0.0, 0.0))
+        self.assertIsNone(rect_set.intersect(ray, 0.001, float("inf")))
+        self.assertFalse(rect_set.occluded(ray, 0.001, float("inf")))
+
+    def test_bounding_box_covers_all_rects(self):
+        box = RectSet.from_rects(self.rects).bounding_box(0.0, 1.0)
+        self.assertAlmostEqual(box.min.x, -0.001)
+        self.assertAlmostEqual(box.max.z, 10.001)
+
+    def test_only_rects_can_be_packed(self):
+        with self.assertRaises(RuntimeError):
+            RectSet.from_rects([Sphere(Point3(0.0, 0.0, 0.0), 1.0, self.white)])
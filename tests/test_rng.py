@@ -0,0 +1,55 @@
+from unittest import TestCase
+
+from common import rng
+from common.rng import RngStream, stream_key
+
+
+class TestRng(TestCase):
+
+    def test_streams_are_reproducible(self):
+        first = RngStream(7, 100, 3)
+        second = RngStream(7, 100, 3)
+        self.assertEqual([first.random() for _ in range(10)], [second.random() for _ in range(10)])
+
+    def test_selected_stream_matches_stream_object(self):
+        stream = RngStream(7, 100, 3)
+        rng.select_stream(7, 100, 3)
+        self.assertEqual([stream.random() for _ in range(10)], [rng.random() for _ in range(10)])
+        # selecting a stream again starts it from its first number
+        rng.select_stream(7, 100, 3)
+        self.assertEqual(RngStream(7, 100, 3).random(), rng.random())
+
+    def test_different_coordinates_give_different_streams(self):
+        keys = {stream_key(seed, pixel, sample) for seed in range(3) for pixel in range(50) for sample in range(20)}
+        self.assertEqual(3 * 50 * 20, len(keys))
+        self.assertNotEqual(stream_key(1, 2), stream_key(2, 1))
+        self.assertNotEqual(stream_key(1, 2), stream_key(1, 2, 0))
+
+    def test_numbers_are_uniform(self):
+        # the first number of many streams, as drawn by the renderer, and many numbers of one stream
+        firsts = [RngStream(1, pixel, 0).random() for pixel in range(20000)]
+        stream = RngStream(1, 0, 0)
+        sequence = [stream.random() for _ in range(20000)]
+        for numbers in (firsts, sequence):
+            self.assertTrue(all(0.0 <= x < 1.0 for x in numbers))
+            self.assertAlmostEqual(0.5, sum(numbers) / len(numbers), delta=0.01)
+            buckets = [0] * 10
+            for x in numbers:
+                buckets[int(x * 10)] += 1
+            self.assertTrue(all(1800 < count < 2200 for count in buckets))
+
+    def test_uniform_range(self):
+        stream = RngStream(3)
+        values = [stream.uniform(-2.0, 5.0) for _ in range(1000)]
+        self.assertTrue(all(-2.0 <= x < 5.0 for x in values))
+
+    def test_saved_state_continues_the_stream(self):
+        rng.select_stream(7, 100, 3, prefix=lambda dimension: 0.5, prefix_dimensions=2)
+        rng.random()
+        state = rng.getstate()
+        expected = [rng.random() for _ in range(4)]
+        rng.select_stream(1, 2)
+        rng.random()
+        rng.setstate(state)
+        self.assertEqual(expected, [rng.random() for _ in range(4)])
+        self.assertEqual(0.5, expected[0])
@@ -1,9 +1,9 @@
 from unittest import TestCase
 
 from hittables import RotateY
-from hittables.primitives import BoxInst
+from hittables.primitives import BoxInst, Sphere
 from common import Point3, ColorRgb
-from materials import Metal
+from materials import Metal, Lambertian
 
 
 class TestRotateY(TestCase):
@@ -17,4 +17,14 @@ class TestRotateY(TestCase):
         rotated = RotateY.from_hittable(box_inst, 90.0)
         self.assertIsNotNone(rotated)
         print(rotated.hittable.bounding_box(0.0, 1.0))
-        print(rotated.bbox)
+        print(rotated.bounding_box(0.0, 1.0))
+
+    def test_invalidate_bounds_refreshes_the_rotated_box(self):
+        sphere = Sphere(Point3(0.0, 0.0, 0.0), 1.0, Lambertian.from_color(0.5, 0.5, 0.5))
+        rotated = RotateY.from_hittable(sphere, 30.0)
+        self.assertAlmostEqual(rotated.bounding_box(0.0, 1.0).max.y, 1.0)
+        sphere.center = Point3(0.0, 10.0, 0.0)
+        sphere.invalidate_bounds()
+        self.assertAlmostEqual(rotated.bounding_box(0.0, 1.0).max.y, 1.0)
+        rotated.invalidate_bounds()
+        self.assertAlmostEqual(rotated.bounding_box(0.0, 1.0).max.y, 11.0)
@@ -0,0 +1,105 @@
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from common import rng, Vec3
+from common.rng import RngStream
+from common.sampler import IndependentSampler, StratifiedSampler, HaltonSampler, SobolSampler, permute, \
+    radical_inverse, DIMENSIONS
+from renderer import MultiprocessRenderer, SAMPLERS
+from scenes import build_scene_random_spheres
+
+
+class TestSampler(TestCase):
+
+    def test_permute_is_a_permutation(self):
+        for length in (1, 2, 3, 7, 16, 100):
+            for p in (0, 12345, 0xFFFFFFFF):
+                permuted = permute(np.arange(length, dtype=np.uint32), length, np.uint32(p))
+                self.assertEqual(list(range(length)), sorted(permuted.tolist()))
+
+    def test_radical_inverse(self):
+        values = radical_inverse(np.array([2, 3]), np.arange(5)[:, np.newaxis])
+        np.testing.assert_allclose([0.0, 0.5, 0.25, 0.75, 0.125], values[:, 0])
+        np.testing.assert_allclose([0.0, 1 / 3, 2 / 3, 1 / 9, 4 / 9], values[:, 1])
+
+    def test_stratified_samples_fill_every_stratum(self):
+        sampler = StratifiedSampler(3, 25)
+        for dimension in range(DIMENSIONS):
+            # the first and the second set of strata
+            for first in (0, 25):
+                values = [sampler.sample(7, index, dimension) for index in range(first, first + 25)]
+                self.assertEqual(list(range(25)), sorted(int(value * 25) for value in values))
+
+    def test_sobol_samples_are_stratified(self):
+        for seed in (0, 99):
+            sampler = SobolSampler(seed, 16)
+            for dimension in range(16):
+                values = [sampler.sample(5, index, dimension) for index in range(64)]
+                self.assertEqual(list(range(64)), sorted(int(value * 64) for value in values))
+            # the first two dimensions are a (0, 2)-sequence, every elementary interval of area 1/64 has one sample
+            points = [(sampler.sample(5, index, 0), sampler.sample(5, index, 1)) for index in range(64)]
+            for bits in range(7):
+                cells = {(int(x * 2 ** bits), int(y * 2 ** (6 - bits))) for x, y in points}
+                self.assertEqual(64, len(cells))
+
+    def test_pixels_are_scrambled_differently(self):
+        for sampler in (StratifiedSampler(1, 16), HaltonSampler(1), SobolSampler(1)):
+            first = [sampler.sample(0, index, 0) for index in range(16)]
+            second = [sampler.sample(1, index, 0) for index in range(16)]
+            self.assertNotEqual(first, second)
+            self.assertTrue(all(0.0 <= value < 1.0 for value in first + second))
+            # samples are a pure function of the pixel, index and dimension
+            self.assertEqual(first, [sampler.sample(0, index, 0) for index in range(16)])
+
+    def test_sampler_provides_the_first_dimensions(self):
+        for sampler in (IndependentSampler(4), StratifiedSampler(4, 16), HaltonSampler(4), SobolSampler(4)):
+            sampler.start_sample(11, 3)
+            drawn = [rng.random() for _ in range(DIMENSIONS + 4)]
+            dimensions = sampler.dimensions
+            self.assertEqual([sampler.sample(11, 3, dimension) for dimension in range(dimensions)], drawn[:dimensions])
+            # then the sample's stream
+            stream = RngStream(4, 11, 3)
+            self.assertEqual([stream.random() for _ in range(DIMENSIONS + 4 - dimensions)], drawn[dimensions:])
+
+    def test_random_vectors_draw_a_fixed_number_of_dimensions(self):
+        for pixel in range(200):
+            rng.select_stream(1, pixel)
+            disk = Vec3.random_in_unit_disk()
+            sphere = Vec3.random_unit_sphere()
+            self.assertLess(disk.length_squared(), 1.0)
+            self.assertEqual(0.0, disk.z)
+            self.assertLess(sphere.length_squared(), 1.0)
+            # two numbers for the disk and three for the sphere, whatever they are
+            stream = RngStream(1, pixel)
+            for _ in range(5):
+                stream.random()
+            self.assertEqual(stream.random(), rng.random())
+
+    def test_seeded_rows_are_reproduced_with_every_sampler(self):
+        camera, world, background = build_scene_random_spheres(40, 1.0, random.Random(5))
+        for sampler in SAMPLERS:
+            renderer = MultiprocessRenderer(background, 5, 4, 1, seed=9, sampler=sampler)
+            bvh = renderer.build_accelerator(world)
+            _, first = renderer.render_scanline(20, bvh, camera)
+            renderer.render_scanline(21, bvh, camera)
+            _, second = renderer.render_scanline(20, bvh, camera)
+            np.testing.assert_array_equal(first, second)
+
+    def test_unknown_sampler_raises(self):
+        with self.assertRaises(RuntimeError):
+            MultiprocessRenderer(None, 5, 4, 1, sampler="random").build_sampler(0)
+        with self.assertRaises(RuntimeError):
+            SobolSampler(0, 20)
+
+    def test_sample_arrays_are_the_drawn_dimensions(self):
+        for sampler in (IndependentSampler(4), StratifiedSampler(4, 6), HaltonSampler(4), SobolSampler(4, 3)):
+            values = sampler.sample_array(11, 20, DIMENSIONS + 2)
+            for index in range(20):
+                sampler.start_sample(11, index)
+                self.assertEqual(values[index].tolist(), [rng.random() for _ in range(DIMENSIONS + 2)])
+                # skipping dimensions continues with the next one
+                sampler.start_sample(11, index)
+                rng.skip(5)
+                self.assertEqual(values[index][5], rng.random())
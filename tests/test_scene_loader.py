@@ -0,0 +1,122 @@
+import os
+import random
+from unittest import TestCase
+
+from common import Point3, Vec3, Ray
+from hittables.bvh_node import BvhNode
+from hittables.volumes import ConstantMedium, GlobalMedium
+from renderer import SolidBackground
+from scenes import load_scene, SceneLoader, build_scene_cornell_box_with_two_boxes
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), "..", "scenes", "examples")
+
+CAMERA = {"look_from": [0.0, 0.0, -10.0], "look_at": [0.0, 0.0, 0.0], "vertical_fov": 40.0}
+
+
+class TestSceneLoader(TestCase):
+
+    def setUp(self):
+        random.seed(5)
+
+    def test_cornell_box_file_matches_builder(self):
+        camera, world, background = load_scene(os.path.join(EXAMPLES_DIR, "cornell_box.json"), 200, 1.0)
+        expected_camera, expected_world, expected_background = build_scene_cornell_box_with_two_boxes(200, 1.0)
+        self.assertEqual(expected_camera, camera)
+        self.assertEqual(expected_background, background)
+        for _ in range(300):
+            ray = Ray(Point3.random_range(1.0, 554.0), Vec3.random_unit_vector())
+            expected = expected_world.hit(ray, 0.001, float("inf"))
+            actual = world.hit(ray, 0.001, float("inf"))
+            self.assertEqual(expected is None, actual is None)
+            if expected:
+                self.assertAlmostEqual(expected.t, actual.t)
+                self.assertEqual(expected.normal, actual.normal)
+                self.assertEqual(expected.front_face, actual.front_face)
+                self.assertEqual(expected.material, actual.material)
+
+    def test_example_scenes_load(self):
+        for name in os.listdir(EXAMPLES_DIR):
+            camera, world, background = load_scene(os.path.join(EXAMPLES_DIR, name), 200, 1.77)
+            self.assertEqual(200, camera.image_width)
+            self.assertGreater(len(world.objects), 0)
+
+    def test_identical_materials_and_textures_are_shared(self):
+        description = {
+            "camera": CAMERA,
+            "background": [0.0, 0.0, 0.0],
+            "textures": {"grey": [0.5, 0.5, 0.5]},
+            "materials": {"matte": {"type": "lambertian", "albedo": [0.5, 0.5, 0.5]}},
+            "objects": [
+                {"type": "sphere", "center": [0.0, 0.0, 0.0], "radius": 1.0, "material": "matte"},
+                {"type": "sphere", "center": [2.0, 0.0, 0.0], "radius": 1.0,
+                 "material": {"albedo": [0.5, 0.5, 0.5], "type": "lambertian"}},
+                {"type": "sphere", "center": [4.0, 0.0, 0.0], "radius": 1.0,
+                 "material": {"type": "lambertian", "albedo": "grey"}},
+                {"type": "sphere", "center": [6.0, 0.0, 0.0], "radius": 1.0,
+                 "material": {"type": "lambertian", "albedo": [0.5, 0.5, 0.6]}},
+            ]
+        }
+        _, world, background = SceneLoader().load(description, 200, 1.0)
+        materials = [sphere.material for sphere in world.objects]
+        self.assertIsInstance(background, SolidBackground)
+        self.assertIs(materials[0], materials[1])
+        self.assertIs(materials[0].albedo, materials[2].albedo)
+        self.assertIsNot(materials[0], materials[3])
+
+    def test_sphere_array(self):
+        description = {
+            "camera": CAMERA,
+            "background": {"from": [1.0, 1.0, 1.0], "to": [0.5, 0.5, 1.0]},
+            "objects": [
+                {"type": "spheres", "centers": [[0.0, 0.0, 0.0], [2.0, 0.0, 0.0], [4.0, 0.0, 0.0]],
+                 "radii": [1.0, 0.5, 0.25], "materials": [{"type": "dielectric", "ref_idx": 1.5},
+                                                          {"type": "metal", "albedo": [0.8, 0.8, 0.8], "fuzz": 0.0}],
+                 "material_ids": [0, 1, 0]},
+                {"type": "spheres", "centers": [[0.0, 5.0, 0.0], [2.0, 5.0, 0.0]], "radii": 1.0,
+                 "material": {"type": "isotropic", "albedo": [1.0, 1.0, 1.0]}, "accelerator": "bvh"},
+            ]
+        }
+        _, world, _ = SceneLoader().load(description, 200, 1.0)
+        self.assertEqual(4, len(world.objects))
+        self.assertEqual([1.0, 0.5, 0.25], [sphere.radius for sphere in world.objects[:3]])
+        self.assertIs(world.objects[0].material, world.objects[2].material)
+        self.assertIsNot(world.objects[0].material, world.objects[1].material)
+        self.assertIsInstance(world.objects[3], BvhNode)
+
+    def test_transforms_and_media(self):
+        description = {
+            "camera": CAMERA,
+            "background": [0.0, 0.0, 0.0],
+            "objects": [
+                {"type": "constant_medium", "density": 0.5, "texture": [1.0, 1.0, 1.0],
+                 "boundary": {"type": "box", "min": [0.0, 0.0, 0.0], "max": [1.0, 1.0, 1.0],
+                              "material": {"type": "dielectric", "ref_idx": 1.5}, "translate": [0.0, 0.0, 5.0]}},
+                {"type": "group", "accelerator": "grid", "translate": [10.0, 0.0, 0.0], "objects": [
+                    {"type": "sphere", "center": [0.0, 0.0, 0.0], "radius": 1.0,
+                     "material": {"type": "dielectric", "ref_idx": 1.5}}]},
+            ]
+        }
+        _, world, _ = SceneLoader().load(description, 200, 1.0)
+        self.assertIsInstance(world.objects[0], ConstantMedium)
+        hit = world.hit(Ray(Point3(10.0, 0.0, -5.0), Vec3(0.0, 0.0, 1.0)), 0.001, float("inf"))
+        self.assertAlmostEqual(4.0, hit.t)
+        self.assertEqual(Point3(10.0, 0.0, -1.0), hit.p)
+
+    def test_unknown_types_raise(self):
+        for spec in ({"type": "cone"},
+                     {"type": "sphere", "center": [0.0, 0.0, 0.0], "radius": 1.0, "material": "missing"},
+                     {"type": "sphere", "center": [0.0, 0.0, 0.0], "radius": 1.0, "material": {"type": "glass"}}):
+            with self.assertRaises(RuntimeError):
+                SceneLoader().load({"camera": CAMERA, "background": [0.0, 0.0, 0.0], "objects": [spec]}, 200, 1.0)
+
+    def test_global_media_are_only_top_level_objects(self):
+        medium = {"type": "global_medium", "density": 0.01, "texture": [1.0, 1.0, 1.0]}
+        _, world, _ = SceneLoader().load({"camera": CAMERA, "background": [0.0, 0.0, 0.0], "objects": [medium]},
+                                         200, 1.0)
+        self.assertIsInstance(world.objects[0], GlobalMedium)
+        for spec in (dict(medium, translate=[0.0, 1.0, 0.0]),
+                     {"type": "group", "objects": [medium]},
+                     {"type": "group", "accelerator": "bvh", "objects": [medium]},
+                     {"type": "constant_medium", "boundary": medium, "density": 0.5, "texture": [1.0, 1.0, 1.0]}):
+            with self.assertRaises(ValueError):
+                SceneLoader().load({"camera": CAMERA, "background": [0.0, 0.0, 0.0], "objects": [spec]}, 200, 1.0)
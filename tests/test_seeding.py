@@ -0,0 +1,56 @@
+import random
+from unittest import TestCase
+
+import numpy as np
+
+from common import content_hash, Vec3, Point3
+from hittables import HittableList
+from hittables.bvh_builder import build_bvh_parallel
+from hittables.bvh_node import BvhNode
+from hittables.primitives import Sphere
+from materials import Lambertian
+from renderer import MultiprocessRenderer
+from scenes import build_scene_random_spheres, build_scene_final, build_scene_two_perlin_spheres
+
+
+def _spheres(count: int) -> HittableList:
+    rng = random.Random(2)
+    mat = Lambertian.from_color(0.5, 0.5, 0.5)
+    hit_list = HittableList()
+    for _ in range(count):
+        hit_list.add(Sphere(Point3.random_range(-10.0, 10.0, rng), 0.5, mat))
+    return hit_list
+
+
+class TestSeeding(TestCase):
+
+    def test_seeded_scenes_are_reproduced(self):
+        for builder in (build_scene_random_spheres, build_scene_two_perlin_spheres, build_scene_final):
+            first = content_hash(*builder(100, 1.0, random.Random(5)))
+            # draws from the global generator don't change a seeded scene
+            random.random()
+            second = content_hash(*builder(100, 1.0, random.Random(5)))
+            other = content_hash(*builder(100, 1.0, random.Random(6)))
+            self.assertEqual(first, second)
+            self.assertNotEqual(first, other)
+
+    def test_random_vectors_use_the_given_generator(self):
+        self.assertEqual(Vec3.random(random.Random(1)), Vec3.random(random.Random(1)))
+        self.assertEqual(Vec3.random_range(-2.0, 2.0, random.Random(1)),
+                         Vec3.random_range(-2.0, 2.0, random.Random(1)))
+
+    def test_seeded_bvh_builds_are_reproduced(self):
+        hit_list = _spheres(100)
+        serial = content_hash(BvhNode.from_hittable_list(hit_list, 0.0, 1.0, rng=random.Random(4)))
+        array = content_hash(build_bvh_parallel(hit_list, 0.0, 1.0, rng=random.Random(4)))
+        self.assertEqual(serial, content_hash(BvhNode.from_hittable_list(hit_list, 0.0, 1.0, rng=random.Random(4))))
+        self.assertEqual(serial, array)
+
+    def test_seeded_rows_are_reproduced(self):
+        camera, world, background = build_scene_random_spheres(40, 1.0, random.Random(5))
+        renderer = MultiprocessRenderer(background, 5, 2, 1, seed=9)
+        bvh = renderer.build_accelerator(world)
+        _, first = renderer.render_scanline(20, bvh, camera)
+        renderer.render_scanline(21, bvh, camera)
+        _, second = renderer.render_scanline(20, bvh, camera)
+        np.testing.assert_array_equal(first, second)
@@ -1,6 +1,6 @@
 from unittest import TestCase
 
-from common import Point3
+from common import Point3, Vec3, Ray
 from materials import Lambertian
 from hittables.primitives import Sphere
 from textures import SolidColor
@@ -16,3 +16,29 @@ class TestSphere(TestCase):
         self.assertIsNotNone(aabb)
         self.assertEqual(aabb.min, Point3(0.0, 0.0, 0.0))
         self.assertEqual(aabb.max, Point3(2.0, 2.0, 2.0))
+
+    def test_hit_interval_returns_entry_and_exit(self):
+        mat = Lambertian(SolidColor.from_rgb(0.5, 0.5, 0.5))
+        sphere = Sphere(Point3(0.0, 0.0, -5.0), 1.0, mat)
+        ray = Ray(Point3(0.0, 0.0, 0.0), Vec3(0.0, 0.0, -1.0), 0.0)
+        t_enter, t_exit = sphere.hit_interval(ray, float("-inf"), float("inf"))
+        self.assertAlmostEqual(t_enter, 4.0)
+        self.assertAlmostEqual(t_exit, 6.0)
+
+    def test_hit_interval_is_none_when_ray_misses(self):
+        mat = Lambertian(SolidColor.from_rgb(0.5, 0.5, 0.5))
+        sphere = Sphere(Point3(0.0, 5.0, -5.0), 1.0, mat)
+        ray = Ray(Point3(0.0, 0.0, 0.0), Vec3(0.0, 0.0, -1.0), 0.0)
+        self.assertIsNone(sphere.hit_interval(ray, float("-inf"), float("inf")))
+
+    def test_bounding_box_is_cached_until_invalidated(self):
+        mat = Lambertian(SolidColor.from_rgb(0.5, 0.5, 0.5))
+        sphere = Sphere(Point3(1.0, 1.0, 1.0), 1.0, mat)
+        aabb = sphere.bounding_box(0.0, 1.0)
+        self.assertIs(sphere.bounding_box(0.0, 1.0), aabb)
+
+        sphere.center = Point3(5.0, 5.0, 5.0)
+        sphere.invalidate_bounds()
+        moved = sphere.bounding_box(0.0, 1.0)
+        self.assertIsNot(moved, aabb)
+        self.assertEqual(moved.min, Point3(4.0, 4.0, 4.0))
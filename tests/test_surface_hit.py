@@ -0,0 +1,43 @@
+from unittest import TestCase
+
+from common import Point3, Vec3, Ray
+from hittables import HittableList, FlipFace
+from hittables.bvh_node import BvhNode
+from hittables.primitives import Sphere, XYRect
+from materials import Lambertian
+
+
+class TestSurfaceHit(TestCase):
+
+    def setUp(self):
+        mat = Lambertian.from_color(0.5, 0.5, 0.5)
+        self.world = HittableList()
+        self.world.add(Sphere(Point3(0.0, 0.0, -10.0), 1.0, mat))
+        self.world.add(Sphere(Point3(0.0, 0.0, -5.0), 1.0, mat))
+        self.world.add(FlipFace(XYRect(-1.0, 1.0, -1.0, 1.0, -20.0, mat)))
+        self.ray = Ray(Point3(0.0, 0.0, 0.0), Vec3(0.001, 0.001, -1.0), 0.0)
+
+    def test_intersect_defers_the_hit_record(self):
+        surface_hit = self.world.intersect(self.ray, 0.001, float("inf"))
+        self.assertAlmostEqual(surface_hit.t, 4.0, places=4)
+        self.assertIsNone(surface_hit.record)
+
+    def test_resolve_matches_hit(self):
+        rec = self.world.hit(self.ray, 0.001, float("inf"))
+        resolved = self.world.intersect(self.ray, 0.001, float("inf")).resolve()
+        self.assertEqual(rec.t, resolved.t)
+        self.assertEqual(rec.p, resolved.p)
+        self.assertEqual(rec.normal, resolved.normal)
+        self.assertEqual(rec.front_face, resolved.front_face)
+
+    def test_bvh_returns_the_closest_hit(self):
+        bvh = BvhNode.from_hittable_list(self.world, 0.0, 1.0)
+        surface_hit = bvh.intersect(self.ray, 0.001, float("inf"))
+        self.assertAlmostEqual(surface_hit.t, 4.0, places=4)
+
+    def test_wrapper_resolves_through_the_inner_hit(self):
+        flipped = self.world.objects[2]
+        ray = Ray(Point3(0.0, 0.0, 0.0), Vec3(0.0, 0.0, -1.0), 0.0)
+        rec = flipped.intersect(ray, 0.001, float("inf")).resolve()
+        self.assertAlmostEqual(rec.t, 20.0)
+        self.assertFalse(rec.front_face)
@@ -0,0 +1,142 @@
+import os
+import pickle
+import random
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+
+from common import Point3, Vec3, Ray
+from hittables.primitives import TriangleMesh, BoxInst
+from hittables.primitives.triangle_mesh import load_obj
+from materials import Lambertian
+
+
+def _cube_mesh(material) -> TriangleMesh:
+    """
+    a unit cube made of 12 triangles
+    """
+    vertices = np.array([[x, y, z] for x in (0.0, 1.0) for y in (0.0, 1.0) for z in (0.0, 1.0)])
+    quads = [(0, 2, 3, 1), (4, 6, 7, 5), (0, 4, 5, 1), (2, 6, 7, 3), (0, 4, 6, 2), (1, 5, 7, 3)]
+    indices = []
+    for a, b, c, d in quads:
+        indices += [(a, b, c), (a, c, d)]
+    return TriangleMesh.from_arrays(vertices, np.array(indices), material)
+
+
+class TestTriangleMesh(TestCase):
+
+    def setUp(self):
+        random.seed(4)
+        self.material = Lambertian.from_color(0.5, 0.5, 0.5)
+
+    def test_meshes_compare_by_identity(self):
+        mesh = _cube_mesh(self.material)
+        other = _cube_mesh(self.material)
+        self.assertEqual(mesh, mesh)
+        self.assertNotEqual(mesh, other)
+        self.assertNotIn(mesh, [other])
+        self.assertEqual([other].index(other), 0)
+
+    def test_cube_mesh_hits_match_box(self):
+        mesh = _cube_mesh(self.material)
+        box = BoxInst.from_material(Point3(0.0, 0.0, 0.0), Point3(1.0, 1.0, 1.0), self.material)
+        for _ in range(500):
+            ray = Ray(Point3.random_range(-2.0, 3.0), Vec3.random_unit_vector())
+            expected = box.hit(ray, 0.001, float("inf"))
+            actual = mesh.hit(ray, 0.001, float("inf"))
+            self.assertEqual(expected is None, actual is None)
+            if expected:
+                self.assertAlmostEqual(expected.t, actual.t)
+                self.assertEqual(expected.normal, actual.normal)
+                self.assertTrue(0.0 <= actual.u <= 1.0 and 0.0 <= actual.v <= 1.0)
+
+    def test_bvh_hits_match_all_triangles(self):
+        rng = np.random.default_rng(4)
+        corners = rng.uniform(-10.0, 10.0, (300, 1, 3)) + rng.uniform(-1.0, 1.0, (300, 3, 3))
+        mesh = TriangleMesh.from_arrays(corners.reshape(-1, 3), np.arange(900).reshape(-1, 3), self.material)
+        self.assertGreater(len(mesh.node_links), 1)
+        for _ in range(300):
+            ray = Ray(Point3.random_range(-12.0, 12.0), Vec3.random_unit_vector())
+            expected = mesh._closest_triangle(ray, 0.001, float("inf"), np.arange(len(mesh)))
+            actual = mesh.intersect(ray, 0.001, float("inf"))
+            self.assertEqual(expected is None, actual is None)
+            if expected:
+                self.assertAlmostEqual(expected[0], actual.t)
+                self.assertEqual(expected[1], actual.index)
+
+    def test_bounding_box_contains_all_vertices(self):
+        mesh = _cube_mesh(self.material)
+        box = mesh.bounding_box(0.0, 1.0)
+        # the flat triangles of the cube's faces are padded a small amount
+        for axis in range(3):
+            self.assertAlmostEqual(box.min[axis], 0.0, places=3)
+            self.assertAlmostEqual(box.max[axis], 1.0, places=3)
+
+    def test_pickled_mesh_can_be_hit(self):
+        mesh = pickle.loads(pickle.dumps(_cube_mesh(self.material)))
+        hit = mesh.hit(Ray(Point3(0.5, 0.5, 5.0), Vec3(0.0, 0.0, -1.0)), 0.001, float("inf"))
+        self.assertAlmostEqual(hit.t, 4.0)
+
+    def test_load_obj(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "quad.obj")
+            with open(path, "w") as obj_file:
+                obj_file.write("# a quad and a triangle\n"
+                               "v 0.0 0.0 0.0\nv 1.0 0.0 0.0\nv 1.0 1.0 0.0\nv 0.0 1.0 0.0\n"
+                               "vt 0.0 0.0\nvn 0.0 0.0 1.0\n"
+                               "f 1/1/1 2/1/1 3/1/1 4/1/1\n"
+                               "v 0.0 0.0 1.0\n"
+                               "f -1 -4 -3\n")
+            vertices, indices = load_obj(path)
+            mesh = TriangleMesh.from_obj(path, self.material)
+        self.assertEqual(vertices.shape, (5, 3))
+        self.assertEqual(indices.tolist(), [[0, 1, 2], [0, 2, 3], [4, 1, 2]])
+        self.assertEqual(len(mesh), 3)
+
+    def test_indices_outside_of_vertices_raise(self):
+        with self.assertRaises(RuntimeError):
+            TriangleMesh.from_arrays(np.zeros((3, 3)), np.array([[0, 1, 3]]), self.material)
+
+    def test_cached_mesh_is_memory_mapped(self):
+        mesh = _cube_mesh(self.material)
+        with tempfile.TemporaryDirectory() as directory:
+            cache_path = os.path.join(directory, "cube")
+            mesh.save_cache(cache_path)
+            cached = TriangleMesh.from_cache(cache_path, self.material)
+            self.assertIsInstance(cached.vertices, np.memmap)
+            self.assertIsInstance(cached._e1, np.memmap)
+            np.testing.assert_array_equal(mesh.node_links, cached.node_links)
+
+            # a cached mesh pickles as its cache path
+            unpickled = pickle.loads(pickle.dumps(cached))
+            self.assertLess(len(pickle.dumps(cached)), 1000)
+            self.assertIsInstance(unpickled.indices, np.memmap)
+            for _ in range(100):
+                ray = Ray(Point3.random_range(-2.0, 3.0), Vec3.random_unit_vector())
+                expected = mesh.hit(ray, 0.001, float("inf"))
+                actual = unpickled.hit(ray, 0.001, float("inf"))
+                self.assertEqual(expected is None, actual is None)
+                if expected:
+                    self.assertEqual(expected.t, actual.t)
+            del cached, unpickled
+
+    def test_from_obj_reuses_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "triangle.obj")
+            with open(path, "w") as obj_file:
+                obj_file.write("v 0 0 0\nv 1 0 0\nv 0 1 0\nf 1 2 3\n")
+            cache_dir = os.path.join(directory, "cache")
+            mesh = TriangleMesh.from_obj(path, self.material, cache_dir=cache_dir)
+            self.assertEqual(1, len(mesh))
+            self.assertEqual(1, len(os.listdir(cache_dir)))
+            self.assertEqual(1, len(TriangleMesh.from_obj(path, self.material, cache_dir=cache_dir)))
+            self.assertEqual(1, len(os.listdir(cache_dir)))
+
+            # modifying the .OBJ file gives it a new cache
+            with open(path, "a") as obj_file:
+                obj_file.write("v 0 0 1\nf 1 2 4\n")
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(2, len(TriangleMesh.from_obj(path, self.material, cache_dir=cache_dir)))
+            self.assertEqual(2, len(os.listdir(cache_dir)))
+            del mesh
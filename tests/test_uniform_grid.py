@@ -0,0 +1,65 @@
+import random
+from unittest import TestCase
+
+from common import Point3, Vec3, Ray
+from hittables import HittableList
+from hittables.uniform_grid import UniformGrid
+from hittables.primitives import Sphere, MovingSphere
+from materials import Lambertian
+
+
+def _random_world(count: int) -> HittableList:
+    mat = Lambertian.from_color(0.5, 0.5, 0.5)
+    world = HittableList()
+    # a big sphere that overlaps every cell
+    world.add(Sphere(Point3(0.0, -1000.0, 0.0), 1000.0, mat))
+    for i in range(count):
+        center = Point3(random.uniform(-10.0, 10.0), random.uniform(0.0, 2.0), random.uniform(-10.0, 10.0))
+        if i % 4 == 0:
+            world.add(MovingSphere(center, center + Vec3(0.0, 0.5, 0.0), 0.0, 1.0, 0.3, mat))
+        else:
+            world.add(Sphere(center, 0.3, mat))
+    return world
+
+
+class TestUniformGrid(TestCase):
+
+    def setUp(self):
+        random.seed(5)
+        self.world = _random_world(300)
+
+    def _assert_matches_list(self, grid: UniformGrid):
+        for _ in range(500):
+            ray = Ray(Point3.random_range(-12.0, 12.0), Vec3.random_unit_vector(), random.random())
+            expected = self.world.hit(ray, 0.001, float("inf"))
+            actual = grid.hit(ray, 0.001, float("inf"))
+            self.assertEqual(expected is None, actual is None)
+            if expected:
+                self.assertAlmostEqual(expected.t, actual.t)
+            self.assertEqual(expected is not None, grid.occluded(ray, 0.001, float("inf")))
+
+    def test_two_level_grid_matches_hittable_list(self):
+        grid = UniformGrid.from_hittable_list(self.world, 0.0, 1.0)
+        self.assertTrue(any(isinstance(cell[0], UniformGrid) for cell in grid.cells if cell))
+        self._assert_matches_list(grid)
+
+    def test_single_level_grid_matches_hittable_list(self):
+        grid = UniformGrid.from_hittable_list(self.world, 0.0, 1.0, max_cell_objects=None)
+        self.assertFalse(any(isinstance(cell[0], UniformGrid) for cell in grid.cells if cell))
+        self._assert_matches_list(grid)
+
+    def test_axis_aligned_ray(self):
+        grid = UniformGrid.from_hittable_list(self.world, 0.0, 1.0)
+        ray = Ray(Point3(0.0, 50.0, 0.0), Vec3(0.0, -1.0, 0.0))
+        expected = self.world.hit(ray, 0.001, float("inf"))
+        self.assertAlmostEqual(expected.t, grid.hit(ray, 0.001, float("inf")).t)
+
+    def test_ray_missing_grid(self):
+        grid = UniformGrid.from_hittable_list(self.world, 0.0, 1.0)
+        ray = Ray(Point3(0.0, 50.0, 0.0), Vec3(0.0, 1.0, 0.0))
+        self.assertIsNone(grid.hit(ray, 0.001, float("inf")))
+        self.assertFalse(grid.occluded(ray, 0.001, float("inf")))
+
+    def test_empty_list_raises(self):
+        with self.assertRaises(RuntimeError):
+            UniformGrid.from_hittable_list(HittableList(), 0.0, 1.0)
@@ -37,3 +37,11 @@ class Texture(ABC):
         """
         pass
 
+    def uses_uv(self) -> bool:
+        """
+        returns True if the color of this texture depends on the 'u,v' coordinates it is given, and not only on
+        the point 'p'. Hittables that only compute u,v when they are needed ask it. This base implementation
+        returns True
+        """
+        return True
+
@@ -19,6 +19,10 @@ class CheckerTexture(Texture):
     odd: Texture
     even: Texture
 
+    def uses_uv(self) -> bool:
+        # the checker pattern depends on p, the textures of its squares may depend on u,v
+        return self.odd.uses_uv() or self.even.uses_uv()
+
     def value(self, u: float, v: float, p: Point3) -> ColorRgb:
         """
         returns the checkerboard color at the given u,v coordinate and point p
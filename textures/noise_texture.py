@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import math
+import random
 from dataclasses import dataclass
+from typing import Optional
 
 from common import Point3, ColorRgb
 from textures import Texture, Perlin
@@ -17,14 +19,18 @@ class NoiseTexture(Texture):
     # the amount to scale the noise
     scale: float
 
-    def __init__(self, scale: float):
+    def __init__(self, scale: float, rng: Optional[random.Random] = None):
         """
 
         :param scale: the amount to scale the noise by
+        :param rng: the random number generator the noise is generated with
         """
-        self.noise = Perlin()
+        self.noise = Perlin(rng)
         self.scale = scale
 
+    def uses_uv(self) -> bool:
+        return False
+
     def value(self, u: float, v: float, p: Point3) -> ColorRgb:
         # this should generate a marble like noisy texture
         color = ColorRgb(1.0, 1.0, 1.0)
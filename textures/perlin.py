@@ -3,7 +3,7 @@ import copy
 import math
 import random
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
 from common import Vec3, Point3
 
@@ -18,15 +18,19 @@ class Perlin:
     Textures that wish to add perlin noise to themselves should call the "turb()" method
     """
 
-    def __init__(self):
+    def __init__(self, rng: Optional[random.Random] = None):
+        """
+        :param rng: the random number generator to use, defaults to the `random` module's global generator
+        """
+        rng = random if rng is None else rng
         perm_x = arr.array('i', [i for i in range(POINT_COUNT)])
         perm_y = arr.array('i', [i for i in range(POINT_COUNT)])
         perm_z = arr.array('i', [i for i in range(POINT_COUNT)])
-        rand_vecs = [Vec3.random_range(-1.0, 1.0).unit_vector() for _ in range(POINT_COUNT)]
+        rand_vecs = [Vec3.random_range(-1.0, 1.0, rng).unit_vector() for _ in range(POINT_COUNT)]
 
-        random.shuffle(perm_x)
-        random.shuffle(perm_y)
-        random.shuffle(perm_z)
+        rng.shuffle(perm_x)
+        rng.shuffle(perm_y)
+        rng.shuffle(perm_z)
 
         self.perm_x = perm_x
         self.perm_y = perm_y
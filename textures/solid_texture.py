@@ -21,5 +21,8 @@ class SolidColor(Texture):
         """
         return cls(ColorRgb(red, green, blue))
 
+    def uses_uv(self) -> bool:
+        return False
+
     def value(self, u: float, v: float, p: Point3) -> ColorRgb:
         return self.color_value